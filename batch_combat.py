@@ -0,0 +1,230 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Batch Combat Module
+
+Name: Samaya Sartin
+
+This module simulates thousands of battles at once with NumPy arrays,
+stepping every battle forward one turn at a time in lockstep. It uses the
+same damage and special ability math as combat_system.run_battle, for
+policies that always attack or always use the special ability.
+"""
+
+import itertools
+
+import numpy as np
+
+import combat_system
+from battle_simulator import build_character
+
+# Class codes used in the batch arrays
+CLASS_CODES = {"Warrior": 0, "Mage": 1, "Rogue": 2, "Cleric": 3}
+WARRIOR, MAGE, ROGUE, CLERIC = 0, 1, 2, 3
+
+# Action codes used in the batch arrays
+ACTION_CODES = {combat_system.ATTACK: 0, combat_system.SPECIAL: 1}
+
+# Winner codes in batch results
+WINNERS = ("draw", "player", "enemy")
+DRAW, PLAYER, ENEMY = 0, 1, 2
+
+
+# ============================================================================
+# BUILDING BATCHES
+# ============================================================================
+
+def make_batch(character_class, level, enemy_type, count, action=combat_system.SPECIAL):
+    """
+    Build batch arrays for count copies of one character build vs one enemy
+
+    Returns: Dictionary of NumPy arrays, one entry per battle
+    Raises:
+        InvalidCharacterClassError if class is not valid
+        InvalidTargetError if enemy_type not recognized
+        ValueError if action is not ATTACK or SPECIAL
+    """
+    if action not in ACTION_CODES:
+        raise ValueError(f"Batch battles only support attack or special, not {action}")
+    character = build_character(character_class, level)
+    enemy = combat_system.create_enemy(enemy_type)
+    values = {
+        "health": character["health"],
+        "max_health": character["max_health"],
+        "strength": character["strength"],
+        "magic": character["magic"],
+        "class_code": CLASS_CODES[character_class],
+        "action": ACTION_CODES[action],
+        "enemy_health": enemy["health"],
+        "enemy_strength": enemy["strength"],
+        "xp_reward": enemy["xp_reward"],
+        "gold_reward": enemy["gold_reward"]
+    }
+    return {key: np.full(count, value, dtype=np.int64) for key, value in values.items()}
+
+
+def concat_batches(batches):
+    """
+    Join several batches into one so they run in the same lockstep pass
+
+    Returns: Dictionary of NumPy arrays
+    """
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+# ============================================================================
+# BATCH KERNEL
+# ============================================================================
+
+def run_batch(batch, rng=None, max_turns=combat_system.DEFAULT_MAX_TURNS):
+    """
+    Run every battle in a batch to the end
+
+    Each turn the player attacks or uses their special ability, then the
+    enemy attacks, exactly as in combat_system.run_battle:
+    - Attack damage: strength - (defender strength // 4), minimum 1
+    - Power Strike: 2x strength, Fireball: 2x magic
+    - Critical Strike: 2x or 3x strength (50% chance each)
+    - Heal: health + 30, topped up to max_health if still below it
+
+    Finished battles are dropped from the working arrays so later turns
+    only touch battles that are still going.
+
+    Args:
+        batch: Dictionary of arrays from make_batch or concat_batches
+        rng: numpy.random.Generator (a new unseeded one by default)
+        max_turns: Turns before a battle is a draw (None for no limit)
+
+    Returns: Dictionary of arrays 'winner' (DRAW, PLAYER or ENEMY codes),
+             'turns', 'xp' and 'gold'
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    count = len(batch["health"])
+    winner = np.zeros(count, dtype=np.int8)
+    # Without a limit every battle is given its real turn count on finishing
+    turns = np.full(count, 0 if max_turns is None else max_turns, dtype=np.int64)
+
+    # Strength never changes mid-battle, so attack damage is fixed per battle
+    attack_damage = np.maximum(batch["strength"] - batch["enemy_strength"] // 4, 1)
+    enemy_damage = np.maximum(batch["enemy_strength"] - batch["strength"] // 4, 1)
+
+    special = batch["action"] == ACTION_CODES[combat_system.SPECIAL]
+    class_code = batch["class_code"]
+    player_damage = np.select(
+        [special & (class_code == WARRIOR), special & (class_code == MAGE), special & (class_code == CLERIC)],
+        [batch["strength"] * 2, batch["magic"] * 2, 0],
+        default=attack_damage
+    )
+    rogue_special = special & (class_code == ROGUE)
+    cleric_special = special & (class_code == CLERIC)
+
+    # Working arrays for the battles still in progress
+    index = np.arange(count)
+    health = batch["health"].copy()
+    max_health = batch["max_health"]
+    strength = batch["strength"]
+    enemy_health = batch["enemy_health"].copy()
+
+    turn_numbers = itertools.count(1) if max_turns is None else range(1, max_turns + 1)
+    for turn in turn_numbers:
+        if index.size == 0:
+            break
+
+        damage = player_damage
+        if rogue_special.any():
+            rolls = rng.integers(1, 3, size=index.size)
+            critical = np.where(rolls == 1, strength * 2, strength * 3)
+            damage = np.where(rogue_special, critical, damage)
+        enemy_health = enemy_health - damage
+        health = np.where(cleric_special, np.maximum(health + 30, max_health), health)
+
+        won = enemy_health <= 0
+        health = np.where(won, health, np.maximum(health - enemy_damage, 0))
+        lost = ~won & (health <= 0)
+
+        done = won | lost
+        if done.any():
+            finished = index[done]
+            winner[finished] = np.where(won[done], PLAYER, ENEMY)
+            turns[finished] = turn
+            keep = ~done
+            index = index[keep]
+            health = health[keep]
+            enemy_health = enemy_health[keep]
+            max_health = max_health[keep]
+            strength = strength[keep]
+            player_damage = player_damage[keep]
+            enemy_damage = enemy_damage[keep]
+            rogue_special = rogue_special[keep]
+            cleric_special = cleric_special[keep]
+
+    victories = winner == PLAYER
+    return {
+        "winner": winner,
+        "turns": turns,
+        "xp": np.where(victories, batch["xp_reward"], 0),
+        "gold": np.where(victories, batch["gold_reward"], 0)
+    }
+
+
+def summarize_batch(result, start=0, stop=None):
+    """
+    Summarize batch results (optionally just the slice start:stop)
+
+    Returns: Dictionary with the same keys as
+             battle_simulator.simulate_battles
+    """
+    winner = result["winner"][start:stop]
+    battles = len(winner)
+    wins = int(np.count_nonzero(winner == PLAYER))
+    return {
+        "battles": battles,
+        "wins": wins,
+        "losses": int(np.count_nonzero(winner == ENEMY)),
+        "escapes": 0,
+        "draws": int(np.count_nonzero(winner == DRAW)),
+        "win_rate": wins / battles,
+        "mean_turns": float(result["turns"][start:stop].mean()),
+        "xp_per_battle": float(result["xp"][start:stop].mean()),
+        "gold_per_battle": float(result["gold"][start:stop].mean())
+    }
+
+
+# ============================================================================
+# BALANCE SWEEPS
+# ============================================================================
+
+def sweep(classes, levels, enemy_types, battles=1000, action=combat_system.SPECIAL,
+          seed=None, max_turns=combat_system.DEFAULT_MAX_TURNS):
+    """
+    Simulate every class x level x enemy combination in one batch
+
+    Returns: Dictionary {(class, level, enemy_type): summary}
+    """
+    keys = []
+    batches = []
+    for character_class in classes:
+        for level in levels:
+            for enemy_type in enemy_types:
+                keys.append((character_class, level, enemy_type))
+                batches.append(make_batch(character_class, level, enemy_type, battles, action))
+
+    result = run_batch(concat_batches(batches), np.random.default_rng(seed), max_turns)
+    summaries = {}
+    for position, key in enumerate(keys):
+        summaries[key] = summarize_batch(result, position * battles, (position + 1) * battles)
+    return summaries
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== BATCH COMBAT TEST ===")
+
+    results = sweep(["Warrior", "Mage", "Rogue", "Cleric"], range(1, 7),
+                    ["goblin", "orc", "dragon"], battles=1000, seed=1)
+    for (character_class, level, enemy_type), summary in results.items():
+        print(f"{character_class:8} L{level} vs {enemy_type:7}: {summary['win_rate']:6.1%} "
+              f"in {summary['mean_turns']:.2f} turns")
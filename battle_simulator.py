@@ -0,0 +1,180 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Simulator Module
+
+Name: Samaya Sartin
+
+This module runs many headless battles across worker processes and
+summarizes the results for balance testing.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import character_manager
+import combat_system
+
+# Named policies that can be sent to worker processes
+POLICIES = {
+    "attack": combat_system.attack_policy,
+    "special": combat_system.special_policy
+}
+
+# Each worker gets this many chunks so faster workers can pick up the slack
+CHUNKS_PER_WORKER = 4
+
+
+# ============================================================================
+# CHARACTER BUILDS
+# ============================================================================
+
+def build_character(character_class, level=1, name="Simulated"):
+    """
+    Create a character of the given class already raised to a level
+
+    Uses the normal level up rules, so stats match a character who earned
+    the levels in game.
+
+    Returns: Character dictionary
+    Raises: InvalidCharacterClassError if class is not valid
+    """
+    character = character_manager.create_character(name, character_class)
+    xp_needed = 0
+    for current_level in range(1, level):
+        xp_needed += current_level * 100
+    if xp_needed > 0:
+        character_manager.gain_experience(character, xp_needed)
+    return character
+
+
+def resolve_policy(policy):
+    """
+    Turn a policy name into the policy function
+
+    Lists of scripted actions and policy functions are returned unchanged.
+
+    Raises: ValueError if the policy name is not recognized
+    """
+    if isinstance(policy, str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown battle policy: {policy}")
+        return POLICIES[policy]
+    return policy
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def simulate_battles(character_class, level, enemy_type, policy="attack", battles=1000,
+                     workers=None, seed=None, max_turns=combat_system.DEFAULT_MAX_TURNS):
+    """
+    Run many independent battles for one character build and enemy type
+
+    Args:
+        character_class: Warrior, Mage, Rogue or Cleric
+        level: Character level to simulate
+        enemy_type: Enemy type for create_enemy
+        policy: Policy name, list of scripted actions, or a module-level
+                policy function (it has to be sent to worker processes)
+        battles: Number of battles to run
+        workers: Number of worker processes (default: every core, 1 runs
+                 in this process)
+        seed: Base seed; each chunk of battles gets its own RNG stream
+              derived from it, so a seed and worker count always give
+              the same results
+        max_turns: Turn limit for each battle
+
+    Returns: Dictionary with 'battles', 'wins', 'losses', 'escapes', 'draws',
+             'win_rate', 'mean_turns', 'xp_per_battle' and 'gold_per_battle'
+    Raises:
+        InvalidCharacterClassError if class is not valid
+        InvalidTargetError if enemy_type not recognized
+        ValueError if battles is not positive or policy is unknown
+    """
+    if battles <= 0:
+        raise ValueError("Number of battles must be positive")
+    character = build_character(character_class, level)
+    enemy = combat_system.create_enemy(enemy_type)
+    policy = resolve_policy(policy)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    chunk_count = min(battles, workers * CHUNKS_PER_WORKER)
+    jobs = []
+    for index in range(chunk_count):
+        count = battles // chunk_count
+        if index < battles % chunk_count:
+            count += 1
+        jobs.append((character, enemy, policy, count, f"{seed}:{index}", max_turns))
+
+    if workers == 1:
+        partials = [run_battle_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(run_battle_chunk, jobs))
+
+    return summarize_results(partials)
+
+
+def run_battle_chunk(job):
+    """
+    Run one chunk of battles (called inside a worker process)
+
+    Args:
+        job: Tuple (character, enemy, policy, count, seed_key, max_turns)
+
+    Returns: Dictionary of totals for the chunk
+    """
+    character, enemy, policy, count, seed_key, max_turns = job
+    rng = random.Random(seed_key)
+    totals = {"battles": count, "player": 0, "enemy": 0, "escape": 0, "draw": 0,
+              "turns": 0, "xp": 0, "gold": 0}
+    run_battle = combat_system.run_battle
+    for _ in range(count):
+        result = run_battle(dict(character), dict(enemy), policy, rng=rng, max_turns=max_turns,
+                            apply_rewards=False, record_events=False)
+        totals[result["winner"]] += 1
+        totals["turns"] += result["turns"]
+        totals["xp"] += result["xp_gained"]
+        totals["gold"] += result["gold_gained"]
+    return totals
+
+
+def summarize_results(partials):
+    """
+    Combine chunk totals into the final simulation summary
+
+    Returns: Dictionary of battle counts, win rate and per-battle averages
+    """
+    combined = {}
+    for partial in partials:
+        for key, value in partial.items():
+            combined[key] = combined.get(key, 0) + value
+    battles = combined["battles"]
+    return {
+        "battles": battles,
+        "wins": combined["player"],
+        "losses": combined["enemy"],
+        "escapes": combined["escape"],
+        "draws": combined["draw"],
+        "win_rate": combined["player"] / battles,
+        "mean_turns": combined["turns"] / battles,
+        "xp_per_battle": combined["xp"] / battles,
+        "gold_per_battle": combined["gold"] / battles
+    }
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== BATTLE SIMULATOR TEST ===")
+
+    summary = simulate_battles("Rogue", 4, "orc", policy="special", battles=100000, seed=1)
+    print(f"Level 4 Rogue vs Orc: {summary['win_rate']:.1%} win rate, "
+          f"{summary['mean_turns']:.2f} turns per battle")
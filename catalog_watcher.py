@@ -0,0 +1,209 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Watcher Module
+
+Name: Samaya Sartin
+
+This module watches the quest and item data files and reloads them while
+the game is running. Only blocks whose text changed are parsed again.
+"""
+
+import os
+
+import game_data
+from custom_exceptions import CorruptedDataError
+
+
+class CatalogFile:
+    """
+    One watched data file and the parsed blocks from its last load
+
+    Blocks are cached by their text, so a reload only parses blocks that
+    were added or edited since the last version.
+    """
+
+    def __init__(self, filename, parse_block, id_field):
+        """
+        Initialize a watched file
+
+        Args:
+            filename: Path to the data file
+            parse_block: game_data.parse_quest_block or parse_item_block
+            id_field: Key holding the record's ID ("quest_id" or "item_id")
+        """
+        self.filename = filename
+        self.parse_block = parse_block
+        self.id_field = id_field
+        self.signature = None
+        self.blocks = {}
+        self.reparsed = 0
+
+    def current_signature(self):
+        """
+        Get the file's (mtime, size) so changes can be spotted with one stat
+
+        Returns: Tuple, or None if the file is missing right now
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def read_blocks(self):
+        """
+        Read the file and split it into blocks
+
+        Returns: List of blocks (tuples of stripped lines)
+        Raises: CorruptedDataError if the file can't be read
+        """
+        try:
+            with open(self.filename, "r") as file:
+                return [tuple(block) for block in game_data.iter_data_blocks(file)]
+        except (OSError, UnicodeDecodeError):
+            raise CorruptedDataError(f"Could not read {self.filename} (Corrupted File)")
+
+    def prime(self, catalog):
+        """
+        Fill the block cache from an already loaded catalog
+
+        Lets the watcher start from catalogs loaded elsewhere (e.g. from a
+        snapshot) without parsing every block again.
+        """
+        self.signature = self.current_signature()
+        prefix = self.id_field.upper() + ": "
+        self.blocks = {}
+        for block in self.read_blocks():
+            for line in block:
+                if line.startswith(prefix):
+                    record = catalog.get(line[len(prefix):].strip())
+                    if record is not None:
+                        self.blocks[block] = record
+                    break
+
+    def load(self):
+        """
+        Build a new catalog and keep it as the last loaded version
+
+        Returns: Dictionary {record_id: record}
+        Raises: InvalidDataFormatError if a changed block is malformed
+        """
+        catalog, state = self.build()
+        self.commit(state)
+        return catalog
+
+    def build(self):
+        """
+        Build a new catalog, parsing only blocks not seen in the last version
+
+        The block cache and signature are left alone until commit() is
+        called, so a version that is rejected later is parsed again (and
+        reported again) on the next poll.
+
+        Returns: Tuple (catalog dictionary, state to pass to commit)
+        Raises: InvalidDataFormatError if a changed block is malformed
+        """
+        signature = self.current_signature()
+        blocks = {}
+        catalog = {}
+        reparsed = 0
+        for block in self.read_blocks():
+            record = self.blocks.get(block)
+            if record is None:
+                record = self.parse_block(list(block))
+                reparsed += 1
+            blocks[block] = record
+            catalog[record[self.id_field]] = record
+
+        return catalog, (blocks, signature, reparsed)
+
+    def commit(self, state):
+        """Keep a version from build() as the last loaded version"""
+        self.blocks, self.signature, self.reparsed = state
+
+
+class CatalogWatcher:
+    """
+    Watches the quest and item files and swaps in new catalog versions
+
+    The current catalogs are always complete dictionaries: a new version is
+    built on the side and swapped in with a single assignment, so readers
+    never see a half-updated catalog.
+    """
+
+    def __init__(self, quest_file="data/quests.txt", item_file="data/items.txt",
+                 quests=None, items=None):
+        """
+        Initialize the watcher and load (or adopt) the current catalogs
+
+        Args:
+            quest_file: Path to the quest data file
+            item_file: Path to the item data file
+            quests: Quest catalog that is already loaded (optional)
+            items: Item catalog that is already loaded (optional)
+        """
+        self.quest_source = CatalogFile(quest_file, game_data.parse_quest_block, "quest_id")
+        self.item_source = CatalogFile(item_file, game_data.parse_item_block, "item_id")
+        self.version = 1
+
+        if quests is None:
+            quests = self.quest_source.load()
+        else:
+            self.quest_source.prime(quests)
+        if items is None:
+            items = self.item_source.load()
+        else:
+            self.item_source.prime(items)
+        self.quests = quests
+        self.items = items
+
+    def poll(self, validate=None):
+        """
+        Check both files and reload whichever changed
+
+        A file that is missing (e.g. mid-replace) is skipped until it is
+        back. Both new catalogs are built first and swapped in together:
+        if a changed file fails to parse or validate rejects the new
+        version, the previous catalogs and version stay in place and the
+        error is raised.
+
+        Args:
+            validate: Optional function called as validate(quests, items)
+                      on the new version; raise to reject it
+
+        Returns: True if a new catalog version was swapped in
+        Raises: InvalidDataFormatError, CorruptedDataError, or whatever
+                validate raises
+        """
+        updates = []
+        catalogs = {"quests": self.quests, "items": self.items}
+        for source, attribute in [(self.quest_source, "quests"), (self.item_source, "items")]:
+            signature = source.current_signature()
+            if signature is None or signature == source.signature:
+                continue
+            catalog, state = source.build()
+            catalogs[attribute] = catalog
+            updates.append((source, state))
+        if not updates:
+            return False
+
+        if validate is not None:
+            validate(catalogs["quests"], catalogs["items"])
+        for source, state in updates:
+            source.commit(state)
+        self.quests = catalogs["quests"]
+        self.items = catalogs["items"]
+        self.version += 1
+        return True
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== CATALOG WATCHER TEST ===")
+
+    watcher = CatalogWatcher()
+    print(f"Watching {len(watcher.quests)} quests and {len(watcher.items)} items")
+    print(f"Changed since start: {watcher.poll()}")
@@ -12,6 +12,21 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import json
+import math
+import numbers
+import struct
+import tempfile
+import threading
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from game_data import STAT_NAMES, QuestNumbers, QuestSet
+from inventory_system import Inventory, format_inventory_field, item_counts
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -20,6 +35,203 @@ from custom_exceptions import (
     CharacterDeadError
 )
 
+# Fields stored for every character, in save file order
+SAVE_FIELDS = ["name", "class", "level", "health", "max_health", "strength", "magic",
+               "experience", "gold", "inventory", "active_quests", "completed_quests"]
+
+# Fields holding lists of IDs (comma separated in save files)
+LIST_FIELDS = ["inventory", "active_quests", "completed_quests"]
+
+# Append-only journal of character changes, kept in the save directory
+JOURNAL_FILENAME = "journal.log"
+
+
+# ============================================================================
+# CHARACTER RECORD
+# ============================================================================
+
+# Character keys stored in slots, and the attribute used for each
+# ("class" is a Python keyword, so it is stored as character_class)
+CHARACTER_SLOTS = {
+    "name": "name",
+    "class": "character_class",
+    "level": "level",
+    "health": "health",
+    "max_health": "max_health",
+    "strength": "strength",
+    "magic": "magic",
+    "experience": "experience",
+    "gold": "gold",
+    "inventory": "inventory",
+    "active_quests": "active_quests",
+    "completed_quests": "completed_quests",
+    "equipped_weapon": "equipped_weapon",
+    "equipped_armor": "equipped_armor"
+}
+
+
+class Character(MutableMapping):
+    """
+    Character data stored in __slots__ instead of a dictionary
+
+    Works anywhere a character dictionary does: character["health"],
+    character.get("equipped_weapon"), "gold" in character, dict(character)
+    and so on. Fields can also be read as attributes (character.health,
+    character.character_class), which skips the key lookup.
+
+    Keys that aren't character fields are kept in a small overflow
+    dictionary, so code that stores extra values on a character still works.
+
+    Stats can also carry modifier layers (equipment, buffs). The attributes
+    hold base stats, while character["strength"] etc. give the effective
+    value (base + every modifier); writing an effective value through the
+    dictionary view updates the base stat underneath. Modifier totals are
+    cached and only recomputed when a modifier is added or removed.
+    """
+
+    # quest_totals caches quest_handler.get_quest_totals; like the other
+    # extras it is not part of the dictionary view
+    __slots__ = tuple(CHARACTER_SLOTS.values()) + ("extra", "modifiers", "bonuses", "quest_totals")
+
+    def __init__(self, data=None, **fields):
+        """Create a character from a dictionary and/or keyword fields"""
+        self.extra = None
+        self.modifiers = None
+        self.bonuses = None
+        self.quest_totals = None
+        if data is not None:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a character from any character mapping
+
+        A list inventory (e.g. freshly parsed from a save) becomes an
+        Inventory, and quest lists become QuestSets.
+        """
+        character = cls(data)
+        if isinstance(character.get("inventory"), list):
+            character.inventory = Inventory(character.inventory)
+        for field in ["active_quests", "completed_quests"]:
+            if isinstance(character.get(field), list):
+                character[field] = QuestSet(character[field])
+        return character
+
+    def __getitem__(self, key):
+        # Hot path: one lookup for the slot, one for the value, and the
+        # bonus check only when modifiers are active
+        try:
+            value = getattr(self, CHARACTER_SLOTS[key])
+        except KeyError:
+            if self.extra is not None and key in self.extra:
+                return self.extra[key]
+            raise
+        except AttributeError:
+            raise KeyError(key) from None
+        bonuses = self.bonuses
+        if bonuses is None or key not in bonuses:
+            return value
+        return value + bonuses[key]
+
+    def __setitem__(self, key, value):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is not None:
+            if self.bonuses is not None and key in self.bonuses:
+                value -= self.bonuses[key]
+            setattr(self, slot, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is not None:
+            try:
+                delattr(self, slot)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is not None:
+            return hasattr(self, slot)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for key, slot in CHARACTER_SLOTS.items():
+            if hasattr(self, slot):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Shallow copy, like dict.copy() (modifier layers are kept)"""
+        character = Character()
+        for slot in self.__slots__:
+            if hasattr(self, slot):
+                setattr(character, slot, getattr(self, slot))
+        if self.extra is not None:
+            character.extra = dict(self.extra)
+        if self.modifiers is not None:
+            character.modifiers = dict(self.modifiers)
+        return character
+
+    def add_modifier(self, source, effects):
+        """
+        Add a modifier layer, replacing any earlier one from the same source
+
+        Args:
+            source: Name of the layer (e.g. "weapon", "armor", "buff:rage")
+            effects: Tuple of (stat_index, value) pairs (see game_data.STAT_NAMES)
+        """
+        if self.modifiers is None:
+            self.modifiers = {}
+        self.modifiers[source] = tuple(effects)
+        self.refresh_bonuses()
+
+    def remove_modifier(self, source):
+        """
+        Remove a modifier layer
+
+        Returns: The layer's effects, or None if there was no such layer
+        """
+        if self.modifiers is None or source not in self.modifiers:
+            return None
+        effects = self.modifiers.pop(source)
+        self.refresh_bonuses()
+        return effects
+
+    def refresh_bonuses(self):
+        """Recompute the cached per-stat totals of every modifier layer"""
+        bonuses = {}
+        for effects in self.modifiers.values():
+            for stat_index, value in effects:
+                stat = STAT_NAMES[stat_index]
+                bonuses[stat] = bonuses.get(stat, 0) + value
+        self.bonuses = bonuses or None
+
+    def base_stats(self):
+        """Stats without any modifiers, as a dictionary"""
+        return {stat: getattr(self, stat) for stat in STAT_NAMES}
+
+    def effective_stats(self):
+        """Stats with every modifier applied, as a dictionary"""
+        return {stat: self[stat] for stat in STAT_NAMES}
+
+    def __repr__(self):
+        return f"Character({dict(self)!r})"
+
 
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
@@ -31,7 +243,7 @@ def create_character(name, character_class):
 
     Valid classes: Warrior, Mage, Rogue, Cleric
 
-    Returns: Dictionary with character data including:
+    Returns: Character (works like a dictionary) with data including:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
 
@@ -57,7 +269,7 @@ def create_character(name, character_class):
         health = 100
         strength = 10
         magic = 15
-    return {
+    return Character({
         "name": name,
         "class": character_class,
         "level": 1,
@@ -67,10 +279,10 @@ def create_character(name, character_class):
         "magic": magic,
         "experience": 0,
         "gold": 100,
-        "inventory": [],
-        "active_quests": [],
-        "completed_quests": []
-    }
+        "inventory": Inventory(),
+        "active_quests": QuestSet(),
+        "completed_quests": QuestSet()
+    })
 
     # Validate character_class first
     # Example base stats:
@@ -81,7 +293,7 @@ def create_character(name, character_class):
 
     # All characters start with:
     # - level=1, experience=0, gold=100
-    # - inventory=[], active_quests=[], completed_quests=[]
+    # - inventory=Inventory(), active_quests=QuestSet(), completed_quests=QuestSet()
 
     # Raise InvalidCharacterClassError if class not in valid list
 
@@ -112,19 +324,11 @@ def save_character(character, save_directory="data/save_games"):
         os.makedirs(save_directory) # if not creates one
     filename = f"{character['name']}_save.txt"
     filepath = os.path.join(save_directory, filename) #joins saved directory with file name so that it actually saves
-    with open(filepath, "w") as file:
-        file.write(f"NAME: {character['name']}\n")
-        file.write(f"CLASS: {character['class']}\n")
-        file.write(f"LEVEL: {character['level']}\n")
-        file.write(f"HEALTH: {character['health']}\n")
-        file.write(f"MAX HEALTH: {character['max_health']}\n")
-        file.write(f"STRENGTH: {character['strength']}\n")
-        file.write(f"MAGIC: {character['magic']}\n")
-        file.write(f"EXPERIENCE: {character['experience']}\n")
-        file.write(f"GOLD: {character['gold']}\n")
-        file.write(f"INVENTORY: {','.join(character['inventory'])}\n")
-        file.write(f"ACTIVE QUESTS: {','.join(character['active_quests'])}\n") #lists of active quests is seperated by commas like needed
-        file.write(f"COMPLETED QUESTS: {','.join(character['completed_quests'])}\n")
+    write_file_atomically(filepath, format_save_data(character))
+    # Earlier journal entries for this character are now out of date
+    journal_path = os.path.join(save_directory, JOURNAL_FILENAME)
+    if os.path.isfile(journal_path):
+        append_journal_record(journal_path, {"name": character["name"], "saved": True})
 
     return True
 
@@ -133,6 +337,8 @@ def load_character(character_name, save_directory="data/save_games"):
     """
     Load character from save file
 
+    Reads the text save, or the binary save if there is no text save.
+
     Args:
         character_name: Name of character to load
         save_directory: Directory containing save files
@@ -146,7 +352,8 @@ def load_character(character_name, save_directory="data/save_games"):
     # Check if file exists → CharacterNotFoundError
     filename = os.path.join(save_directory, f"{character_name}_save.txt")
     if not os.path.isfile(filename):
-        raise CharacterNotFoundError(f"{character_name} is not a valid save file.")
+        # Characters migrated with remove_text=True only have a binary save
+        return load_character_binary(character_name, save_directory)
     # Try to read file → SaveFileCorruptedError
     try:
         with open(filename, "r") as file:
@@ -154,18 +361,32 @@ def load_character(character_name, save_directory="data/save_games"):
     except:
         raise SaveFileCorruptedError(f"Could not read {character_name}'s save file (Corrupted File)")
     # Validate data format → InvalidSaveDataError
+    return Character.from_dict(parse_save_lines(lines))
+
+
+def parse_save_lines(lines):
+    """
+    Parse the lines of a text save file into a character dictionary
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if data format is wrong
+    """
     character = {}
     try:
         for line in lines:
             if ":" not in line:
                 raise InvalidSaveDataError("Bad line format")
             key, value = line.strip().split(":", 1)
-            key = key.strip().upper()
+            # Older saves wrote "MAX HEALTH" and "ACTIVE QUESTS" with spaces
+            key = key.strip().upper().replace(" ", "_")
             value = value.strip()
 
             if key in ["LEVEL", "HEALTH", "MAX_HEALTH", "STRENGTH", "MAGIC", "EXPERIENCE", "GOLD"]:
                 character[key.lower()] = int(value)
-            elif key in ["INVENTORY", "ACTIVE_QUESTS", "COMPLETED_QUESTS"]:
+            elif key == "INVENTORY":
+                # Repeated items may be written as "item_id*quantity"
+                character["inventory"] = Inventory.from_save_field(value)
+            elif key in ["ACTIVE_QUESTS", "COMPLETED_QUESTS"]:
                 character[key.lower()] = value.split(",") if value else []
             elif key in ["NAME", "CLASS"]:
                 character[key.lower()] = value
@@ -180,33 +401,167 @@ def list_saved_characters(save_directory="data/save_games"):
     """
     Get list of all saved character names
 
+    Includes characters that only have a binary save (_save.bin).
+
     Returns: List of character names (without _save.txt extension)
     """
+    return list(scan_save_formats(save_directory))
+
+
+def scan_save_formats(save_directory):
+    """
+    Map each saved character to the format of its save file
+
+    Reads the directory once. A character with both a text and a binary
+    save is loaded from the text save.
+
+    Returns: Dictionary {name: "text" or "binary"}, text saves first
+    """
     if not os.path.exists(save_directory):
-        return []
+        return {}
 
     files = os.listdir(save_directory)
-    save_files = [f for f in files if f.endswith("_save.txt")]
-    names = [f.replace("_save.txt", "") for f in save_files]
+    formats = {f[:-len("_save.txt")]: "text" for f in files if f.endswith("_save.txt")}
+    for f in files:
+        if f.endswith("_save.bin"):
+            formats.setdefault(f[:-len("_save.bin")], "binary")
+    return formats
+
+
+def list_save_names(save_directory, suffix):
+    """
+    Get the character names of save files ending with suffix
+
+    Returns: List of character names
+    """
+    if not os.path.exists(save_directory):
+        return []
 
-    return names
+    files = os.listdir(save_directory)
+    return [f[:-len(suffix)] for f in files if f.endswith(suffix)]
 
 def delete_character(character_name, save_directory="data/save_games"):
     """
-    Delete a character's save file
+    Delete a character's save files (text and binary)
 
     Returns: True if deleted successfully
     Raises: CharacterNotFoundError if character doesn't exist
     """
-    filepath = os.path.join(save_directory, f"{character_name}_save.txt")
-    if os.path.isfile(filepath):
-        os.remove(filepath)
+    deleted = False
+    for suffix in ["_save.txt", "_save.bin"]:
+        filepath = os.path.join(save_directory, f"{character_name}{suffix}")
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+            deleted = True
+    if deleted:
         return True
     else:
         raise CharacterNotFoundError(f"{character_name} is not a valid save file.")
     # Verify file exists before attempting deletion
 
 
+# ============================================================================
+# BULK ROSTER OPERATIONS
+# ============================================================================
+
+# Threads used for bulk save file I/O
+ROSTER_WORKERS = 8
+
+
+def load_characters(character_names=None, save_directory="data/save_games", workers=ROSTER_WORKERS):
+    """
+    Load many characters at once
+
+    Scans the save directory once, then reads the save files on a thread
+    pool. A character that fails to load doesn't stop the others.
+
+    Args:
+        character_names: Names to load (default: every saved character)
+        save_directory: Directory containing save files
+        workers: Number of I/O threads
+
+    Returns: Dictionary with:
+             'loaded': {name: Character}
+             'errors': {name: CharacterNotFoundError, SaveFileCorruptedError
+                        or InvalidSaveDataError}
+    """
+    save_formats = scan_save_formats(save_directory)
+    if character_names is None:
+        character_names = list(save_formats)
+
+    loaded = {}
+    errors = {}
+    to_read = []
+    for name in character_names:
+        if name in save_formats:
+            to_read.append(name)
+        else:
+            errors[name] = CharacterNotFoundError(f"{name} is not a valid save file.")
+
+    def read_save(name):
+        if save_formats[name] == "binary":
+            try:
+                return name, load_character_binary(name, save_directory)
+            except (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError) as e:
+                return name, e
+        try:
+            with open(os.path.join(save_directory, f"{name}_save.txt"), "r") as file:
+                lines = file.readlines()
+        except OSError:
+            return name, SaveFileCorruptedError(f"Could not read {name}'s save file (Corrupted File)")
+        try:
+            return name, Character.from_dict(parse_save_lines(lines))
+        except InvalidSaveDataError as e:
+            return name, e
+
+    if to_read:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for name, result in executor.map(read_save, to_read):
+                if isinstance(result, Exception):
+                    errors[name] = result
+                else:
+                    loaded[name] = result
+    return {"loaded": loaded, "errors": errors}
+
+
+def save_characters(characters, save_directory="data/save_games", workers=ROSTER_WORKERS):
+    """
+    Save many characters at once
+
+    Creates the save directory once, then writes the save files on a
+    thread pool. A character that fails to save doesn't stop the others.
+
+    Returns: Dictionary with:
+             'saved': list of names saved
+             'errors': {name: error that stopped the save}
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+
+    def write_save(character):
+        try:
+            filepath = os.path.join(save_directory, f"{character['name']}_save.txt")
+            write_file_atomically(filepath, format_save_data(character))
+        except Exception as e:
+            return character["name"], e
+        return character["name"], None
+
+    saved = []
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name, error in executor.map(write_save, characters):
+            if error is None:
+                saved.append(name)
+            else:
+                errors[name] = error
+
+    journal_path = os.path.join(save_directory, JOURNAL_FILENAME)
+    if saved and os.path.isfile(journal_path):
+        for name in saved:
+            append_journal_record(journal_path, {"name": name, "saved": True})
+    return {"saved": saved, "errors": errors}
+
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -223,19 +578,132 @@ def gain_experience(character, xp_amount):
     - Increase magic by 2
     - Restore health to max_health
 
+    Any number of level ups is worked out in one step (see
+    calculate_level_ups), so huge XP grants cost the same as small ones.
+
+    Returns: Number of levels gained
     Raises: CharacterDeadError if character health is 0
     """
     # Check if character is dead first
     if character["health"] == 0:
         raise CharacterDeadError(f"{character['name']} is dead")
     character["experience"] += xp_amount
-    while character["experience"] >= character["level"] * 100:
-        character["experience"] -= character["level"] * 100
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
-        character["health"] = character["max_health"]
+    levels, character["experience"] = calculate_level_ups(character["level"], character["experience"])
+    if levels > 0:
+        apply_level_ups(character, levels)
+    return levels
+
+
+def calculate_level_ups(level, experience):
+    """
+    Work out how many level ups a pile of experience pays for
+
+    Going from level L up k levels costs L*100 + (L+1)*100 + ... which is
+    50k^2 + (100L - 50)k, so k is the largest whole root of that quadratic.
+
+    Args:
+        level: Current level
+        experience: Experience held, including any new XP
+
+    Returns: Tuple (levels_gained, experience_left)
+    """
+    if experience < level * 100:
+        return 0, experience
+    # 50k^2 + 50(2L-1)k <= E  is the same as  (2k + 2L-1)^2 <= (2L-1)^2 + 4*(E//50)
+    b = 2 * level - 1
+    levels = (math.isqrt(b * b + 4 * (experience // 50)) - b) // 2
+    return levels, experience - level_up_cost(level, levels)
+
+
+def level_up_cost(level, levels):
+    """Total XP needed to go up levels levels starting from level"""
+    return 50 * levels * levels + (100 * level - 50) * levels
+
+
+def apply_level_ups(character, levels):
+    """Raise a character's level and stats by levels level ups and restore health"""
+    character["level"] += levels
+    character["max_health"] += 10 * levels
+    character["strength"] += 2 * levels
+    character["magic"] += 2 * levels
+    character["health"] = character["max_health"]
+
+
+# Largest experience and level gain_experience_batch works out with NumPy;
+# keeps (2L-1)^2 + 4*(E//50) well inside int64 and the float square root
+# within the +-1 correction
+BATCH_XP_LIMIT = 2 ** 60
+BATCH_LEVEL_LIMIT = 2 ** 20
+
+
+def gain_experience_batch(characters, xp_amount):
+    """
+    Give experience to a whole roster at once (e.g. event-wide XP grants)
+
+    Uses NumPy to work out every character's level ups together when it is
+    installed, otherwise the same math runs one character at a time (as it
+    also does for characters whose numbers are too big for int64 arrays).
+    Dead characters are skipped instead of stopping the grant.
+
+    Args:
+        characters: List of characters
+        xp_amount: XP for everyone, or a list with one amount per character
+
+    Returns: Dictionary with 'levels_gained' (one count per character, 0 for
+             skipped characters) and 'dead' (names of skipped characters)
+    """
+    if isinstance(xp_amount, numbers.Integral):
+        amounts = [int(xp_amount)] * len(characters)
+    else:
+        amounts = [int(amount) for amount in xp_amount]
+        if len(amounts) != len(characters):
+            raise ValueError("Need one XP amount per character")
+
+    alive = [i for i, character in enumerate(characters) if character["health"] != 0]
+    result = {
+        "levels_gained": [0] * len(characters),
+        "dead": [character["name"] for character in characters if character["health"] == 0]
+    }
+    if not alive:
+        return result
+
+    if np is not None:
+        # Huge values would overflow the int64 arrays; do those one at a time
+        fits = {i: fits_batch_xp(characters[i], amounts[i]) for i in alive}
+        scalar = [i for i in alive if not fits[i]]
+        alive = [i for i in alive if fits[i]]
+    else:
+        scalar = alive
+        alive = []
+    for i in scalar:
+        result["levels_gained"][i] = gain_experience(characters[i], amounts[i])
+    if not alive:
+        return result
+
+    level = np.array([characters[i]["level"] for i in alive], dtype=np.int64)
+    experience = np.array([characters[i]["experience"] + amounts[i] for i in alive], dtype=np.int64)
+    b = 2 * level - 1
+    bound = b * b + 4 * np.maximum(experience // 50, 0)
+    root = np.floor(np.sqrt(bound.astype(np.float64))).astype(np.int64)
+    # Fix float rounding so root is the exact integer square root
+    root -= root * root > bound
+    root += (root + 1) * (root + 1) <= bound
+    levels = np.where(experience >= level * 100, (root - b) // 2, 0)
+    experience -= 50 * levels * levels + (100 * level - 50) * levels
+
+    for i, gained, left in zip(alive, levels.tolist(), experience.tolist()):
+        character = characters[i]
+        character["experience"] = left
+        if gained > 0:
+            apply_level_ups(character, gained)
+        result["levels_gained"][i] = gained
+    return result
+
+
+def fits_batch_xp(character, xp_amount):
+    """Check whether a character's XP grant can be worked out in int64 arrays"""
+    experience = character["experience"] + xp_amount
+    return -BATCH_XP_LIMIT < experience < BATCH_XP_LIMIT and 0 < character["level"] < BATCH_LEVEL_LIMIT
 
 
 def add_gold(character, amount):
@@ -297,6 +765,736 @@ def revive_character(character):
         raise CharacterDeadError("Character is alive and cannot be revived.")
 
 
+# ============================================================================
+# CRASH-SAFE SAVING
+# ============================================================================
+
+def format_save_data(character):
+    """
+    Build the text of a save file
+
+    Returns: String with one "KEY: value" line per field in SAVE_FIELDS
+    """
+    lines = []
+    for field in SAVE_FIELDS:
+        if field == "inventory":
+            value = format_inventory_field(character[field])
+        elif field in LIST_FIELDS:
+            value = ",".join(character[field])
+        else:
+            value = character[field]
+        lines.append(f"{field.upper()}: {value}\n")
+    return "".join(lines)
+
+
+# Permissions for newly created save files (rw-r--r--). Fixed rather than
+# derived from the umask, which can only be read by changing it process-wide
+NEW_FILE_MODE = 0o644
+
+
+def write_file_atomically(filepath, text):
+    """
+    Write a file (text or bytes) so it is either fully written or not
+    changed at all
+
+    Writes to a uniquely named temporary file in the same directory (so
+    threads saving the same file don't share it), flushes it to disk,
+    then renames it over the target and flushes the directory so the
+    rename itself survives a crash. A crash part way through leaves the
+    old file in place instead of a truncated one.
+    """
+    directory = os.path.dirname(filepath) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filepath) + ".",
+                                     suffix=".tmp")
+    mode = "wb" if isinstance(text, bytes) else "w"
+    file = None
+    try:
+        # mkstemp files are private (0600); give the save normal permissions
+        try:
+            permissions = os.stat(filepath).st_mode & 0o777
+        except FileNotFoundError:
+            permissions = NEW_FILE_MODE
+        os.chmod(temp_path, permissions)
+        file = os.fdopen(fd, mode)
+        with file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, filepath)
+    except BaseException:
+        # Until fdopen succeeds the raw descriptor is still ours to close
+        if file is None:
+            os.close(fd)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+def fsync_directory(directory):
+    """Flush a directory entry to disk (skipped where directories can't be opened, e.g. Windows)"""
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def append_journal_record(journal_path, record):
+    """Append one JSON record to the journal and flush it to disk"""
+    append_journal_records(journal_path, [record])
+
+
+def append_journal_records(journal_path, records):
+    """Append JSON records to the journal with a single write and flush"""
+    with open(journal_path, "a") as file:
+        file.write("".join(json.dumps(record) + "\n" for record in records))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def journal_record(character, fields=None):
+    """
+    Build the journal record for a character's fields
+
+    Args:
+        character: Character dictionary
+        fields: Fields to record (default: every field in SAVE_FIELDS)
+
+    Returns: Dictionary {"name": ..., "fields": {field: value}}
+    """
+    if fields is None:
+        fields = SAVE_FIELDS
+    values = {}
+    for field in fields:
+        if field in LIST_FIELDS:
+            values[field] = list(character[field])
+        else:
+            values[field] = character[field]
+    return {"name": character["name"], "fields": values}
+
+
+def journal_character_change(character, fields=None, save_directory="data/save_games"):
+    """
+    Record character changes in the journal instead of rewriting the save
+
+    Appending a line is much cheaper than a full save. Changes are applied
+    to the save files by replay_journal (e.g. on the next startup).
+
+    Args:
+        character: Character dictionary
+        fields: Fields that changed (default: every field in SAVE_FIELDS)
+        save_directory: Directory containing save files
+
+    Returns: True if recorded
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+    append_journal_record(os.path.join(save_directory, JOURNAL_FILENAME),
+                          journal_record(character, fields))
+    return True
+
+
+def is_journal_record(record):
+    """
+    Check that a parsed journal line has the shape journal writes produce
+
+    Returns: True for {"name": str, "saved": True} or {"name": str, "fields": dict}
+    """
+    if not isinstance(record, dict) or not isinstance(record.get("name"), str):
+        return False
+    return record.get("saved") is True or isinstance(record.get("fields"), dict)
+
+
+def replay_journal(save_directory="data/save_games"):
+    """
+    Apply journaled changes to the save files, then clear the journal
+
+    A record written after a character's last full save is applied on top
+    of that save. A half-written last line (from a crash) and lines that
+    aren't journal records are ignored.
+    Characters whose journal entries don't add up to a full character and
+    that have no save file are skipped.
+
+    Returns: List of character names whose saves were updated
+    Raises: SaveFileCorruptedError, InvalidSaveDataError if a save can't be loaded
+    """
+    journal_path = os.path.join(save_directory, JOURNAL_FILENAME)
+    if not os.path.isfile(journal_path):
+        return []
+    with open(journal_path, "r") as file:
+        lines = file.readlines()
+
+    pending = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not is_journal_record(record):
+            continue
+        if record.get("saved"):
+            pending.pop(record["name"], None)
+        else:
+            pending.setdefault(record["name"], {}).update(record["fields"])
+
+    replayed = []
+    for name, fields in pending.items():
+        try:
+            character = load_character(name, save_directory)
+        except CharacterNotFoundError:
+            character = {}
+        character.update(fields)
+        try:
+            validate_character_data(character)
+        except InvalidSaveDataError:
+            continue
+        write_file_atomically(os.path.join(save_directory, f"{name}_save.txt"),
+                              format_save_data(character))
+        replayed.append(name)
+
+    os.remove(journal_path)
+    return replayed
+
+
+# ============================================================================
+# BINARY SAVE FORMAT
+# ============================================================================
+
+# Binary saves start with this header: magic bytes + schema version
+BINARY_SAVE_MAGIC = b"QCSV"
+BINARY_SAVE_VERSION = 3
+BINARY_HEADER = struct.Struct("<4sH")
+
+# Numeric stats, packed as signed 32-bit integers in this order
+NUMERIC_FIELDS = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
+BINARY_STATS = struct.Struct("<7i")
+BINARY_INT_MIN = -2**31
+BINARY_INT_MAX = 2**31 - 1
+BINARY_LENGTH = struct.Struct("<H")
+BINARY_QUANTITY = struct.Struct("<I")
+
+# Quest numbering shared by the binary saves in a save directory: one
+# quest ID per line, line N is bit N of the saved quest bitsets. Lines
+# are only ever appended, so numbers in older saves stay valid.
+QUEST_TABLE_FILENAME = "quest_numbers.txt"
+QUEST_TABLE_LOCK = threading.Lock()
+
+
+def load_quest_table(save_directory="data/save_games"):
+    """
+    Read the save directory's quest table
+
+    Returns: QuestNumbers (empty if the directory has no table yet)
+    Raises: SaveFileCorruptedError if the table can't be read
+    """
+    path = os.path.join(save_directory, QUEST_TABLE_FILENAME)
+    try:
+        with open(path, "r") as file:
+            quest_ids = [line.strip() for line in file if line.strip()]
+    except FileNotFoundError:
+        quest_ids = []
+    except (OSError, UnicodeDecodeError):
+        raise SaveFileCorruptedError(f"Could not read {path} (Corrupted File)")
+    return QuestNumbers(quest_ids)
+
+
+def encode_binary_save(character, quest_table=None):
+    """
+    Pack a character into the binary save format
+
+    Layout (little-endian):
+    - Header: b"QCSV" + schema version (uint16)
+    - Stats: level, health, max_health, strength, magic, experience, gold (int32)
+    - Name and class: length (uint16) + UTF-8 bytes
+    - Inventory: number of different items (uint16), then each item ID as
+      length (uint16) + UTF-8 bytes followed by its quantity (uint32)
+    - Active quests, completed quests: bitset length in bytes (uint16),
+      then the bitset (little-endian), numbered by the save directory's
+      quest table
+
+    Without a quest_table, writes a self-contained version 2 save instead,
+    where each quest list is a count (uint16) then each ID as length
+    (uint16) + UTF-8 bytes.
+
+    Args:
+        character: Character dictionary
+        quest_table: QuestNumbers from load_quest_table; quests not in it
+                     yet are added (save the table before the save file)
+
+    Returns: bytes
+    Raises: InvalidSaveDataError if a value doesn't fit its binary field
+    """
+    for field in NUMERIC_FIELDS:
+        value = character[field]
+        if not isinstance(value, numbers.Integral) or not BINARY_INT_MIN <= value <= BINARY_INT_MAX:
+            raise InvalidSaveDataError(f"{field} value {value!r} doesn't fit in a binary save")
+    try:
+        return encode_binary_body(character, quest_table)
+    except struct.error as e:
+        raise InvalidSaveDataError(f"Character doesn't fit in a binary save: {e}")
+
+
+def encode_binary_body(character, quest_table=None):
+    """
+    Pack a character with no range checks (see encode_binary_save)
+
+    Returns: bytes
+    Raises: struct.error if a length or quantity is too large for its field
+    """
+    version = BINARY_SAVE_VERSION if quest_table is not None else 2
+    parts = [BINARY_HEADER.pack(BINARY_SAVE_MAGIC, version),
+             BINARY_STATS.pack(*[character[field] for field in NUMERIC_FIELDS])]
+    for field in ["name", "class"]:
+        parts.append(pack_binary_string(character[field]))
+    counts = item_counts(character["inventory"])
+    parts.append(BINARY_LENGTH.pack(len(counts)))
+    for item_id, quantity in counts.items():
+        parts.append(pack_binary_string(item_id))
+        parts.append(BINARY_QUANTITY.pack(quantity))
+    for field in ["active_quests", "completed_quests"]:
+        if quest_table is not None:
+            bits = quest_table.assign_mask(character[field])
+            data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+            parts.append(BINARY_LENGTH.pack(len(data)) + data)
+            continue
+        values = list(character[field])
+        parts.append(BINARY_LENGTH.pack(len(values)))
+        for value in values:
+            parts.append(pack_binary_string(value))
+    return b"".join(parts)
+
+
+def pack_binary_string(value):
+    """Pack a string as length (uint16) + UTF-8 bytes (struct.error if too long)"""
+    data = value.encode("utf-8")
+    return BINARY_LENGTH.pack(len(data)) + data
+
+
+def decode_binary_save(data, quest_table=None):
+    """
+    Unpack a binary save, using the decoder for its schema version
+
+    Args:
+        data: Binary save bytes
+        quest_table: QuestNumbers from load_quest_table (needed from version 3)
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if the data is not a valid binary save
+    """
+    try:
+        magic, version = BINARY_HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise InvalidSaveDataError("Binary save is too short")
+    if magic != BINARY_SAVE_MAGIC:
+        raise InvalidSaveDataError("Not a binary save file")
+    if version not in BINARY_DECODERS:
+        raise InvalidSaveDataError(f"Unsupported binary save version: {version}")
+    try:
+        return BINARY_DECODERS[version](data, BINARY_HEADER.size, quest_table)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise InvalidSaveDataError(f"Invalid binary save data: {e}")
+
+
+def decode_binary_save_v1(data, offset, quest_table=None):
+    """
+    Decode the body of a version 1 binary save
+
+    Returns: Character dictionary
+    """
+    character = dict(zip(NUMERIC_FIELDS, BINARY_STATS.unpack_from(data, offset)))
+    offset += BINARY_STATS.size
+    for field in ["name", "class"]:
+        character[field], offset = unpack_binary_string(data, offset)
+    for field in LIST_FIELDS:
+        (count,) = BINARY_LENGTH.unpack_from(data, offset)
+        offset += BINARY_LENGTH.size
+        values = []
+        for _ in range(count):
+            value, offset = unpack_binary_string(data, offset)
+            values.append(value)
+        character[field] = values
+    if offset != len(data):
+        raise InvalidSaveDataError("Unexpected data after end of binary save")
+    return character
+
+
+def decode_binary_save_v2(data, offset, quest_table=None):
+    """
+    Decode the body of a version 2 binary save (inventory stored as
+    item ID + quantity pairs)
+
+    Returns: Character dictionary
+    """
+    character = dict(zip(NUMERIC_FIELDS, BINARY_STATS.unpack_from(data, offset)))
+    offset += BINARY_STATS.size
+    for field in ["name", "class"]:
+        character[field], offset = unpack_binary_string(data, offset)
+    (count,) = BINARY_LENGTH.unpack_from(data, offset)
+    offset += BINARY_LENGTH.size
+    inventory = Inventory()
+    for _ in range(count):
+        item_id, offset = unpack_binary_string(data, offset)
+        (quantity,) = BINARY_QUANTITY.unpack_from(data, offset)
+        offset += BINARY_QUANTITY.size
+        if quantity < 1:
+            raise InvalidSaveDataError(f"Binary save has {quantity} of {item_id}")
+        inventory.add(item_id, quantity)
+    character["inventory"] = inventory
+    for field in ["active_quests", "completed_quests"]:
+        (count,) = BINARY_LENGTH.unpack_from(data, offset)
+        offset += BINARY_LENGTH.size
+        values = []
+        for _ in range(count):
+            value, offset = unpack_binary_string(data, offset)
+            values.append(value)
+        character[field] = values
+    if offset != len(data):
+        raise InvalidSaveDataError("Unexpected data after end of binary save")
+    return character
+
+
+def unpack_binary_string(data, offset):
+    """
+    Read a length-prefixed UTF-8 string
+
+    Returns: Tuple (string, offset after the string)
+    """
+    (length,) = BINARY_LENGTH.unpack_from(data, offset)
+    start = offset + BINARY_LENGTH.size
+    if start + length > len(data):
+        raise struct.error("string runs past end of data")
+    return data[start:start + length].decode("utf-8"), start + length
+
+
+def decode_binary_save_v3(data, offset, quest_table=None):
+    """
+    Decode the body of a version 3 binary save (quests stored as bitsets
+    numbered by the save directory's quest table)
+
+    Returns: Character dictionary
+    """
+    if quest_table is None:
+        raise InvalidSaveDataError("Binary save needs its directory's quest table")
+    character = dict(zip(NUMERIC_FIELDS, BINARY_STATS.unpack_from(data, offset)))
+    offset += BINARY_STATS.size
+    for field in ["name", "class"]:
+        character[field], offset = unpack_binary_string(data, offset)
+    (count,) = BINARY_LENGTH.unpack_from(data, offset)
+    offset += BINARY_LENGTH.size
+    inventory = Inventory()
+    for _ in range(count):
+        item_id, offset = unpack_binary_string(data, offset)
+        (quantity,) = BINARY_QUANTITY.unpack_from(data, offset)
+        offset += BINARY_QUANTITY.size
+        if quantity < 1:
+            raise InvalidSaveDataError(f"Binary save has {quantity} of {item_id}")
+        inventory.add(item_id, quantity)
+    character["inventory"] = inventory
+    for field in ["active_quests", "completed_quests"]:
+        (length,) = BINARY_LENGTH.unpack_from(data, offset)
+        offset += BINARY_LENGTH.size
+        if offset + length > len(data):
+            raise struct.error("quest bitset runs past end of data")
+        bits = int.from_bytes(data[offset:offset + length], "little")
+        offset += length
+        if bits.bit_length() > len(quest_table.quest_ids):
+            raise InvalidSaveDataError("Binary save uses quests missing from the quest table")
+        character[field] = quest_table.quest_ids_of(bits)
+    if offset != len(data):
+        raise InvalidSaveDataError("Unexpected data after end of binary save")
+    return character
+
+
+# Decoder for each binary schema version (add one here when the layout changes)
+BINARY_DECODERS = {1: decode_binary_save_v1, 2: decode_binary_save_v2, 3: decode_binary_save_v3}
+
+
+def save_character_binary(character, save_directory="data/save_games"):
+    """
+    Save character in the binary format
+
+    Filename format: {character_name}_save.bin
+
+    Quests are saved as bitsets numbered by the directory's quest table
+    (quest_numbers.txt), which is extended first if the character has
+    quests it doesn't list yet.
+
+    Returns: True if successful
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+    with QUEST_TABLE_LOCK:
+        quest_table = load_quest_table(save_directory)
+        known = len(quest_table.quest_ids)
+        data = encode_binary_save(character, quest_table)
+        if len(quest_table.quest_ids) > known:
+            # The table must list a quest before any save refers to it
+            write_file_atomically(os.path.join(save_directory, QUEST_TABLE_FILENAME),
+                                  "".join(quest_id + "\n" for quest_id in quest_table.quest_ids))
+    filepath = os.path.join(save_directory, f"{character['name']}_save.bin")
+    write_file_atomically(filepath, data)
+    return True
+
+
+def load_character_binary(character_name, save_directory="data/save_games"):
+    """
+    Load character from a binary save file
+
+    Returns: Character dictionary
+    Raises:
+        CharacterNotFoundError if save file doesn't exist
+        SaveFileCorruptedError if file exists but can't be read
+        InvalidSaveDataError if data format is wrong
+    """
+    filename = os.path.join(save_directory, f"{character_name}_save.bin")
+    try:
+        with open(filename, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        raise CharacterNotFoundError(f"{character_name} is not a valid save file.")
+    except OSError:
+        raise SaveFileCorruptedError(f"Could not read {character_name}'s save file (Corrupted File)")
+    return Character.from_dict(decode_binary_save(data, load_quest_table(save_directory)))
+
+
+def migrate_save_to_binary(character_name, save_directory="data/save_games", remove_text=False):
+    """
+    Convert a character's text save into a binary save
+
+    Args:
+        character_name: Character to convert
+        save_directory: Directory containing save files
+        remove_text: Delete the text save once the binary save is written
+
+    Returns: True if migrated
+    Raises: CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError
+    """
+    character = load_character(character_name, save_directory)
+    validate_character_data(character)
+    save_character_binary(character, save_directory)
+    if remove_text:
+        # load_character falls back to the binary save from now on
+        os.remove(os.path.join(save_directory, f"{character_name}_save.txt"))
+    return True
+
+
+def migrate_all_saves_to_binary(save_directory="data/save_games", remove_text=False):
+    """
+    Convert every text save in a directory into a binary save
+
+    Returns: Dictionary {character_name: True or the error that stopped it}
+    """
+    results = {}
+    for name in list_save_names(save_directory, "_save.txt"):
+        try:
+            results[name] = migrate_save_to_binary(name, save_directory, remove_text)
+        except (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError) as e:
+            results[name] = e
+    return results
+
+
+# ============================================================================
+# WRITE-BEHIND SAVING
+# ============================================================================
+
+class SaveQueue:
+    """
+    Background saver that batches and coalesces character saves
+
+    enqueue() takes a copy of the character and returns right away; all
+    disk I/O happens on the saver thread. The saver thread waits until
+    the oldest pending save is `delay` seconds old, then writes every
+    pending character in one batch. Saving the same character again
+    before then just replaces the pending copy, so only its latest state
+    is written.
+
+    With journal=True, the saver thread also appends each new snapshot to
+    the save journal as soon as it is queued (one short append, not a full
+    save), so a crash before the batch is written loses nothing:
+    replay_journal applies it on the next start. Once every journaled
+    character has been saved, the journal is deleted, so it never grows
+    past the saves still in flight. The queue owns the journal while it
+    runs, so call replay_journal before starting it.
+    """
+
+    def __init__(self, save_directory="data/save_games", delay=2.0, journal=False):
+        """
+        Start the saver thread
+
+        Args:
+            save_directory: Directory containing save files
+            delay: Seconds to collect saves before writing a batch
+            journal: Journal each queued snapshot until it has been saved
+        """
+        self.save_directory = save_directory
+        self.delay = delay
+        self.journal = journal
+        self.pending = {}
+        self.unjournaled = {}
+        self.unsaved = set()
+        self.deadline = None
+        self.writing = False
+        self.flush_requested = False
+        self.closed = False
+        self.errors = []
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="SaveQueue", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, character):
+        """
+        Queue a character to be saved
+
+        Returns: True if queued
+        Raises: RuntimeError if the queue has been closed
+        """
+        snapshot = {}
+        for field in SAVE_FIELDS:
+            if field in LIST_FIELDS:
+                snapshot[field] = list(character[field])
+            else:
+                snapshot[field] = character[field]
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Save queue is closed")
+            self.pending[snapshot["name"]] = snapshot
+            if self.journal:
+                self.unjournaled[snapshot["name"]] = snapshot
+            if self.deadline is None:
+                self.deadline = time.monotonic() + self.delay
+            self.condition.notify_all()
+        return True
+
+    def run(self):
+        """Saver thread: journal new snapshots, and write batches when due"""
+        while True:
+            with self.condition:
+                while not (self.unjournaled or self.batch_due()):
+                    if self.closed and not self.pending:
+                        return
+                    timeout = None
+                    if self.deadline is not None:
+                        timeout = max(self.deadline - time.monotonic(), 0)
+                    self.condition.wait(timeout)
+                to_journal = self.unjournaled
+                self.unjournaled = {}
+                batch = {}
+                if self.batch_due():
+                    batch = self.pending
+                    self.pending = {}
+                    self.deadline = None
+                self.writing = True
+
+            errors = []
+            try:
+                if to_journal:
+                    errors.extend(self.write_journal(to_journal))
+                if batch:
+                    errors.extend(self.write_batch(batch))
+                    self.compact_journal()
+            except Exception as e:
+                # Keep the thread alive; report the whole batch as failed
+                errors.extend((name, e) for name in batch or to_journal)
+            finally:
+                # Always wake flush() waiters, even if the thread is dying
+                with self.condition:
+                    self.errors.extend(errors)
+                    self.writing = False
+                    if not self.pending:
+                        self.flush_requested = False
+                    self.condition.notify_all()
+
+    def batch_due(self):
+        """Check (with the lock held) whether pending saves should be written now"""
+        if not self.pending:
+            return False
+        if self.flush_requested or self.closed:
+            return True
+        return time.monotonic() >= self.deadline
+
+    def write_journal(self, snapshots):
+        """
+        Append snapshots to the save journal in one write (saver thread only)
+
+        Returns: List of (character_name, error) if the journal can't be written
+        """
+        try:
+            if not os.path.exists(self.save_directory):
+                os.makedirs(self.save_directory)
+            append_journal_records(os.path.join(self.save_directory, JOURNAL_FILENAME),
+                                   [journal_record(snapshot) for snapshot in snapshots.values()])
+        except Exception as e:
+            return [(name, e) for name in snapshots]
+        self.unsaved.update(snapshots)
+        return []
+
+    def write_batch(self, batch):
+        """
+        Write a batch of character snapshots
+
+        Returns: List of (character_name, error) for saves that failed
+        """
+        errors = []
+        # save_character creates the directory, inside the per-save try
+        for name, character in batch.items():
+            try:
+                save_character(character, self.save_directory)
+            except Exception as e:
+                errors.append((name, e))
+            else:
+                self.unsaved.discard(name)
+        return errors
+
+    def compact_journal(self):
+        """
+        Delete the journal once every journaled snapshot has been saved
+
+        Snapshots queued since then are journaled later by this same
+        thread, so none of their records can be lost.
+        """
+        if not self.journal or self.unsaved:
+            return
+        journal_path = os.path.join(self.save_directory, JOURNAL_FILENAME)
+        if os.path.isfile(journal_path):
+            os.remove(journal_path)
+
+    def flush(self):
+        """
+        Write every pending save now and wait for it to finish
+
+        Returns: List of (character_name, error) for saves that failed
+                 since the last flush
+        """
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.pending or self.writing:
+                self.condition.wait()
+            self.flush_requested = False
+            errors = self.errors
+            self.errors = []
+        return errors
+
+    def close(self):
+        """
+        Write every pending save and stop the saver thread
+
+        Returns: List of (character_name, error) for saves that failed
+        """
+        errors = self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        return errors
+
+
 # ============================================================================
 # VALIDATION
 # ============================================================================
@@ -312,14 +1510,12 @@ def validate_character_data(character):
     Returns: True if valid
     Raises: InvalidSaveDataError if missing fields or invalid types
     """
-    required = ["name", "class", "level", "health", "max_health", "strength", "magic",
-                "experience", "gold", "inventory", "active_quests", "completed_quests"]
-    for key in required:
+    for key in SAVE_FIELDS:
         if key not in character:
             raise InvalidSaveDataError(f"Missing field: {key}")
     if not isinstance(character["level"], int):
         raise InvalidSaveDataError("Level must be int")
-    if not isinstance(character["inventory"], list):
+    if not isinstance(character["inventory"], (list, Inventory)):
         raise InvalidSaveDataError("Inventory must be list")
     return True
 
@@ -0,0 +1,252 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Store Module
+
+Name: Samaya Sartin
+
+This module provides storage backends for saved characters. Every store
+has the same save/load/list/delete methods as the functions in
+character_manager, so the game can switch backends without other changes.
+"""
+
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+import character_manager
+from character_manager import SAVE_FIELDS, LIST_FIELDS
+from inventory_system import Inventory, format_inventory_field
+from custom_exceptions import (
+    CharacterNotFoundError,
+    InvalidSaveDataError,
+    SaveFileCorruptedError
+)
+
+
+# ============================================================================
+# TEXT FILE STORE
+# ============================================================================
+
+class FileCharacterStore:
+    """
+    Character store using one text save file per character
+
+    Wraps the save functions in character_manager.
+    """
+
+    def __init__(self, save_directory="data/save_games"):
+        """Initialize the store for a save directory"""
+        self.save_directory = save_directory
+
+    def save_character(self, character):
+        """Save character, returns True if successful"""
+        return character_manager.save_character(character, self.save_directory)
+
+    def load_character(self, character_name):
+        """Load character, raises CharacterNotFoundError if missing"""
+        return character_manager.load_character(character_name, self.save_directory)
+
+    def list_saved_characters(self):
+        """Get list of all saved character names"""
+        return character_manager.list_saved_characters(self.save_directory)
+
+    def delete_character(self, character_name):
+        """Delete character, raises CharacterNotFoundError if missing"""
+        return character_manager.delete_character(character_name, self.save_directory)
+
+
+# ============================================================================
+# SQLITE STORE
+# ============================================================================
+
+class SQLiteCharacterStore:
+    """
+    Character store backed by a SQLite database
+
+    The database runs in WAL mode so reads don't wait on writes, keeps a
+    small pool of open connections, and indexes characters by name and
+    class.
+    """
+
+    def __init__(self, database="data/save_games/characters.db", pool_size=4):
+        """
+        Open (or create) the database and fill the connection pool
+
+        Args:
+            database: Path to the SQLite database file
+            pool_size: Number of connections kept open
+        """
+        directory = os.path.dirname(database)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.database = database
+        self.pool = queue.Queue()
+        try:
+            for _ in range(pool_size):
+                self.pool.put(self.open_connection())
+            with self.connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS characters ("
+                    "name TEXT PRIMARY KEY, class TEXT NOT NULL, level INTEGER NOT NULL, "
+                    "health INTEGER NOT NULL, max_health INTEGER NOT NULL, "
+                    "strength INTEGER NOT NULL, magic INTEGER NOT NULL, "
+                    "experience INTEGER NOT NULL, gold INTEGER NOT NULL, "
+                    "inventory TEXT NOT NULL, active_quests TEXT NOT NULL, "
+                    "completed_quests TEXT NOT NULL)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS characters_by_class ON characters (class, name)"
+                )
+        except sqlite3.DatabaseError as e:
+            self.close()
+            raise SaveFileCorruptedError(f"Could not open character database {database}: {e}")
+
+    def open_connection(self):
+        """Open one pooled connection with WAL mode turned on"""
+        connection = sqlite3.connect(self.database, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection from the pool for one transaction
+
+        Commits if the block finishes, rolls back if it raises.
+        """
+        connection = self.pool.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self.pool.put(connection)
+
+    def close(self):
+        """Close every pooled connection"""
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+
+    def save_character(self, character):
+        """
+        Save character, replacing any earlier save with the same name
+
+        Returns: True if successful
+        Raises: SaveFileCorruptedError if the database can't be written
+        """
+        values = []
+        for field in SAVE_FIELDS:
+            if field == "inventory":
+                values.append(format_inventory_field(character[field]))
+            elif field in LIST_FIELDS:
+                values.append(",".join(character[field]))
+            else:
+                values.append(character[field])
+        placeholders = ", ".join("?" for _ in SAVE_FIELDS)
+        try:
+            with self.connection() as connection:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO characters ({', '.join(SAVE_FIELDS)}) "
+                    f"VALUES ({placeholders})", values
+                )
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Could not save {character['name']}: {e}")
+        return True
+
+    def load_character(self, character_name):
+        """
+        Load character by name
+
+        Returns: Character (works like a dictionary)
+        Raises:
+            CharacterNotFoundError if the character isn't saved
+            SaveFileCorruptedError if the database can't be read
+            InvalidSaveDataError if the stored row is invalid
+        """
+        try:
+            with self.connection() as connection:
+                row = connection.execute(
+                    f"SELECT {', '.join(SAVE_FIELDS)} FROM characters WHERE name = ?",
+                    (character_name,)
+                ).fetchone()
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Could not read {character_name}'s save: {e}")
+        if row is None:
+            raise CharacterNotFoundError(f"{character_name} is not a saved character.")
+        return self.row_to_character(row)
+
+    def row_to_character(self, row):
+        """
+        Convert a database row into a Character
+
+        Raises: InvalidSaveDataError if the row is invalid
+        """
+        character = {}
+        for field, value in zip(SAVE_FIELDS, row):
+            if field == "inventory":
+                try:
+                    character[field] = Inventory.from_save_field(value)
+                except ValueError as e:
+                    raise InvalidSaveDataError(f"Invalid inventory for {row[0]}: {e}")
+            elif field in LIST_FIELDS:
+                character[field] = value.split(",") if value else []
+            else:
+                character[field] = value
+        character_manager.validate_character_data(character)
+        return character_manager.Character.from_dict(character)
+
+    def list_saved_characters(self):
+        """
+        Get list of all saved character names
+
+        Returns: List of names in name order
+        """
+        with self.connection() as connection:
+            rows = connection.execute("SELECT name FROM characters ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+
+    def list_characters_by_class(self, character_class):
+        """
+        Get names of every saved character of a class (uses the class index)
+
+        Returns: List of names in name order
+        """
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT name FROM characters WHERE class = ? ORDER BY name", (character_class,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_character(self, character_name):
+        """
+        Delete a saved character
+
+        Returns: True if deleted successfully
+        Raises: CharacterNotFoundError if character doesn't exist
+        """
+        with self.connection() as connection:
+            deleted = connection.execute(
+                "DELETE FROM characters WHERE name = ?", (character_name,)
+            ).rowcount
+        if deleted == 0:
+            raise CharacterNotFoundError(f"{character_name} is not a saved character.")
+        return True
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== CHARACTER STORE TEST ===")
+
+    store = SQLiteCharacterStore("data/save_games/test_characters.db")
+    hero = character_manager.create_character("StoreHero", "Rogue")
+    store.save_character(hero)
+    print(f"Saved characters: {store.list_saved_characters()}")
+    print(f"Rogues: {store.list_characters_by_class('Rogue')}")
+    loaded = store.load_character("StoreHero")
+    print(f"Loaded: {loaded['name']} the {loaded['class']}")
+    store.delete_character("StoreHero")
+    store.close()
@@ -13,6 +13,7 @@ Handles combat mechanics
 
 import character_manager
 import random
+from character_manager import Character
 from custom_exceptions import (
     InvalidTargetError,
     CombatNotActiveError,
@@ -71,6 +72,243 @@ def get_random_enemy_for_level(character_level):
         return create_enemy("dragon")
 
 
+
+# ============================================================================
+# HEADLESS BATTLE ENGINE
+# ============================================================================
+
+# Player actions understood by the battle engine
+ATTACK = "attack"
+SPECIAL = "special"
+RUN = "run"
+PASS = "pass"
+
+# Menu choices from the interactive battle screen
+MENU_ACTIONS = {"1": ATTACK, "2": SPECIAL, "3": RUN}
+
+# Headless battles are called a draw after this many turns so that a
+# policy that never ends the fight (e.g. a Cleric that only heals) can't
+# hang a simulation
+DEFAULT_MAX_TURNS = 1000
+
+
+def calculate_base_damage(attacker, defender):
+    """
+    Calculate basic attack damage without displaying anything
+
+    Damage formula: attacker['strength'] - (defender['strength'] // 4)
+    Minimum damage: 1
+
+    Returns: Integer damage amount
+    """
+    return damage_for_strength(attacker["strength"], defender["strength"])
+
+
+def damage_for_strength(attack_strength, defense_strength):
+    """Basic attack damage from the two strength values (minimum 1)"""
+    damage = attack_strength - (defense_strength // 4)
+    if damage < 1:
+        damage = 1
+    return damage
+
+
+def has_plain_stats(character):
+    """
+    Check whether a character's stats can be read straight from its slots
+
+    True for a Character with no modifier layers, where character.strength
+    etc. already equal character["strength"]; the resolve functions use
+    the attributes then and skip the mapping lookups.
+    """
+    return type(character) is Character and character.bonuses is None
+
+
+def resolve_player_action(character, enemy, action, rng=random):
+    """
+    Resolve one player action without prompting or printing
+
+    Args:
+        character: Character dictionary
+        enemy: Enemy dictionary
+        action: ATTACK, SPECIAL or RUN (anything else passes the turn)
+        rng: Object with a randint method (the random module by default)
+
+    Returns: Tuple (action, value) where value is the damage dealt, the
+             health restored, or whether the escape succeeded
+    """
+    if action == ATTACK:
+        if has_plain_stats(character):
+            damage = damage_for_strength(character.strength, enemy["strength"])
+        else:
+            damage = calculate_base_damage(character, enemy)
+        enemy["health"] -= damage
+        if enemy["health"] < 0:
+            enemy["health"] = 0
+        return (ATTACK, damage)
+    if action == SPECIAL:
+        character_class = character.get("class")
+        if character_class == "Warrior":
+            damage = power_strike_damage(character)
+        elif character_class == "Mage":
+            damage = fireball_damage(character)
+        elif character_class == "Rogue":
+            damage = critical_strike_damage(character, rng.randint(1, 2))
+        elif character_class == "Cleric":
+            health = cleric_heal_health(character)
+            healed = health - character["health"]
+            character["health"] = health
+            return (SPECIAL, healed)
+        else:
+            return (PASS, 0)
+        enemy["health"] -= damage
+        return (SPECIAL, damage)
+    if action == RUN:
+        return (RUN, rng.randint(1, 2) == 1)
+    return (PASS, 0)
+
+
+def resolve_enemy_action(enemy, character):
+    """
+    Resolve the enemy's attack without printing
+
+    Returns: Integer damage dealt to the character
+    """
+    if has_plain_stats(character):
+        damage = damage_for_strength(enemy["strength"], character.strength)
+        health = character.health - damage
+        character.health = health if health > 0 else 0
+        return damage
+    damage = calculate_base_damage(enemy, character)
+    character["health"] -= damage
+    if character["health"] < 0:
+        character["health"] = 0
+    return damage
+
+
+def run_battle(character, enemy, policy, rng=random, max_turns=DEFAULT_MAX_TURNS,
+               apply_rewards=True, record_events=True, on_event=None):
+    """
+    Run a complete battle without prompting or printing
+
+    Args:
+        character: Character dictionary (health is updated in place)
+        enemy: Enemy dictionary (health is updated in place)
+        policy: Callable policy(character, enemy, turn) returning an action,
+                or a list of scripted actions
+        rng: Object with a randint method (the random module by default)
+        max_turns: Turns before the battle is a draw (None for no limit)
+        apply_rewards: Grant XP and gold to the character on victory
+        record_events: Keep every event in the result's 'events' list
+        on_event: Optional callback on_event(event) run after each action
+
+    Each event is a tuple (turn, actor, action, value) where actor is
+    'player' or 'enemy' and value is as returned by resolve_player_action.
+
+    Returns: Dictionary with battle results:
+            {'winner': 'player'|'enemy'|'escape'|'draw', 'xp_gained': int,
+             'gold_gained': int, 'turns': int, 'events': list}
+    Raises: CharacterDeadError if character is already dead
+    """
+    if character["health"] <= 0:
+        raise CharacterDeadError(f"{character['name']} is already dead.")
+    if not callable(policy):
+        policy = scripted_policy(policy)
+
+    events = []
+    track = record_events or on_event is not None
+    winner = None
+    turn = 0
+    while winner is None:
+        if max_turns is not None and turn >= max_turns:
+            winner = "draw"
+            break
+        turn += 1
+
+        action, value = resolve_player_action(character, enemy, policy(character, enemy, turn), rng)
+        if track:
+            event = (turn, "player", action, value)
+            if record_events:
+                events.append(event)
+            if on_event is not None:
+                on_event(event)
+        if action == RUN and value:
+            winner = "escape"
+        elif enemy["health"] <= 0:
+            winner = "player"
+        else:
+            damage = resolve_enemy_action(enemy, character)
+            if track:
+                event = (turn, "enemy", ATTACK, damage)
+                if record_events:
+                    events.append(event)
+                if on_event is not None:
+                    on_event(event)
+            if character["health"] <= 0:
+                winner = "enemy"
+
+    xp = 0
+    gold = 0
+    if winner == "player":
+        xp = enemy["xp_reward"]
+        gold = enemy["gold_reward"]
+        if apply_rewards:
+            character_manager.gain_experience(character, xp)
+            character_manager.add_gold(character, gold)
+    return {"winner": winner, "xp_gained": xp, "gold_gained": gold,
+            "turns": turn, "events": events}
+
+
+def scripted_policy(actions):
+    """
+    Build a policy that plays a fixed list of actions in order
+
+    Once the script runs out the policy keeps attacking.
+
+    Returns: Policy function for run_battle
+    """
+    actions = tuple(actions)
+
+    def policy(character, enemy, turn):
+        if turn <= len(actions):
+            return actions[turn - 1]
+        return ATTACK
+
+    return policy
+
+
+def attack_policy(character, enemy, turn):
+    """Policy that always uses a basic attack"""
+    return ATTACK
+
+
+def special_policy(character, enemy, turn):
+    """Policy that always uses the class special ability"""
+    return SPECIAL
+
+
+def format_battle_event(event, character, enemy):
+    """
+    Turn a battle event into the message shown in the battle log
+
+    Returns: String message, or None if the event has nothing to show
+    """
+    turn, actor, action, value = event
+    if actor == "enemy":
+        return f"{enemy['name']} has hit {character['name']} for {value} damage!"
+    if action == ATTACK:
+        return f"{character['name']} has hit {enemy['name']} for {value} damage!"
+    if action == SPECIAL:
+        ability = SPECIAL_ABILITY_NAMES[character["class"]]
+        if character["class"] == "Cleric":
+            return f"{character['name']} has healed themselves."
+        return f"{character['name']} has used {ability} on enemy, taking {value} damage."
+    if action == RUN:
+        if value:
+            return "Your escape plan was successful! PONK."
+        return "Your escape plan was unsuccessful! Keep fighting!"
+    return None
+
+
 # ============================================================================
 # COMBAT SYSTEM
 # ============================================================================
@@ -79,7 +317,8 @@ class SimpleBattle:
     """
     Simple turn-based combat system
 
-    Manages combat between character and enemy
+    Interactive front-end for run_battle: prompts the player for each move
+    and prints the battle log and combat stats as the battle goes on.
     """
 
     def __init__(self, character, enemy):
@@ -94,7 +333,7 @@ class SimpleBattle:
         Start the combat loop
 
         Returns: Dictionary with battle results:
-                {'winner': 'player'|'enemy', 'xp_gained': int, 'gold_gained': int}
+                {'winner': 'player'|'enemy'|'escape', 'xp_gained': int, 'gold_gained': int}
 
         Raises: CharacterDeadError if character is already dead
         """
@@ -102,29 +341,29 @@ class SimpleBattle:
             raise CharacterDeadError(f"{self.character['name']} is already dead.")
 
         self.combat_active = True
+        result = run_battle(self.character, self.enemy, self.choose_action,
+                            max_turns=None, record_events=False, on_event=self.show_event)
+        self.turn = result["turns"]
+        if result["winner"] == "escape":
+            self.combat_active = False
+        return result
 
-        while self.character["health"] > 0 and self.enemy["health"] > 0 and self.combat_active:
-
-            self.player_turn()
-            display_combat_stats(self.character,self.enemy)
-            if self.enemy["health"] <= 0 or self.combat_active == False:
-                break
-
-            self.enemy_turn()
-            display_combat_stats(self.character, self.enemy)
-            if self.character["health"] <= 0 or self.combat_active == False:
-                break
-                
-        if self.combat_active == False:
-            return {"winner": "escape", "xp_gained": 0, "gold_gained": 0}
-        elif self.character["health"] > 0:
-            xp = self.enemy["xp_reward"]
-            gold = self.enemy["gold_reward"]
-            character_manager.gain_experience(self.character, xp)
-            character_manager.add_gold(self.character, gold)
-            return {"winner": "player", "xp_gained": xp, "gold_gained": gold}
-        else:
-            return {"winner": "enemy", "xp_gained": 0, "gold_gained": 0}
+    def choose_action(self, character, enemy, turn):
+        """
+        Ask the player for their move
+
+        Returns: ATTACK, SPECIAL, RUN, or PASS for an unknown choice
+        """
+        print(f"1. Basic Attack\n2. Special Ability\n3. Try to Run")
+        combat_choice = input("What is your move?(1, 2, or 3): ")
+        return MENU_ACTIONS.get(combat_choice, PASS)
+
+    def show_event(self, event):
+        """Print the battle log for an event followed by the combat stats"""
+        message = format_battle_event(event, self.character, self.enemy)
+        if message:
+            display_battle_log(message)
+        display_combat_stats(self.character, self.enemy)
 
     def player_turn(self):
         """
@@ -139,15 +378,11 @@ class SimpleBattle:
         """
         if not self.combat_active:
             raise CombatNotActiveError("Combat is not active.")
-        print(f"1. Basic Attack\n2. Special Ability\n3. Try to Run")
-        combat_choice = input("What is your move?(1, 2, or 3): ")
-        if combat_choice == "1":
-            damage = self.calculate_damage(self.character, self.enemy)
-            self.apply_damage(self.enemy, damage)
-        elif combat_choice == "2":
-            use_special_ability(self.character, self.enemy)
-        elif combat_choice == "3":
-            self.attempt_escape()
+        action = self.choose_action(self.character, self.enemy, self.turn)
+        action, value = resolve_player_action(self.character, self.enemy, action)
+        if action == RUN:
+            self.combat_active = not value
+        self.show_event((self.turn, "player", action, value))
 
     def enemy_turn(self):
         """
@@ -159,8 +394,9 @@ class SimpleBattle:
         """
         if not self.combat_active:
             raise CombatNotActiveError("Combat is not active.")
-        damage = self.calculate_damage(self.enemy, self.character)
-        self.apply_damage(self.character, damage)
+        damage = resolve_enemy_action(self.enemy, self.character)
+        self.show_event((self.turn, "enemy", ATTACK, damage))
+        self.turn += 1
 
 
     def calculate_damage(self, attacker, defender):
@@ -172,9 +408,7 @@ class SimpleBattle:
 
         Returns: Integer damage amount
         """
-        damage = attacker["strength"] - (defender["strength"] // 4)
-        if damage < 1:
-            damage = 1
+        damage = calculate_base_damage(attacker, defender)
         display_battle_log(f"{attacker['name']} has hit {defender['name']} for {damage} damage!")
         return damage
 
@@ -224,6 +458,14 @@ class SimpleBattle:
 # SPECIAL ABILITIES
 # ============================================================================
 
+SPECIAL_ABILITY_NAMES = {
+    "Warrior": "Power Strike",
+    "Mage": "Fireball",
+    "Rogue": "Critical Strike",
+    "Cleric": "Heal"
+}
+
+
 def use_special_ability(character, enemy):
     """
     Use character's class-specific special ability
@@ -249,38 +491,63 @@ def use_special_ability(character, enemy):
     # Track cooldowns (optional advanced feature)
 
 
+def power_strike_damage(character):
+    """Power Strike damage: 2x strength"""
+    return character["strength"] * 2
+
+
+def fireball_damage(character):
+    """Fireball damage: 2x magic"""
+    return character["magic"] * 2
+
+
+def critical_strike_damage(character, roll):
+    """
+    Critical Strike damage for a roll of random.randint(1, 2)
+
+    Roll 1: 2x strength, roll 2: 3x strength
+    """
+    if roll == 1:
+        return character["strength"] * 2
+    return character["strength"] * 3
+
+
+def cleric_heal_health(character):
+    """
+    Character's health after a Cleric Heal
+
+    Restores 30 health, topping up to max_health if still below it
+    """
+    health = character["health"] + 30
+    if health < character["max_health"]:
+        health = character["max_health"]
+    return health
+
 
 def warrior_power_strike(character, enemy):
     """Warrior special ability"""
-    power_strike = character["strength"] * 2
+    power_strike = power_strike_damage(character)
     enemy["health"] -= power_strike
     display_battle_log(f"{character['name']} has used Power Strike on enemy, taking {power_strike} damage.")
 
 
 def mage_fireball(character, enemy):
     """Mage special ability"""
-    fireball = character["magic"] * 2
+    fireball = fireball_damage(character)
     enemy["health"] -= fireball
     display_battle_log(f"{character['name']} has used Fireball on enemy, taking {fireball} damage.")
 
 
 def rogue_critical_strike(character, enemy):
     """Rogue special ability"""
-
-    chance = random.randint(1,2)
-    if chance == 1:
-        critical_strike = character["strength"] * 2
-    elif chance == 2:
-        critical_strike = character["strength"] * 3
+    critical_strike = critical_strike_damage(character, random.randint(1,2))
     enemy["health"] -= critical_strike
     display_battle_log(f"{character['name']} has used Critical Strike on enemy, taking {critical_strike} damage.")
 
 
 def cleric_heal(character):
     """Cleric special ability"""
-    character["health"] += 30
-    if character["health"] < character["max_health"]:
-        character["health"] = character["max_health"]
+    character["health"] = cleric_heal_health(character)
     display_battle_log(f"{character['name']} has healed themselves.")
 
 
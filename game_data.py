@@ -13,6 +13,10 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import bisect
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
@@ -40,30 +44,10 @@ def load_quests(filename="data/quests.txt"):
     Returns: Dictionary of quests {quest_id: quest_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
-    if not os.path.isfile(filename):
-        raise MissingDataFileError(f"Quest data file {filename} not found")
-    try:
-        with open(filename, "r") as file:
-            lines = file.readlines()
-    except:
-        raise CorruptedDataError(f"Could not read {filename} (Corrupted File)")
-
     quests = {}
-    block = []
-    for line in lines:
-        line = line.strip()
-        if line == "":
-            if block:
-                quest = parse_quest_block(block)
-                quests[quest["quest_id"]] = quest
-                block = []
-        else:
-            block.append(line)
-
-    if block:
-        quest = parse_quest_block(block)
+    for quest in iter_quests(filename):
         quests[quest["quest_id"]] = quest
-
+    QUEST_NUMBERS.load_catalog(quests)
     return quests
 
 def load_items(filename="data/items.txt"):
@@ -74,51 +58,75 @@ def load_items(filename="data/items.txt"):
     ITEM_ID: unique_item_name
     NAME: Item Display Name
     TYPE: weapon|armor|consumable
-    EFFECT: stat_name:value (e.g., strength:5 or health:20)
+    EFFECT: stat_name:value (e.g., strength:5 or health:20), several
+            effects separated by commas (e.g., strength:5,magic:2)
     COST: 100
+    STACK: 10 (optional, how many fit in one inventory slot, default 1)
     DESCRIPTION: Item description
 
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
+    items = {}
+    for item in iter_items(filename):
+        items[item["item_id"]] = item
+    return items
+
+
+def iter_quests(filename="data/quests.txt"):
+    """
+    Stream quests from a quest file one at a time
+
+    Only one quest block is held in memory at once, so very large quest
+    files can be processed without reading the whole file.
+
+    Yields: Quest dictionary for each block in the file
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+            (when the generator is first advanced)
+    """
+    for block in iter_file_blocks(filename, "Quest"):
+        yield parse_quest_block(block)
+
+
+def iter_items(filename="data/items.txt"):
+    """
+    Stream items from an item file one at a time
+
+    Yields: Item dictionary for each block in the file
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+            (when the generator is first advanced)
+    """
+    for block in iter_file_blocks(filename, "Item"):
+        yield parse_item_block(block)
+
+
+def iter_file_blocks(filename, kind):
+    """
+    Stream the blocks of a data file without reading it all at once
+
+    Args:
+        filename: Path to the data file
+        kind: "Quest" or "Item", used in error messages
+
+    Yields: List of stripped lines for each block
+    Raises: MissingDataFileError, CorruptedDataError
+    """
     if not os.path.isfile(filename):
-        raise MissingDataFileError(f"Item data file {filename} not found")
+        raise MissingDataFileError(f"{kind} data file {filename} not found")
     try:
         file = open(filename, "r")
-        contents = file.readlines()
-    except:
-        raise CorruptedDataError(f"Could not read {filename} save file")
-    items = {}
-    item_data = {}
-    item_id = None
-    for line in contents:
-        line = line.strip()
-        if not line:
-            if item_id:
-                items[item_id] = item_data
-                items_data = {}
-                item_id = None
-                continue
-        if ":" not in line:
-            raise InvalidDataFormatError(f"Bad line format: {line}")
-        key, value = line.strip().split(":", 1)
-        key = key.strip().upper()
-        value = value.strip()
-
-        if key == "ITEM_ID":
-            item_id = value
-        elif key in ["NAME", "TYPE", "DESCRIPTION", "EFFECT"]:
-            item_data[key.lower()] = value
-        elif key in ["COST"]:
+    except OSError:
+        raise CorruptedDataError(f"Could not read {filename} (Corrupted File)")
+    with file:
+        blocks = iter_data_blocks(file)
+        while True:
             try:
-                item_data[key.lower()] = int(value)
-            except ValueError:
-                raise InvalidDataFormatError(f"Expected integer for {key}, got {value}")
-        else:
-            raise InvalidDataFormatError(f"Unexpected key: {key}")
-    if item_id:
-        items[item_id] = item_data
-    return item_data
+                block = next(blocks)
+            except StopIteration:
+                return
+            except (OSError, UnicodeDecodeError):
+                raise CorruptedDataError(f"Could not read {filename} (Corrupted File)")
+            yield block
 
 
 def validate_quest_data(quest_dict):
@@ -241,12 +249,14 @@ def create_default_data_files():
                     "TYPE: consumable\n"
                     "EFFECT: health:20\n"
                     "COST: 25\n"
+                    "STACK: 10\n"
                     "DESCRIPTION: Restores 20 health points\n\n"
                     "ITEM_ID: super_health_potion\n"
                     "NAME: Super Health Potion\n"
                     "TYPE: consumable\n"
                     "EFFECT: health:50\n"
                     "COST: 75\n"
+                    "STACK: 10\n"
                     "DESCRIPTION: Restores 50 health points\n\n"
                     "ITEM_ID: iron_sword\n"
                     "NAME: Iron Sword\n"
@@ -289,22 +299,266 @@ def create_default_data_files():
                     "TYPE: consumable\n"
                     "EFFECT: strength:3\n"
                     "COST: 50\n"
+                    "STACK: 5\n"
                     "DESCRIPTION: Permanently increases strength by 3\n\n"
                     "ITEM_ID: wisdom_elixir\n"
                     "NAME: Wisdom Elixir\n"
                     "TYPE: consumable\n"
                     "EFFECT: magic:3\n"
                     "COST: 50\n"
+                    "STACK: 5\n"
                     "DESCRIPTION: Permanently increases magic by 3\n"
                 )
         except Exception as e:
             raise CorruptedDataError(f"Could not create quests.txt: {e}")
 
 
+# ============================================================================
+# SHARDED CATALOGS
+# ============================================================================
+
+def load_sharded_quests(shard_directory="data/quests", workers=None):
+    """
+    Load quests split across many shard files (e.g. data/quests/*.txt)
+
+    Shards are parsed in parallel worker processes and merged.
+
+    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    Raises:
+        MissingDataFileError if the directory or its shards are missing
+        InvalidDataFormatError if a shard is malformed or two shards share a quest ID
+        CorruptedDataError if a shard can't be read
+    """
+    return load_shards(list_shard_files(shard_directory), load_quests, "quest", workers)
+
+
+def load_sharded_items(shard_directory="data/items", workers=None):
+    """
+    Load items split across many shard files (e.g. data/items/*.txt)
+
+    Returns: Dictionary of items {item_id: item_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return load_shards(list_shard_files(shard_directory), load_items, "item", workers)
+
+
+def list_shard_files(shard_directory, extension=".txt"):
+    """
+    Find the shard files in a directory, in name order
+
+    Returns: List of file paths
+    Raises: MissingDataFileError if the directory is missing or has no shards
+    """
+    if not os.path.isdir(shard_directory):
+        raise MissingDataFileError(f"Shard directory {shard_directory} not found")
+    filenames = []
+    for name in sorted(os.listdir(shard_directory)):
+        path = os.path.join(shard_directory, name)
+        if name.endswith(extension) and os.path.isfile(path):
+            filenames.append(path)
+    if not filenames:
+        raise MissingDataFileError(f"No {extension} shard files in {shard_directory}")
+    return filenames
+
+
+def load_shards(filenames, loader, kind, workers=None):
+    """
+    Parse shard files in parallel and merge them into one catalog
+
+    Args:
+        filenames: Shard file paths
+        loader: Module-level loader run for each shard (load_quests/load_items)
+        kind: "quest" or "item", used in error messages
+        workers: Number of worker processes (default: one per shard, up to
+                 the number of cores; 1 parses in this process)
+
+    Returns: Merged catalog dictionary
+    Raises: InvalidDataFormatError if the same ID appears in two shards,
+            plus any error raised by loader
+    """
+    if workers is None:
+        workers = min(len(filenames), os.cpu_count() or 1)
+    if workers <= 1 or len(filenames) < 2:
+        catalogs = [loader(filename) for filename in filenames]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            catalogs = list(executor.map(loader, filenames))
+
+    merged = {}
+    sources = {}
+    for filename, catalog in zip(filenames, catalogs):
+        for record_id, record in catalog.items():
+            if record_id in merged:
+                raise InvalidDataFormatError(
+                    f"Duplicate {kind} ID '{record_id}' in {sources[record_id]} and {filename}"
+                )
+            merged[record_id] = record
+            sources[record_id] = filename
+    return merged
+
+
+# ============================================================================
+# CATALOG SNAPSHOTS
+# ============================================================================
+
+# Bump when the snapshot layout or the parsed catalog format changes
+SNAPSHOT_VERSION = 4
+SNAPSHOT_SUFFIX = ".snapshot"
+# Keys every snapshot must have besides version and kind
+SNAPSHOT_KEYS = ("mtime_ns", "size", "sha256", "data")
+
+
+def load_quests_snapshot(filename="data/quests.txt"):
+    """
+    Load quest data through a compiled snapshot of the quest file
+
+    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    quests = load_with_snapshot(filename, load_quests, "quests")
+    QUEST_NUMBERS.load_catalog(quests)
+    return quests
+
+
+def load_items_snapshot(filename="data/items.txt"):
+    """
+    Load item data through a compiled snapshot of the item file
+
+    Returns: Dictionary of items {item_id: item_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return load_with_snapshot(filename, load_items, "items")
+
+
+def load_with_snapshot(filename, loader, kind):
+    """
+    Load a catalog from its snapshot file, rebuilding the snapshot if needed
+
+    The snapshot ({filename}.snapshot) is a pickle of the parsed catalog
+    along with the source file's size, modification time and SHA-256 hash.
+    If size and mtime match it is used straight away; if they differ but the
+    hash still matches (e.g. the file was only touched) it is reused and
+    re-stamped. Otherwise the text file is parsed with loader and a new
+    snapshot is written. Snapshots that can't be read or written are
+    ignored, so the text file is always the source of truth.
+
+    Args:
+        filename: Path to the text data file
+        loader: Function that parses the text file (load_quests/load_items)
+        kind: Catalog name stored in the snapshot ("quests" or "items")
+
+    Returns: Parsed catalog dictionary
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.isfile(filename):
+        raise MissingDataFileError(f"Data file {filename} not found")
+    source = os.stat(filename)
+    snapshot_file = filename + SNAPSHOT_SUFFIX
+    snapshot = read_snapshot(snapshot_file, kind)
+
+    if snapshot and snapshot["mtime_ns"] == source.st_mtime_ns and snapshot["size"] == source.st_size:
+        return snapshot["data"]
+
+    source_hash = hash_data_file(filename)
+    if snapshot and snapshot["sha256"] == source_hash:
+        data = snapshot["data"]
+    else:
+        data = loader(filename)
+    write_snapshot(snapshot_file, kind, source, source_hash, data)
+    return data
+
+
+def read_snapshot(snapshot_file, kind):
+    """
+    Read a catalog snapshot in one read
+
+    A damaged pickle can fail in many ways (KeyError, TypeError,
+    OverflowError, MemoryError, ...), so any error just means the
+    snapshot gets rebuilt from the text file.
+
+    Returns: Snapshot dictionary, or None if missing, unreadable or stale
+    """
+    try:
+        with open(snapshot_file, "rb") as file:
+            snapshot = pickle.loads(file.read())
+    except Exception:
+        return None
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("kind") != kind:
+        return None
+    if not all(key in snapshot for key in SNAPSHOT_KEYS):
+        return None
+    if not isinstance(snapshot["data"], dict):
+        return None
+    return snapshot
+
+
+def write_snapshot(snapshot_file, kind, source, source_hash, data):
+    """
+    Write a catalog snapshot (temp file + rename so readers never see half a file)
+
+    Returns: True if written, False if the snapshot could not be saved
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "kind": kind,
+        "mtime_ns": source.st_mtime_ns,
+        "size": source.st_size,
+        "sha256": source_hash,
+        "data": data
+    }
+    temp_file = f"{snapshot_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, "wb") as file:
+            file.write(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(temp_file, snapshot_file)
+    except OSError:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return False
+    return True
+
+
+def hash_data_file(filename):
+    """
+    Calculate the SHA-256 hash of a data file
+
+    Returns: Hex digest string
+    Raises: CorruptedDataError if the file can't be read
+    """
+    try:
+        with open(filename, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        raise CorruptedDataError(f"Could not read {filename} (Corrupted File)")
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def iter_data_blocks(lines):
+    """
+    Group data file lines into blocks separated by blank lines
+
+    Args:
+        lines: Any iterable of lines (a list, or an open file to stream it)
+
+    Yields: List of stripped, non-blank lines for each block
+    """
+    block = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
 def parse_quest_block(lines):
     """
     Parse a block of lines into a quest dictionary
@@ -369,16 +623,20 @@ def parse_item_block(lines):
             item_id = value
         elif key in ["NAME", "TYPE", "DESCRIPTION", "EFFECT"]:
             item_data[key.lower()] = value
-        elif key == "COST":
+        elif key in ["COST", "STACK"]:
             try:
                 item_data[key.lower()] = int(value)
             except ValueError:
-                raise InvalidDataFormatError(f"Expected integer for COST, got {value}")
+                raise InvalidDataFormatError(f"Expected integer for {key}, got {value}")
         else:
             raise InvalidDataFormatError(f"Unexpected key: {key}")
 
     if not item_id:
         raise InvalidDataFormatError("Missing ITEM_ID field")
+    if item_data.setdefault("stack", 1) < 1:
+        raise InvalidDataFormatError(f"STACK must be at least 1 for {item_id}")
+    if "effect" in item_data:
+        item_data["effects"] = compile_item_effect(item_data["effect"])
 
     # Attach item_id as part of the dictionary
     item_data["item_id"] = item_id
@@ -386,6 +644,334 @@ def parse_item_block(lines):
     return item_data
 
 
+# ============================================================================
+# ITEM EFFECTS
+# ============================================================================
+
+# Stats an item effect can change; compiled effects refer to them by index
+STAT_NAMES = ("health", "max_health", "strength", "magic")
+STAT_INDEX = {stat: index for index, stat in enumerate(STAT_NAMES)}
+
+
+def compile_item_effect(effect_string):
+    """
+    Parse an EFFECT string once into (stat_index, value) pairs
+
+    Items may have several effects separated by commas.
+    Example: "strength:5,magic:2" → ((2, 5), (3, 2))
+
+    Returns: Tuple of (stat_index, value) tuples
+    Raises: InvalidDataFormatError if the effect string is malformed
+    """
+    effects = []
+    for part in effect_string.split(","):
+        stat, separator, value = part.partition(":")
+        stat = stat.strip()
+        if not separator or stat not in STAT_INDEX:
+            raise InvalidDataFormatError(f"Invalid item effect: {effect_string}")
+        try:
+            effects.append((STAT_INDEX[stat], int(value)))
+        except ValueError:
+            raise InvalidDataFormatError(f"Expected integer in item effect, got {value}")
+    return tuple(effects)
+
+
+# ============================================================================
+# ITEM CATALOG INDEX
+# ============================================================================
+
+class ItemCatalogIndex:
+    """
+    Sorted views of the item catalog for the shop
+
+    Items are grouped by type and by the stats they affect, and every
+    group keeps its items sorted by cost (ties by item ID). Price ranges
+    are found with binary search, so "weapons under 200 gold" only reads
+    the matching items instead of scanning the whole catalog.
+    """
+
+    def __init__(self, items):
+        """
+        Build the index
+
+        Args:
+            items: Item catalog {item_id: item_data} (from load_items)
+        """
+        self.items = items
+        self.all = self.build_group(items)
+        self.by_type = {}
+        self.by_stat = {}
+        for item_id, item in items.items():
+            self.by_type.setdefault(item["type"], []).append(item_id)
+            for stat_index, _ in item.get("effects", ()):
+                stat_items = self.by_stat.setdefault(STAT_NAMES[stat_index], [])
+                if not stat_items or stat_items[-1] != item_id:
+                    stat_items.append(item_id)
+        self.by_type = {key: self.build_group(ids) for key, ids in self.by_type.items()}
+        self.by_stat = {key: self.build_group(ids) for key, ids in self.by_stat.items()}
+
+    def build_group(self, item_ids):
+        """
+        Sort item IDs by cost
+
+        Returns: Tuple (costs, item_ids) of parallel sorted lists
+        """
+        ordered = sorted((self.items[item_id]["cost"], item_id) for item_id in item_ids)
+        return [cost for cost, _ in ordered], [item_id for _, item_id in ordered]
+
+    def find(self, item_type=None, stat=None, min_cost=None, max_cost=None):
+        """
+        Find items matching every given filter, cheapest first
+
+        Args:
+            item_type: "weapon", "armor" or "consumable"
+            stat: Stat the item must affect (e.g. "strength")
+            min_cost: Lowest cost to include
+            max_cost: Highest cost to include
+
+        Returns: List of item IDs sorted by cost
+        """
+        groups = [self.all]
+        if item_type is not None:
+            groups.append(self.by_type.get(item_type, ([], [])))
+        if stat is not None:
+            groups.append(self.by_stat.get(stat, ([], [])))
+        # Search the smallest group, then check the other filters per item
+        costs, item_ids = min(groups, key=lambda group: len(group[1]))
+
+        start = 0 if min_cost is None else bisect.bisect_left(costs, min_cost)
+        stop = len(costs) if max_cost is None else bisect.bisect_right(costs, max_cost)
+        matches = item_ids[start:stop]
+        if item_type is not None:
+            matches = [item_id for item_id in matches if self.items[item_id]["type"] == item_type]
+        if stat is not None:
+            stat_index = STAT_INDEX.get(stat)
+            matches = [item_id for item_id in matches
+                       if any(index == stat_index for index, _ in self.items[item_id].get("effects", ()))]
+        return matches
+
+    def page(self, page=0, page_size=10, **filters):
+        """
+        Get one page of find() results
+
+        Args:
+            page: Page number, starting at 0
+            page_size: Items per page
+            **filters: Same filters as find()
+
+        Returns: Dictionary with 'items' (item IDs on this page), 'page',
+                 'pages' (total number of pages) and 'total' (matching items)
+        """
+        matches = self.find(**filters)
+        start = page * page_size
+        return {
+            "items": matches[start:start + page_size],
+            "page": page,
+            "pages": max(1, -(-len(matches) // page_size)),
+            "total": len(matches)
+        }
+
+
+# ============================================================================
+# QUEST NUMBERING
+# ============================================================================
+
+class QuestNumbers:
+    """
+    Dense integer numbers for quest IDs, used as bit positions in QuestSet
+
+    A catalog's quests are numbered in sorted ID order when it is loaded
+    (load_catalog), so the same catalog always gets the same numbers.
+    Quests seen later (added by a catalog reload, or put into a QuestSet
+    without being in any catalog) get the next free numbers. Numbers never
+    change or get reused, so existing QuestSets stay valid.
+
+    Only adding a quest to a set numbers it. Lookups (lookup, mask) never
+    do: an ID without a number isn't in any QuestSet.
+    """
+
+    def __init__(self, quest_ids=()):
+        """Create a numbering, giving quest_ids numbers in order"""
+        self.numbers = {}
+        self.quest_ids = []
+        for quest_id in quest_ids:
+            self.assign(quest_id)
+
+    def assign(self, quest_id):
+        """Get a quest's number, giving it the next free one if it's new"""
+        number = self.numbers.get(quest_id)
+        if number is None:
+            number = len(self.quest_ids)
+            self.numbers[quest_id] = number
+            self.quest_ids.append(quest_id)
+        return number
+
+    def lookup(self, quest_id):
+        """Get a quest's number, or None if it has never been numbered"""
+        return self.numbers.get(quest_id)
+
+    def load_catalog(self, quest_ids):
+        """Number a freshly loaded catalog's new quests, in sorted ID order"""
+        for quest_id in sorted(quest_ids):
+            if quest_id not in self.numbers:
+                self.assign(quest_id)
+
+    def mask(self, quest_ids):
+        """Bitmask of the quests in quest_ids (quests without a number are skipped)"""
+        bits = 0
+        numbers = self.numbers
+        for quest_id in quest_ids:
+            number = numbers.get(quest_id)
+            if number is not None:
+                bits |= 1 << number
+        return bits
+
+    def assign_mask(self, quest_ids):
+        """Bitmask of the quests in quest_ids, numbering any new ones"""
+        bits = 0
+        for quest_id in quest_ids:
+            bits |= 1 << self.assign(quest_id)
+        return bits
+
+    def all_numbered(self, quest_ids):
+        """True if every quest in quest_ids has a number"""
+        numbers = self.numbers
+        return all(quest_id in numbers for quest_id in quest_ids)
+
+    def quest_ids_of(self, bits):
+        """Quest IDs of the set bits, in number order"""
+        quest_ids = self.quest_ids
+        result = []
+        while bits:
+            lowest = bits & -bits
+            result.append(quest_ids[lowest.bit_length() - 1])
+            bits ^= lowest
+        return result
+
+
+# Numbering shared by every QuestSet
+QUEST_NUMBERS = QuestNumbers()
+
+
+class QuestSet:
+    """
+    A set of quest IDs stored as one integer bitset
+
+    Used for a character's active and completed quests. Membership and
+    size are constant time, "has every one of these quests" is a single
+    mask test, and it still behaves like the lists it replaces:
+    append/remove/in/len/iteration work, and it is equal to any list
+    holding the same quest IDs. Iteration follows quest numbering order.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, quest_ids=()):
+        """Create a set holding the given quest IDs"""
+        self.bits = QUEST_NUMBERS.assign_mask(quest_ids)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Create a set straight from a bitset"""
+        quest_set = cls()
+        quest_set.bits = bits
+        return quest_set
+
+    def append(self, quest_id):
+        """Add a quest (adding one that's already there does nothing)"""
+        self.bits |= 1 << QUEST_NUMBERS.assign(quest_id)
+
+    add = append
+
+    def remove(self, quest_id):
+        """
+        Remove a quest
+
+        Raises: ValueError if the quest isn't in the set (like a list)
+        """
+        if quest_id not in self:
+            raise ValueError(f"{quest_id} not in quest set")
+        self.bits &= ~(1 << QUEST_NUMBERS.numbers[quest_id])
+
+    def has_all(self, quest_ids):
+        """True if every quest in quest_ids is in the set"""
+        quest_ids = list(quest_ids)
+        if not QUEST_NUMBERS.all_numbered(quest_ids):
+            return False
+        mask = QUEST_NUMBERS.mask(quest_ids)
+        return self.bits & mask == mask
+
+    def to_list(self):
+        """The quest IDs as a list"""
+        return list(self)
+
+    def to_hex(self):
+        """
+        Compact text form of the bitset
+
+        Uses this process's quest numbering; binary saves translate sets
+        through the save directory's quest table instead (see
+        character_manager.load_quest_table).
+        """
+        return format(self.bits, "x")
+
+    @classmethod
+    def from_hex(cls, text):
+        """Rebuild a set written by to_hex"""
+        return cls.from_bits(int(text, 16) if text else 0)
+
+    def copy(self):
+        """Independent copy of the set"""
+        return QuestSet.from_bits(self.bits)
+
+    def __reduce__(self):
+        # Pickle quest IDs, since another process numbers quests differently
+        return (QuestSet, (list(self),))
+
+    def __contains__(self, quest_id):
+        number = QUEST_NUMBERS.numbers.get(quest_id)
+        return number is not None and (self.bits >> number) & 1 == 1
+
+    def __len__(self):
+        return bin(self.bits).count("1")
+
+    def __iter__(self):
+        return iter(QUEST_NUMBERS.quest_ids_of(self.bits))
+
+    def __or__(self, other):
+        if not isinstance(other, QuestSet):
+            other = QuestSet(other)
+        return QuestSet.from_bits(self.bits | other.bits)
+
+    def __and__(self, other):
+        return QuestSet.from_bits(self.bits & as_quest_bits(other))
+
+    def __sub__(self, other):
+        return QuestSet.from_bits(self.bits & ~as_quest_bits(other))
+
+    def __eq__(self, other):
+        if isinstance(other, QuestSet):
+            return self.bits == other.bits
+        if isinstance(other, (list, set, tuple)):
+            # A quest without a number can't be in this set
+            return QUEST_NUMBERS.all_numbered(other) and self.bits == QUEST_NUMBERS.mask(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"QuestSet({list(self)!r})"
+
+
+def as_quest_bits(quests):
+    """
+    Bitset for a QuestSet or any collection of quest IDs
+
+    Quests without a number are left out (they can't be in any QuestSet).
+    """
+    if isinstance(quests, QuestSet):
+        return quests.bits
+    return QUEST_NUMBERS.mask(quests)
+
+
 # ============================================================================
 # TESTING
 # ============================================================================
@@ -9,6 +9,7 @@ AI Usage: Microsoft Copilot
 This module handles inventory management, item usage, and equipment.
 """
 
+from game_data import STAT_NAMES, compile_item_effect
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -16,9 +17,267 @@ from custom_exceptions import (
     InvalidItemTypeError
 )
 
-# Maximum inventory size
+# Maximum inventory size (in slots; a slot holds one stack of an item)
 MAX_INVENTORY_SIZE = 20
 
+# Compiled effects for item dictionaries that weren't loaded by game_data,
+# keyed by effect string
+EFFECT_CACHE = {}
+
+# Item ID -> how many copies fit in one slot (from STACK in items.txt).
+# Items not listed take one slot each.
+STACK_LIMITS = {}
+
+# Bumped by set_stack_limits, so inventories know their slot counts
+# were worked out with old limits
+STACK_LIMITS_VERSION = 0
+
+
+# ============================================================================
+# INVENTORY CONTAINER
+# ============================================================================
+
+class Inventory:
+    """
+    A character's items, stored as item ID -> count in first-added order
+
+    Membership, counting, adding and removing take constant time no matter
+    how big the bag is, and so does counting used slots: a running slot
+    count is updated as items come and go (and recounted once if the stack
+    limits are reloaded). It behaves like the list inventories it replaces:
+    append/remove/count/in/len work the same, iterating yields every copy
+    of every item (copies of the same item come out together), and it is
+    equal to any list holding the same items.
+    """
+
+    __slots__ = ("counts", "size", "slots", "limits_version")
+
+    def __init__(self, items=()):
+        """Create an inventory holding the given item IDs"""
+        self.counts = {}
+        self.size = 0
+        self.slots = 0
+        self.limits_version = STACK_LIMITS_VERSION
+        for item_id in items:
+            self.append(item_id)
+
+    def append(self, item_id):
+        """Add one copy of an item"""
+        count = self.counts.get(item_id, 0)
+        # A new slot is needed when every stack of this item is full
+        if count % STACK_LIMITS.get(item_id, 1) == 0:
+            self.slots += 1
+        self.counts[item_id] = count + 1
+        self.size += 1
+
+    def extend(self, item_ids):
+        """Add every item in item_ids"""
+        for item_id in item_ids:
+            self.append(item_id)
+
+    def remove(self, item_id):
+        """
+        Remove one copy of an item
+
+        Raises: ValueError if the item isn't in the inventory (like a list)
+        """
+        count = self.counts.get(item_id, 0)
+        if count == 0:
+            raise ValueError(f"{item_id} not in inventory")
+        if count == 1:
+            del self.counts[item_id]
+        else:
+            self.counts[item_id] = count - 1
+        self.size -= 1
+        # The slot is freed when this was the last copy in its stack
+        if (count - 1) % STACK_LIMITS.get(item_id, 1) == 0:
+            self.slots -= 1
+
+    def count(self, item_id):
+        """Number of copies of an item"""
+        return self.counts.get(item_id, 0)
+
+    def items(self):
+        """(item_id, count) pairs in first-added order"""
+        return self.counts.items()
+
+    def clear(self):
+        """Remove everything"""
+        self.counts.clear()
+        self.size = 0
+        self.slots = 0
+        self.limits_version = STACK_LIMITS_VERSION
+
+    def copy(self):
+        """Independent copy of the inventory"""
+        copy = Inventory()
+        copy.counts = dict(self.counts)
+        copy.size = self.size
+        copy.slots = self.slots
+        copy.limits_version = self.limits_version
+        return copy
+
+    def add(self, item_id, quantity):
+        """Add quantity copies of an item"""
+        count = self.counts.get(item_id, 0)
+        limit = STACK_LIMITS.get(item_id, 1)
+        self.slots += (count + quantity + limit - 1) // limit - (count + limit - 1) // limit
+        self.counts[item_id] = count + quantity
+        self.size += quantity
+
+    def slot_count(self):
+        """
+        Number of slots used (full and partial stacks)
+
+        Returns: Integer number of slots
+        """
+        if self.limits_version != STACK_LIMITS_VERSION:
+            # Stack limits were reloaded since the running count started
+            self.slots = count_stack_slots(self.counts)
+            self.limits_version = STACK_LIMITS_VERSION
+        return self.slots
+
+    def to_save_field(self):
+        """
+        Comma-separated item IDs, as written in save files
+
+        Repeated items are written once as "item_id*quantity".
+        """
+        return ",".join(item_id if count == 1 else f"{item_id}*{count}"
+                        for item_id, count in self.counts.items())
+
+    @classmethod
+    def from_save_field(cls, text):
+        """
+        Build an inventory from a comma-separated save field
+
+        Reads both "item_id*quantity" entries and repeated item IDs.
+
+        Raises: ValueError if a quantity is not a positive integer
+        """
+        inventory = cls()
+        for entry in text.split(",") if text else []:
+            item_id, _, quantity = entry.partition("*")
+            quantity = int(quantity) if quantity else 1
+            if quantity < 1:
+                raise ValueError(f"Bad quantity for {item_id}: {quantity}")
+            inventory.add(item_id, quantity)
+        return inventory
+
+    def __contains__(self, item_id):
+        return item_id in self.counts
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for item_id, count in self.counts.items():
+            for _ in range(count):
+                yield item_id
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self.counts == other.counts
+        if isinstance(other, list):
+            return self.size == len(other) and self.counts == Inventory(other).counts
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Inventory({list(self)!r})"
+
+
+def item_counts(inventory):
+    """
+    Get item ID -> count for an Inventory or a plain list inventory
+
+    Returns: Dictionary in first-added order
+    """
+    if isinstance(inventory, Inventory):
+        return inventory.counts
+    counts = {}
+    for item_id in inventory:
+        counts[item_id] = counts.get(item_id, 0) + 1
+    return counts
+
+
+def format_inventory_field(inventory):
+    """Save file text for an Inventory or a plain list inventory"""
+    if not isinstance(inventory, Inventory):
+        inventory = Inventory(inventory)
+    return inventory.to_save_field()
+
+
+# ============================================================================
+# STACKING AND SLOTS
+# ============================================================================
+
+def set_stack_limits(item_data_dict):
+    """
+    Load per-item stack limits from the item catalog
+
+    Call again whenever the item catalog is reloaded.
+    """
+    global STACK_LIMITS_VERSION
+
+    limits = {item_id: item.get("stack", 1) for item_id, item in item_data_dict.items()}
+    STACK_LIMITS.clear()
+    STACK_LIMITS.update(limits)
+    STACK_LIMITS_VERSION += 1
+
+
+def get_stack_limit(item_id):
+    """How many copies of an item fit in one slot"""
+    return STACK_LIMITS.get(item_id, 1)
+
+
+def count_slots(inventory):
+    """
+    Count the slots an inventory uses (full and partial stacks)
+
+    Returns: Integer number of slots
+    """
+    if isinstance(inventory, Inventory):
+        return inventory.slot_count()
+    return count_stack_slots(item_counts(inventory))
+
+
+def count_stack_slots(counts):
+    """
+    Count the slots needed for {item_id: count}
+
+    Returns: Integer number of slots
+    """
+    slots = 0
+    for item_id, count in counts.items():
+        limit = STACK_LIMITS.get(item_id, 1)
+        slots += (count + limit - 1) // limit
+    return slots
+
+
+def get_character_inventory(character):
+    """
+    Get a character's inventory
+
+    Reads the Character slot directly (much cheaper than the mapping
+    lookup), falling back to character["inventory"] for plain dictionaries.
+    """
+    inventory = getattr(character, "inventory", None)
+    if inventory is None:
+        inventory = character["inventory"]
+    return inventory
+
+
+def has_room_for(character, item_id):
+    """
+    Check if one more copy of an item fits in the inventory
+
+    It fits if it tops up a partly filled stack, or a slot is free.
+    """
+    inventory = get_character_inventory(character)
+    if inventory.count(item_id) % get_stack_limit(item_id) != 0:
+        return True
+    return count_slots(inventory) < MAX_INVENTORY_SIZE
+
 
 # ============================================================================
 # INVENTORY MANAGEMENT
@@ -33,12 +292,12 @@ def add_item_to_inventory(character, item_id):
         item_id: Unique item identifier
 
     Returns: True if added successfully
-    Raises: InventoryFullError if inventory is at max capacity
+    Raises: InventoryFullError if no slot or stack has room for the item
     """
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
+    if not has_room_for(character, item_id):
         raise InventoryFullError()
     else:
-        character["inventory"].append(item_id)
+        get_character_inventory(character).append(item_id)
     return True
 
 
@@ -53,8 +312,9 @@ def remove_item_from_inventory(character, item_id):
     Returns: True if removed successfully
     Raises: ItemNotFoundError if item not in inventory
     """
-    if item_id in character["inventory"]:
-        character["inventory"].remove(item_id)
+    inventory = get_character_inventory(character)
+    if item_id in inventory:
+        inventory.remove(item_id)
     else:
         raise ItemNotFoundError("Item not in inventory")
 
@@ -65,7 +325,7 @@ def has_item(character, item_id):
 
     Returns: True if item in inventory, False otherwise
     """
-    if item_id in character["inventory"]:
+    if item_id in get_character_inventory(character):
         return True
     else:
         return False
@@ -76,16 +336,16 @@ def count_item(character, item_id):
 
     Returns: Integer count of item
     """
-    return character["inventory"].count(item_id)
+    return get_character_inventory(character).count(item_id)
 
 
 def get_inventory_space_remaining(character):
     """
-    Calculate how many more items can fit in inventory
+    Calculate how many more slots are free in inventory
 
     Returns: Integer representing available slots
     """
-    return MAX_INVENTORY_SIZE - len(character["inventory"])
+    return MAX_INVENTORY_SIZE - count_slots(character["inventory"])
 
 
 def clear_inventory(character):
@@ -95,7 +355,7 @@ def clear_inventory(character):
     Returns: List of removed items
     """
     removed_items = list(character["inventory"])
-    character["inventory"] = []
+    character["inventory"] = Inventory()
     return removed_items
 
 
@@ -126,11 +386,13 @@ def use_item(character, item_id, item_data):
         raise ItemNotFoundError("Item not in inventory")
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError("Item type is not consumable")
-    stat, value = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, value)
+    changes = []
+    for stat_index, value in get_item_effects(item_data):
+        apply_stat_effect(character, STAT_NAMES[stat_index], value)
+        changes.append(f"{STAT_NAMES[stat_index]} increased by {value}")
     character["inventory"].remove(item_id)
 
-    return f"{item_id} used, {stat} increased by {value}"
+    return f"{item_id} used, {', '.join(changes)}"
 
 
 def equip_weapon(character, item_id, item_data):
@@ -142,7 +404,9 @@ def equip_weapon(character, item_id, item_data):
         item_id: Weapon to equip
         item_data: Item information dictionary
 
-    Weapon effect format: "strength:5" (adds 5 to strength)
+    Weapon effect format: "strength:5" (adds 5 to strength), several
+    effects may be listed ("strength:5,magic:2"). The bonus is added as
+    the character's "weapon" modifier layer.
 
     If character already has weapon equipped:
     - Unequip current weapon (remove bonus)
@@ -157,19 +421,7 @@ def equip_weapon(character, item_id, item_data):
         raise ItemNotFoundError("Item not in inventory")
     if item_data["type"] != "weapon":
         raise InvalidItemTypeError("Item cannot be equipped because it is not a weapon.")
-
-    if "equipped_weapon" in character and character["equipped_weapon"]:
-        old_item_id = character["equipped_weapon"]
-        character["inventory"].append(old_item_id)
-    stat, value = parse_item_effect(item_data["effect"])
-    character[stat] = character.get(stat, 0) + value
-
-    character["equipped_weapon"] = item_id
-
-    # Remove from inventory
-    character["inventory"].remove(item_id)
-
-    return f"Equipped {item_id}."
+    return equip_item(character, item_id, item_data, "equipped_weapon", "weapon")
 
 
 def equip_armor(character, item_id, item_data):
@@ -181,7 +433,8 @@ def equip_armor(character, item_id, item_data):
         item_id: Armor to equip
         item_data: Item information dictionary
 
-    Armor effect format: "max_health:10" (adds 10 to max_health)
+    Armor effect format: "max_health:10" (adds 10 to max_health). The
+    bonus is added as the character's "armor" modifier layer.
 
     If character already has armor equipped:
     - Unequip current armor (remove bonus)
@@ -196,60 +449,132 @@ def equip_armor(character, item_id, item_data):
         raise ItemNotFoundError("Item not in inventory")
     if item_data["type"] != "armor":
         raise InvalidItemTypeError("Item cannot be equipped because it is not armor.")
-    if "equipped_armor" in character and character["equipped_armor"]:
-        old_item_id = character["equipped_armor"]
-        character["inventory"].append(old_item_id)
-    stat, value = parse_item_effect(item_data["effect"])
-    character[stat] = character.get(stat, 0) + value
-    character["equipped_armor"] = item_id
-    character["inventory"].remove(item_id)
+    return equip_item(character, item_id, item_data, "equipped_armor", "armor")
+
 
+def equip_item(character, item_id, item_data, equipment_key, source):
+    """
+    Move an item from the inventory into an equipment slot
+
+    Any item already in the slot goes back to the inventory and its
+    modifier layer is replaced by the new item's.
+
+    Returns: String describing equipment change
+    """
+    character["inventory"].remove(item_id)
+    old_item_id = character.get(equipment_key)
+    if old_item_id:
+        remove_modifier(character, source)
+        character["inventory"].append(old_item_id)
+    apply_modifier(character, source, get_item_effects(item_data))
+    character[equipment_key] = item_id
     return f"Equipped {item_id}."
 
+
 def unequip_weapon(character, item_data_dict):
     """
     Remove equipped weapon and return it to inventory
 
+    The weapon's bonus is undone by dropping its modifier layer, so
+    item_data_dict is no longer needed (kept so callers don't change).
+
     Returns: Item ID that was unequipped, or None if no weapon equipped
     Raises: InventoryFullError if inventory is full
     """
-    if "equipped_weapon" in character and character["equipped_weapon"]:
-        weapon_id = character["equipped_weapon"]
-        weapon_data = item_data_dict[weapon_id]
-        stat, value = parse_item_effect(weapon_data["effect"])
-        character[stat] -= value
-
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("Inventory full")
-
-        character["inventory"].append(weapon_id)
-        character["equipped_weapon"] = None
-
-        return weapon_id
-    return None
+    return unequip_item(character, "equipped_weapon", "weapon")
 
 
 def unequip_armor(character, item_data_dict):
     """
     Remove equipped armor and return it to inventory
 
+    The armor's bonus is undone by dropping its modifier layer, so
+    item_data_dict is no longer needed (kept so callers don't change).
+
     Returns: Item ID that was unequipped, or None if no armor equipped
     Raises: InventoryFullError if inventory is full
     """
-    if "equipped_armor" in character and character["equipped_armor"]:
-        armor_id = character["equipped_armor"]
-        armor_data = item_data_dict[armor_id]
-        stat, value = parse_item_effect(armor_data["effect"])
-        character[stat] -= value
+    return unequip_item(character, "equipped_armor", "armor")
 
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("Inventory full")
 
-        character["inventory"].append(armor_id)
-        character["equipped_armor"] = None
+def unequip_item(character, equipment_key, source):
+    """
+    Move an equipped item back to the inventory and drop its modifier layer
 
-        return armor_id
-    return None
+    Returns: Item ID that was unequipped, or None if the slot was empty
+    Raises: InventoryFullError if inventory is full (nothing is changed)
+    """
+    item_id = character.get(equipment_key)
+    if not item_id:
+        return None
+    if not has_room_for(character, item_id):
+        raise InventoryFullError("Inventory full")
+    remove_modifier(character, source)
+    character["inventory"].append(item_id)
+    character[equipment_key] = None
+    return item_id
+
+
+# ============================================================================
+# STAT MODIFIERS
+# ============================================================================
+
+def apply_modifier(character, source, effects):
+    """
+    Add a stat modifier layer (equipment, buffs), replacing any earlier
+    layer from the same source
+
+    Characters from character_manager keep base stats and layers apart
+    and cache the totals. Plain character dictionaries get the change
+    applied to their stats directly, with the layer recorded under
+    character["modifiers"] so it can be undone exactly.
+
+    Args:
+        character: Character dictionary
+        source: Name of the layer (e.g. "weapon", "armor")
+        effects: Tuple of (stat_index, value) pairs (see get_item_effects)
+    """
+    if hasattr(character, "add_modifier"):
+        character.add_modifier(source, effects)
+        return
+    remove_modifier(character, source)
+    for stat_index, value in effects:
+        stat = STAT_NAMES[stat_index]
+        character[stat] = character.get(stat, 0) + value
+    character.setdefault("modifiers", {})[source] = tuple(effects)
+
+
+def remove_modifier(character, source):
+    """
+    Remove a stat modifier layer
+
+    Health is lowered to max_health if losing the layer leaves it above.
+
+    Returns: The layer's effects, or None if there was no such layer
+    """
+    if hasattr(character, "remove_modifier"):
+        effects = character.remove_modifier(source)
+    else:
+        modifiers = character.get("modifiers")
+        if not modifiers or source not in modifiers:
+            return None
+        effects = modifiers.pop(source)
+        for stat_index, value in effects:
+            character[STAT_NAMES[stat_index]] -= value
+    if effects and "health" in character and character["health"] > character["max_health"]:
+        character["health"] = character["max_health"]
+    return effects
+
+
+def get_effective_stats(character):
+    """
+    Get the character's stats with every modifier layer applied
+
+    Returns: Dictionary {stat_name: value}
+    """
+    if hasattr(character, "effective_stats"):
+        return character.effective_stats()
+    return {stat: character[stat] for stat in STAT_NAMES if stat in character}
 
 
 # ============================================================================
@@ -272,10 +597,10 @@ def purchase_item(character, item_id, item_data):
     """
     if character["gold"] < item_data["cost"]:
         raise InsufficientResourcesError("Not enough gold to purchase.")
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
+    if not has_room_for(character, item_id):
         raise InventoryFullError("Inventory full")
     character["gold"] -= item_data["cost"]
-    character["inventory"].append(item_id)
+    get_character_inventory(character).append(item_id)
     return True
 
 
@@ -291,14 +616,150 @@ def sell_item(character, item_id, item_data):
     Returns: Amount of gold received
     Raises: ItemNotFoundError if item not in inventory
     """
-    if item_id not in character["inventory"]:
+    inventory = get_character_inventory(character)
+    if item_id not in inventory:
         raise ItemNotFoundError("Item not in inventory")
     price = item_data["cost"] // 2
-    character["inventory"].remove(item_id)
+    inventory.remove(item_id)
     character["gold"] += price
     return price
 
 
+class ShopCart:
+    """
+    A basket of items to buy and sell in one transaction
+
+    Add items with buy() and sell(), then call checkout() to apply the
+    whole basket at once.
+    """
+
+    def __init__(self):
+        """Create an empty cart"""
+        self.buying = {}
+        self.selling = {}
+
+    def buy(self, item_id, quantity=1):
+        """Add quantity copies of an item to buy"""
+        add_to_basket(self.buying, item_id, quantity)
+
+    def sell(self, item_id, quantity=1):
+        """Add quantity copies of an item to sell"""
+        add_to_basket(self.selling, item_id, quantity)
+
+    def clear(self):
+        """Empty the cart"""
+        self.buying.clear()
+        self.selling.clear()
+
+    def is_empty(self):
+        """True if nothing is in the cart"""
+        return not self.buying and not self.selling
+
+    def checkout(self, character, item_data_dict):
+        """
+        Apply the cart to character and empty it if it succeeds
+
+        Returns: Receipt dictionary (see checkout)
+        Raises: The same errors as checkout (the cart is kept)
+        """
+        receipt = checkout(character, item_data_dict, self.buying, self.selling)
+        self.clear()
+        return receipt
+
+
+def add_to_basket(basket, item_id, quantity):
+    """
+    Add quantity of item_id to a basket dictionary {item_id: quantity}
+
+    Raises: ValueError if quantity is not a positive integer
+    """
+    if not isinstance(quantity, int) or quantity < 1:
+        raise ValueError(f"Quantity must be a positive whole number, got {quantity}")
+    basket[item_id] = basket.get(item_id, 0) + quantity
+
+
+def make_basket(items):
+    """
+    Turn {item_id: quantity}, a list of item IDs or None into a new basket
+
+    Raises: ValueError if a quantity is not a positive integer
+    """
+    basket = {}
+    if items is None:
+        return basket
+    if isinstance(items, dict):
+        for item_id, quantity in items.items():
+            add_to_basket(basket, item_id, quantity)
+        return basket
+    return dict(item_counts(items))
+
+
+def checkout(character, item_data_dict, buying=None, selling=None):
+    """
+    Buy and sell a whole basket of items in one transaction
+
+    Everything is checked before anything changes: every item must exist,
+    sold items must be in the inventory, gold (including money from the
+    items sold) must cover the purchases, and the final inventory must
+    fit in MAX_INVENTORY_SIZE slots. If any check fails, the character is
+    left untouched.
+
+    Args:
+        character: Character dictionary
+        item_data_dict: Dictionary of all item data
+        buying: Items to buy, as {item_id: quantity} or a list of item IDs
+        selling: Items to sell (sold for half cost), in the same forms
+
+    Returns: Receipt dictionary with 'bought' and 'sold' ({item_id: quantity}),
+             'spent', 'earned' and 'gold' (gold after the transaction)
+    Raises:
+        ItemNotFoundError if an item doesn't exist or isn't owned
+        InsufficientResourcesError if not enough gold
+        InventoryFullError if the items bought won't fit
+    """
+    buying = make_basket(buying)
+    selling = make_basket(selling)
+    for item_id in list(buying) + list(selling):
+        if item_id not in item_data_dict:
+            raise ItemNotFoundError(f"Unknown item: {item_id}")
+
+    inventory = character["inventory"]
+    for item_id, quantity in selling.items():
+        if inventory.count(item_id) < quantity:
+            raise ItemNotFoundError(f"Not enough {item_id} in inventory to sell {quantity}")
+
+    spent = sum(item_data_dict[item_id]["cost"] * quantity for item_id, quantity in buying.items())
+    earned = sum(item_data_dict[item_id]["cost"] // 2 * quantity for item_id, quantity in selling.items())
+    if character["gold"] + earned < spent:
+        raise InsufficientResourcesError(
+            f"Not enough gold: basket costs {spent}, you have {character['gold'] + earned}")
+
+    if buying:
+        counts = dict(item_counts(inventory))
+        for item_id, quantity in selling.items():
+            counts[item_id] -= quantity
+        for item_id, quantity in buying.items():
+            counts[item_id] = counts.get(item_id, 0) + quantity
+        if count_stack_slots(counts) > MAX_INVENTORY_SIZE:
+            raise InventoryFullError("Not enough inventory space for this basket")
+
+    # Every check passed, so apply the whole basket
+    for item_id, quantity in selling.items():
+        for _ in range(quantity):
+            inventory.remove(item_id)
+    for item_id, quantity in buying.items():
+        for _ in range(quantity):
+            inventory.append(item_id)
+    character["gold"] += earned - spent
+    return {
+        "bought": buying,
+        "sold": selling,
+        "spent": spent,
+        "earned": earned,
+        "gold": character["gold"]
+    }
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -317,6 +778,26 @@ def parse_item_effect(effect_string):
     return (broken[0], int(broken[1]))
 
 
+def get_item_effects(item_data):
+    """
+    Get an item's compiled effects
+
+    Items loaded by game_data carry them in item_data["effects"]; for other
+    item dictionaries the EFFECT string is compiled once and cached.
+
+    Returns: Tuple of (stat_index, value) pairs (see game_data.STAT_NAMES)
+    Raises: InvalidDataFormatError if the effect string is malformed
+    """
+    effects = item_data.get("effects")
+    if effects is None:
+        effect = item_data["effect"]
+        effects = EFFECT_CACHE.get(effect)
+        if effects is None:
+            effects = compile_item_effect(effect)
+            EFFECT_CACHE[effect] = effects
+    return effects
+
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
@@ -344,12 +825,9 @@ def display_inventory(character, item_data_dict):
 
     Shows item names, types, and quantities
     """
-    if character["inventory"] == []:
+    if len(character["inventory"]) == 0:
         print(f"Inventory is empty")
-    inventory = character["inventory"]
-    counts = {}
-    for item in inventory:
-        counts[item] = counts.get(item, 0) + 1
+    counts = item_counts(character["inventory"])
 
     print("Inventory:")
     for item_id, qty in counts.items():
@@ -370,7 +848,7 @@ if __name__ == "__main__":
     print("=== INVENTORY SYSTEM TEST ===")
 
     # Test adding items
-    test_char = {'inventory': [], 'gold': 100, 'health': 80, 'max_health': 80}
+    test_char = {'inventory': Inventory(), 'gold': 100, 'health': 80, 'max_health': 80}
 
     try:
         add_item_to_inventory(test_char, "health_potion")
@@ -16,6 +16,7 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import catalog_watcher
 from custom_exceptions import *
 
 # ============================================================================
@@ -27,6 +28,14 @@ current_character = None
 all_quests = {}
 all_items = {}
 game_running = False
+data_watcher = None
+save_queue = None
+item_index = None
+quest_graph = None
+quest_index = None
+
+# Items shown per page in the shop
+SHOP_PAGE_SIZE = 10
 
 
 # ============================================================================
@@ -75,7 +84,7 @@ def new_game():
     except InvalidCharacterClassError:
         print("Invalid character class.")
         return None
-    character_manager.save_character(current_character)
+    get_save_queue().enqueue(current_character)
     print(f"\nHello, {user_name} the {user_class}!")
     game_loop()
 
@@ -88,6 +97,7 @@ def load_game():
     """
     global current_character
 
+    finish_saves()
     try:
         saved_characters = character_manager.list_saved_characters()
         if not saved_characters:
@@ -124,6 +134,7 @@ def game_loop():
     game_running = True
 
     while game_running:
+        refresh_game_data()
         choice = game_menu()
         if choice == 1:
             view_character_stats()
@@ -137,8 +148,11 @@ def game_loop():
             shop()
         elif choice == 6:
             save_game()
+            finish_saves()
             print("Game saved. Exiting...")
             game_running = False
+        if choice in (2, 3, 4, 5):
+            autosave()
 
 
 def game_menu():
@@ -207,13 +221,15 @@ def view_inventory():
     if inventory_choice == "1":
         item_choice = input("\nWhat item do you want to use:")
         try:
-            inventory_system.use_item(current_character, item_choice, all_items)
+            print(inventory_system.use_item(current_character, item_choice,
+                                            get_item_data(item_choice)))
         except Exception as e:
             print(f"Error using item: {e}")
     elif inventory_choice == "2":
         item_choice = input("\nWhat weapon do you want to equip:")
         try:
-            inventory_system.equip_weapon(current_character, item_choice, all_items)
+            print(inventory_system.equip_weapon(current_character, item_choice,
+                                                get_item_data(item_choice)))
         except Exception as e:
             print(f"Error equipping weapon: {e}")
     elif inventory_choice == "3":
@@ -224,10 +240,22 @@ def view_inventory():
             print(f"Error dropping item: {e}")
 
 
+def get_item_data(item_id):
+    """
+    Look up an item in the loaded catalog
+
+    Raises: ItemNotFoundError if the item doesn't exist
+    """
+    if item_id not in all_items:
+        raise ItemNotFoundError(f"Unknown item: {item_id}")
+    return all_items[item_id]
+
+
 def quest_menu():
     """Quest management menu"""
     global current_character, all_quests
 
+    index = get_quest_index()
     while True:
         print("\n=== Quest Menu ===")
         print("1. View Active Quests")
@@ -243,18 +271,18 @@ def quest_menu():
             if choice == "1":
                 quest_handler.display_quest_list(quest_handler.get_active_quests(current_character, all_quests))
             elif choice == "2":
-                quest_handler.display_quest_list(quest_handler.get_available_quests(current_character, all_quests))
+                quest_handler.display_quest_list(quest_handler.get_available_quests(current_character, all_quests, index))
             elif choice == "3":
                 quest_handler.display_quest_list(quest_handler.get_completed_quests(current_character, all_quests))
             elif choice == "4":
                 quest_id = input("Enter quest ID to accept: ")
-                quest_handler.accept_quest(current_character, quest_id, all_quests)
+                quest_handler.accept_quest(current_character, quest_id, all_quests, index)
             elif choice == "5":
                 quest_id = input("Enter quest ID to abandon: ")
-                quest_handler.abandon_quest(current_character, quest_id)
+                quest_handler.abandon_quest(current_character, quest_id, index)
             elif choice == "6":
                 quest_id = input("Enter quest ID to complete (testing): ")
-                quest_handler.complete_quest(current_character, quest_id, all_quests)
+                quest_handler.complete_quest(current_character, quest_id, all_quests, index)
             elif choice == "7":
                 print("Returning to game menu...")
                 break
@@ -267,6 +295,20 @@ def quest_menu():
             print(f"Unexpected error: {e}")
 
 
+def get_quest_index():
+    """
+    Get the available quest index for the current character
+
+    A new index is built when the character or the quest catalog changed.
+    """
+    global quest_index
+
+    if (quest_index is None or quest_index.character is not current_character
+            or quest_index.quests is not all_quests):
+        quest_index = quest_handler.AvailableQuestIndex(current_character, all_quests, quest_graph)
+    return quest_index
+
+
 def explore():
     """Find and fight random enemies"""
     global current_character
@@ -291,38 +333,109 @@ def shop():
     """Shop menu for buying/selling items"""
     global current_character, all_items
 
+    cart = inventory_system.ShopCart()
+    show_shop_items()
     while True:
         print("\n=== Shop Menu ===")
         print(f"Your Gold: {current_character['gold']}")
-        print("Available Items:")
-        for item_id, data in all_items.items():
-            print(f"- {data['name']} ({data['type']}) : {data['cost']} gold")
-
-        print("\nOptions:\n1. Buy Item\n2. Sell Item\n3. Back")
+        print("\nOptions:\n1. Buy Item\n2. Sell Item\n3. View Cart\n4. Checkout\n"
+              "5. Show Items\n6. Back")
         choice = input("Enter your choice: ")
 
         try:
-            if choice == "1":
-                item_id = input("Enter item ID to buy: ")
-                if item_id in all_items:
-                    inventory_system.purchase_item(current_character, item_id, all_items[item_id])
-                    print(f"Purchased {all_items[item_id]['name']}!")
-                else:
+            if choice in ["1", "2"]:
+                action = "buy" if choice == "1" else "sell"
+                item_id, quantity = read_cart_entry(f"Enter item ID to {action} (and quantity): ")
+                if item_id not in all_items:
                     print("Invalid item ID.")
-            elif choice == "2":
-                item_id = input("Enter item ID to sell: ")
-                if item_id in all_items:
-                    gold_received = inventory_system.sell_item(current_character, item_id, all_items[item_id])
-                    print(f"Sold {all_items[item_id]['name']} for {gold_received} gold!")
+                elif choice == "1":
+                    cart.buy(item_id, quantity)
+                    print(f"Added {quantity} x {all_items[item_id]['name']} to buy.")
                 else:
-                    print("Invalid item ID.")
+                    cart.sell(item_id, quantity)
+                    print(f"Added {quantity} x {all_items[item_id]['name']} to sell.")
             elif choice == "3":
+                show_cart(cart)
+            elif choice == "4":
+                if cart.is_empty():
+                    print("Your cart is empty.")
+                else:
+                    show_receipt(cart.checkout(current_character, all_items))
+            elif choice == "5":
+                show_shop_items()
+            elif choice == "6":
+                if not cart.is_empty():
+                    print("Cart discarded.")
                 break
             else:
                 print("Invalid choice.")
         except Exception as e:
             print(f"Error: {e}")
 
+
+def show_shop_items():
+    """Print the shop's items, optionally filtered, one page at a time"""
+    global item_index
+
+    if item_index is None:
+        item_index = game_data.ItemCatalogIndex(all_items)
+    filters = {}
+    item_type = input("Item type (weapon/armor/consumable, blank for all): ").strip()
+    if item_type:
+        filters["item_type"] = item_type
+    max_cost = input("Most you want to spend (blank for any): ").strip()
+    if max_cost.isdigit():
+        filters["max_cost"] = int(max_cost)
+    elif max_cost:
+        print("Not a number, showing every price.")
+
+    page = 0
+    while True:
+        results = item_index.page(page, SHOP_PAGE_SIZE, **filters)
+        print(f"Available Items (page {page + 1} of {results['pages']}, {results['total']} items):")
+        for item_id in results['items']:
+            data = all_items[item_id]
+            print(f"- {data['name']} [{item_id}] ({data['type']}) : {data['cost']} gold")
+        if page + 1 >= results['pages'] or input("Next page? (y/n): ").strip().lower() != "y":
+            break
+        page += 1
+
+
+def read_cart_entry(prompt):
+    """
+    Ask for "item_id" or "item_id quantity"
+
+    Returns: Tuple (item_id, quantity)
+    Raises: ValueError if the quantity is not a number
+    """
+    parts = input(prompt).split()
+    if not parts:
+        return "", 1
+    quantity = int(parts[1]) if len(parts) > 1 else 1
+    return parts[0], quantity
+
+
+def show_cart(cart):
+    """Print what is in the shopping cart"""
+    if cart.is_empty():
+        print("Your cart is empty.")
+        return
+    for item_id, quantity in cart.buying.items():
+        print(f"Buy  {quantity} x {all_items[item_id]['name']} : {all_items[item_id]['cost'] * quantity} gold")
+    for item_id, quantity in cart.selling.items():
+        print(f"Sell {quantity} x {all_items[item_id]['name']} : {all_items[item_id]['cost'] // 2 * quantity} gold")
+
+
+def show_receipt(receipt):
+    """Print a checkout receipt"""
+    print("\n=== Receipt ===")
+    for item_id, quantity in receipt['bought'].items():
+        print(f"Bought {quantity} x {all_items[item_id]['name']}")
+    for item_id, quantity in receipt['sold'].items():
+        print(f"Sold {quantity} x {all_items[item_id]['name']}")
+    print(f"Spent {receipt['spent']} gold, earned {receipt['earned']} gold. "
+          f"Gold left: {receipt['gold']}")
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -332,34 +445,69 @@ def save_game():
     global current_character
 
     try:
-        character_manager.save_character(current_character)
+        get_save_queue().enqueue(current_character)
         print(f"Game saved successfully for {current_character['name']}!")
-    except FileNotFoundError:
-        print("Error: Save file not found.")
-    except IOError as e:
-        print(f"File I/O error while saving: {e}")
     except Exception as e:
         print(f"Unexpected error while saving game: {e}")
 
 
+def get_save_queue():
+    """Get the background save queue, starting it the first time"""
+    global save_queue
+
+    if save_queue is None:
+        # Journal each queued save so a crash before it's written loses nothing
+        save_queue = character_manager.SaveQueue(journal=True)
+    return save_queue
+
+
+def finish_saves():
+    """Write any queued saves now and report saves that failed"""
+    if save_queue is None:
+        return
+    for name, error in save_queue.flush():
+        print(f"Error saving {name}: {error}")
+
+
+def autosave():
+    """Queue the current character's progress to be journaled and saved in the background"""
+    try:
+        get_save_queue().enqueue(current_character)
+    except Exception as e:
+        print(f"Autosave failed: {e}")
+
+
 def load_game_data():
     """Load all quest and item data from files"""
-    global all_quests, all_items
+    global all_quests, all_items, data_watcher, item_index, quest_graph
 
     try:
         # Load quests and items from expected files
-        all_quests = game_data.load_quests("data/quests.txt")
-        all_items = game_data.load_items("data/items.txt")
+        all_quests = game_data.load_quests_snapshot("data/quests.txt")
+        all_items = game_data.load_items_snapshot("data/items.txt")
+        quest_graph = quest_handler.QuestGraph(all_quests)
+        data_watcher = catalog_watcher.CatalogWatcher("data/quests.txt", "data/items.txt",
+                                                      all_quests, all_items)
+        inventory_system.set_stack_limits(all_items)
+        quest_handler.quest_catalog_changed()
+        item_index = game_data.ItemCatalogIndex(all_items)
         print("Game data loaded successfully!")
 
     except MissingDataFileError:
         print("Missing data files. Creating default data...")
         game_data.create_default_data_files()
-        all_quests = game_data.load_quests("data/quests.txt")
-        all_items = game_data.load_items("data/items.txt")
+        all_quests = game_data.load_quests_snapshot("data/quests.txt")
+        all_items = game_data.load_items_snapshot("data/items.txt")
+        quest_graph = quest_handler.QuestGraph(all_quests)
+        data_watcher = catalog_watcher.CatalogWatcher("data/quests.txt", "data/items.txt",
+                                                      all_quests, all_items)
+        inventory_system.set_stack_limits(all_items)
+        quest_handler.quest_catalog_changed()
+        item_index = game_data.ItemCatalogIndex(all_items)
         print("Default data created and loaded.")
 
-    except InvalidDataFormatError as e:
+    except (InvalidDataFormatError, QuestNotFoundError) as e:
+        # QuestNotFoundError: a quest's prerequisite isn't in the catalog
         print(f"Error loading game data: {e}")
         print("Please check your data files for formatting issues.")
         raise
@@ -368,6 +516,33 @@ def load_game_data():
         print(f"Unexpected error while loading game data: {e}")
         raise
 
+def validate_game_data(quests, items):
+    """
+    Check a reloaded catalog version before it is used
+
+    Raises: QuestNotFoundError if a quest's prerequisite doesn't exist
+    """
+    quest_handler.QuestGraph(quests)
+
+def refresh_game_data():
+    """Swap in updated quest and item data if the data files changed"""
+    global all_quests, all_items, item_index, quest_graph
+
+    if data_watcher is None:
+        return
+    try:
+        # The watcher only swaps in the new version once its quests check out
+        if data_watcher.poll(validate_game_data):
+            quest_graph = quest_handler.QuestGraph(data_watcher.quests)
+            all_quests = data_watcher.quests
+            all_items = data_watcher.items
+            inventory_system.set_stack_limits(all_items)
+            quest_handler.quest_catalog_changed()
+            item_index = game_data.ItemCatalogIndex(all_items)
+            print("Game data updated.")
+    except (DataError, QuestNotFoundError) as e:
+        print(f"Could not reload game data, keeping the current version: {e}")
+
 def handle_character_death():
     """Handle character death"""
     global current_character, game_running
@@ -437,11 +612,17 @@ def main():
         print("Creating default game data...")
         game_data.create_default_data_files()
         load_game_data()
-    except InvalidDataFormatError as e:
+    except (InvalidDataFormatError, QuestNotFoundError) as e:
         print(f"Error loading game data: {e}")
         print("Please check data files for errors.")
         return
 
+    # Apply progress journaled since the last full save
+    try:
+        character_manager.replay_journal()
+    except (OSError, SaveFileCorruptedError, InvalidSaveDataError) as e:
+        print(f"Could not restore autosaved progress: {e}")
+
     # Main menu loop
     while True:
         choice = main_menu()
@@ -451,6 +632,7 @@ def main():
         elif choice == 2:
             load_game()
         elif choice == 3:
+            finish_saves()
             print("\nThanks for playing Quest Chronicles!")
             break
         else:
@@ -11,8 +11,17 @@ AI Usage: Microsoft Copilot
 
 This module handles quest management, dependencies, and completion.
 """
-from character_manager import gain_experience, add_gold
+import bisect
+
+import character_manager
+from character_manager import Character, gain_experience, add_gold
+from game_data import QUEST_NUMBERS, QuestSet, as_quest_bits
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from custom_exceptions import (
+    InvalidDataFormatError,
     QuestNotFoundError,
     QuestRequirementsNotMetError,
     QuestAlreadyCompletedError,
@@ -20,12 +29,16 @@ from custom_exceptions import (
     InsufficientLevelError
 )
 
+# Bumped by quest_catalog_changed, so cached quest totals know the
+# rewards they were summed from may be out of date
+QUEST_CATALOG_VERSION = 0
+
 
 # ============================================================================
 # QUEST MANAGEMENT
 # ============================================================================
 
-def accept_quest(character, quest_id, quest_data_dict):
+def accept_quest(character, quest_id, quest_data_dict, index=None):
     """
     Accept a new quest
 
@@ -33,6 +46,7 @@ def accept_quest(character, quest_id, quest_data_dict):
         character: Character dictionary
         quest_id: Quest to accept
         quest_data_dict: Dictionary of all quest data
+        index: Character's AvailableQuestIndex to keep up to date (optional)
 
     Requirements to accept quest:
     - Character level >= quest required_level
@@ -61,10 +75,12 @@ def accept_quest(character, quest_id, quest_data_dict):
         return False
     else:
         character["active_quests"].append(quest_id)
+        if index is not None:
+            index.quest_accepted(quest_id)
         return True
 
 
-def complete_quest(character, quest_id, quest_data_dict):
+def complete_quest(character, quest_id, quest_data_dict, index=None):
     """
     Complete an active quest and grant rewards
 
@@ -72,6 +88,7 @@ def complete_quest(character, quest_id, quest_data_dict):
         character: Character dictionary
         quest_id: Quest to complete
         quest_data_dict: Dictionary of all quest data
+        index: Character's AvailableQuestIndex to keep up to date (optional)
 
     Rewards:
     - Experience points (reward_xp)
@@ -87,8 +104,21 @@ def complete_quest(character, quest_id, quest_data_dict):
     quest_info = quest_data_dict[quest_id]
     if quest_id not in character["active_quests"]:
         raise QuestNotActiveError(f"{quest_id} is not active.")
+    totals = None
+    completed_quests = character["completed_quests"]
+    if (isinstance(character, Character) and character.quest_totals is not None
+            and quest_id not in completed_quests):
+        # Make sure the cached totals are current before adding this quest
+        totals = get_quest_totals(character, quest_data_dict)
     character["active_quests"].remove(quest_id)
-    character["completed_quests"].append(quest_id)
+    completed_quests.append(quest_id)
+    if index is not None:
+        index.quest_completed(quest_id)
+    if totals is not None and isinstance(completed_quests, QuestSet):
+        total_xp, total_gold, completed = totals
+        character.quest_totals = (total_xp + quest_info["reward_xp"],
+                                  total_gold + quest_info["reward_gold"],
+                                  completed + 1, completed_quests.bits, QUEST_CATALOG_VERSION)
     gain_experience(character, quest_info["reward_xp"])
     add_gold(character, quest_info["reward_gold"])
     return {
@@ -98,16 +128,23 @@ def complete_quest(character, quest_id, quest_data_dict):
         "reward_xp": quest_info["reward_xp"]
     }
 
-def abandon_quest(character, quest_id):
+def abandon_quest(character, quest_id, index=None):
     """
     Remove a quest from active quests without completing it
 
+    Args:
+        character: Character dictionary
+        quest_id: Quest to abandon
+        index: Character's AvailableQuestIndex to keep up to date (optional)
+
     Returns: True if abandoned
     Raises: QuestNotActiveError if quest not active
     """
     if quest_id not in character["active_quests"]:
         raise QuestNotActiveError(f"{quest_id} is not active.")
     character["active_quests"].remove(quest_id)
+    if index is not None:
+        index.quest_abandoned(quest_id)
     return True
 
 
@@ -144,14 +181,22 @@ def get_completed_quests(character, quest_data_dict):
     return result
 
 
-def get_available_quests(character, quest_data_dict):
+def get_available_quests(character, quest_data_dict, index=None):
     """
     Get quests that character can currently accept
 
     Available = meets level req + prerequisite done + not completed + not active
 
+    Args:
+        character: Character dictionary
+        quest_data_dict: Dictionary of all quest data
+        index: Character's AvailableQuestIndex (optional). With an index
+               no full scan of the quest catalog is needed.
+
     Returns: List of quest dictionaries
     """
+    if index is not None:
+        return index.available_quests()
     available_quests = []
     for quest_id in quest_data_dict:
         quest_info = quest_data_dict[quest_id]
@@ -215,20 +260,31 @@ def can_accept_quest(character, quest_id, quest_data_dict):
         return True
 
 
-def get_quest_prerequisite_chain(quest_id, quest_data_dict):
+def get_quest_prerequisite_chain(quest_id, quest_data_dict, graph=None):
     """
     Get the full chain of prerequisites for a quest
 
+    Args:
+        quest_id: Quest to look up
+        quest_data_dict: Dictionary of all quest data
+        graph: QuestGraph built from quest_data_dict (optional). With a
+               graph the chain is a cached lookup instead of a walk.
+
     Returns: List of quest IDs in order [earliest_prereq, ..., quest_id]
     Example: If Quest C requires Quest B, which requires Quest A:
              Returns ["quest_a", "quest_b", "quest_c"]
 
-    Raises: QuestNotFoundError if quest doesn't exist
+    Raises:
+        QuestNotFoundError if quest doesn't exist
+        InvalidDataFormatError if the prerequisites loop back on themselves
     """
+    if graph is not None:
+        return list(graph.chain(quest_id))
     if quest_id not in quest_data_dict:
         raise QuestNotFoundError(f"{quest_id} does not exist.")
 
     prereq_chain = []
+    seen = {quest_id}
     current_id = quest_id
 
     while True:
@@ -240,6 +296,9 @@ def get_quest_prerequisite_chain(quest_id, quest_data_dict):
             break
         if prereq not in quest_data_dict:
             raise QuestNotFoundError(f"Prerequisite {prereq} does not exist.")
+        if prereq in seen:
+            raise InvalidDataFormatError(f"Quest prerequisites form a cycle through {prereq}.")
+        seen.add(prereq)
         prereq_chain.append(prereq)
         current_id = prereq
 
@@ -248,11 +307,283 @@ def get_quest_prerequisite_chain(quest_id, quest_data_dict):
     return prereq_chain
 
 
+# ============================================================================
+# QUEST GRAPH
+# ============================================================================
+
+class QuestGraph:
+    """
+    Prerequisite graph of the quest catalog, built once when quests load
+
+    Every quest has at most one prerequisite, so the graph is a forest.
+    Building it checks that every prerequisite exists and that none of
+    them loop back on themselves, and works out a topological order
+    (prerequisites first) and each quest's depth. Prerequisite chains are
+    cached the first time they are asked for.
+    """
+
+    def __init__(self, quest_data_dict):
+        """
+        Build the graph
+
+        Raises:
+            QuestNotFoundError if a prerequisite doesn't exist
+            InvalidDataFormatError if prerequisites form a cycle
+        """
+        self.quests = quest_data_dict
+        # Give every quest its QuestSet bit number up front
+        QUEST_NUMBERS.load_catalog(quest_data_dict)
+        self.parents = {}
+        self.children = {quest_id: [] for quest_id in quest_data_dict}
+        roots = []
+        for quest_id, quest_info in quest_data_dict.items():
+            prereq = quest_info["prerequisite"]
+            if prereq == "NONE":
+                roots.append(quest_id)
+                continue
+            if prereq not in quest_data_dict:
+                raise QuestNotFoundError(
+                    f"Quest '{quest_id}' has invalid prerequisite '{prereq}'."
+                )
+            self.parents[quest_id] = prereq
+            self.children[prereq].append(quest_id)
+
+        # Walk down from the quests with no prerequisite; anything never
+        # reached is part of (or depends on) a cycle
+        self.order = []
+        self.depths = {}
+        for root in roots:
+            self.depths[root] = 0
+            stack = [root]
+            while stack:
+                quest_id = stack.pop()
+                self.order.append(quest_id)
+                for child in self.children[quest_id]:
+                    self.depths[child] = self.depths[quest_id] + 1
+                    stack.append(child)
+        if len(self.order) != len(quest_data_dict):
+            stuck = sorted(quest_id for quest_id in quest_data_dict if quest_id not in self.depths)
+            raise InvalidDataFormatError(
+                f"Quest prerequisites form a cycle: {', '.join(stuck)}"
+            )
+        self.chains = {}
+        self.masks = {}
+
+    def chain(self, quest_id):
+        """
+        Get the prerequisite chain ending at quest_id
+
+        Returns: Tuple of quest IDs [earliest_prereq, ..., quest_id]
+        Raises: QuestNotFoundError if quest doesn't exist
+        """
+        chain = self.chains.get(quest_id)
+        if chain is not None:
+            return chain
+        if quest_id not in self.depths:
+            raise QuestNotFoundError(f"{quest_id} does not exist.")
+        # Find the nearest ancestor with a cached chain and build down from it
+        missing = []
+        current_id = quest_id
+        while current_id is not None and current_id not in self.chains:
+            missing.append(current_id)
+            current_id = self.parents.get(current_id)
+        chain = self.chains[current_id] if current_id is not None else ()
+        for current_id in reversed(missing):
+            chain = chain + (current_id,)
+            self.chains[current_id] = chain
+        return chain
+
+    def prerequisite_mask(self, quest_id):
+        """
+        QuestSet bitmask of every quest earlier in quest_id's chain
+
+        completed.bits & mask == mask means the whole chain is done.
+        """
+        mask = self.masks.get(quest_id)
+        if mask is None:
+            mask = QUEST_NUMBERS.mask(self.chain(quest_id)[:-1])
+            self.masks[quest_id] = mask
+        return mask
+
+    def chain_completed(self, quest_id, completed):
+        """
+        Check if every prerequisite in quest_id's chain is completed
+
+        Args:
+            quest_id: Quest to check
+            completed: QuestSet (or list) of completed quests
+        """
+        mask = self.prerequisite_mask(quest_id)
+        return as_quest_bits(completed) & mask == mask
+
+    def depth(self, quest_id):
+        """
+        Number of prerequisites before a quest (0 if it has none)
+
+        Raises: QuestNotFoundError if quest doesn't exist
+        """
+        if quest_id not in self.depths:
+            raise QuestNotFoundError(f"{quest_id} does not exist.")
+        return self.depths[quest_id]
+
+    def unlocks(self, quest_id):
+        """Quests that list quest_id as their prerequisite"""
+        return self.children.get(quest_id, [])
+
+
+# ============================================================================
+# AVAILABLE QUEST INDEX
+# ============================================================================
+
+class AvailableQuestIndex:
+    """
+    The quests one character can accept right now, kept up to date as
+    they accept, complete and abandon quests and level up
+
+    Quests are bucketed by required level and by prerequisite, so each
+    change only re-checks the quests it could affect: completing a quest
+    checks the quests it unlocks, and a level up checks the quests whose
+    required level was just reached. Level ups are noticed the next time
+    the index is read.
+
+    Quest membership is always read from the character's own quest lists
+    (QuestSets). The index also keeps a stamp of their bitsets: if they
+    changed in any way the index wasn't told about (direct edits, a
+    loaded save, calls without index=), the next read rebuilds it.
+    """
+
+    def __init__(self, character, quest_data_dict, graph=None):
+        """
+        Build the index for a character
+
+        Args:
+            character: Character dictionary
+            quest_data_dict: Dictionary of all quest data
+            graph: QuestGraph for quest_data_dict (built if not given)
+        """
+        self.character = character
+        self.quests = quest_data_dict
+        self.graph = graph if graph is not None else QuestGraph(quest_data_dict)
+        self.positions = {quest_id: position for position, quest_id in enumerate(quest_data_dict)}
+        self.level_index = QuestLevelIndex(quest_data_dict)
+        self.rebuild()
+
+    def quest_state(self):
+        """(active bits, completed bits) of the character's quests right now"""
+        return (as_quest_bits(self.character["active_quests"]),
+                as_quest_bits(self.character["completed_quests"]))
+
+    def rebuild(self):
+        """Check every quest again (e.g. after the quest lists were replaced)"""
+        self.level = self.character["level"]
+        self.available = set()
+        for quest_id in self.quests:
+            self.check(quest_id)
+        self.stamp = self.quest_state()
+
+    def check(self, quest_id):
+        """Add or remove one quest from the available set"""
+        quest_info = self.quests[quest_id]
+        prereq = quest_info["prerequisite"]
+        completed = self.character["completed_quests"]
+        if (self.level >= quest_info["required_level"]
+                and (prereq == "NONE" or prereq in completed)
+                and quest_id not in completed
+                and quest_id not in self.character["active_quests"]):
+            self.available.add(quest_id)
+        else:
+            self.available.discard(quest_id)
+
+    def advance(self, quest_id, active=None, completed=False):
+        """
+        Move the stamp along by one change the index was told about
+
+        Args:
+            quest_id: Quest that changed
+            active: True if it became active, False if it stopped being active
+            completed: True if it became completed
+
+        Returns: True if the character now matches the stamp; False (and
+                 the index will rebuild on the next read) if the quest
+                 lists also changed some other way
+        """
+        number = QUEST_NUMBERS.lookup(quest_id)
+        if self.stamp is None or number is None:
+            self.stamp = None
+            return False
+        active_bits, completed_bits = self.stamp
+        bit = 1 << number
+        if active is True:
+            active_bits |= bit
+        elif active is False:
+            active_bits &= ~bit
+        if completed:
+            completed_bits |= bit
+        if self.quest_state() != (active_bits, completed_bits):
+            self.stamp = None
+            return False
+        self.stamp = (active_bits, completed_bits)
+        return True
+
+    def sync(self):
+        """Catch up with untracked quest changes and level changes"""
+        if self.stamp is None or self.stamp != self.quest_state():
+            self.rebuild()
+            return
+        level = self.character["level"]
+        if level == self.level:
+            return
+        if level < self.level:
+            self.rebuild()
+            return
+        newly_reached = list(self.level_index.quest_ids_between(self.level + 1, level))
+        self.level = level
+        for quest_id in newly_reached:
+            self.check(quest_id)
+
+    def quest_accepted(self, quest_id):
+        """Record that a quest was accepted"""
+        if self.advance(quest_id, active=True):
+            self.available.discard(quest_id)
+
+    def quest_completed(self, quest_id):
+        """Record that a quest was completed and check what it unlocks"""
+        if self.advance(quest_id, active=False, completed=True):
+            self.available.discard(quest_id)
+            for child in self.graph.unlocks(quest_id):
+                self.check(child)
+
+    def quest_abandoned(self, quest_id):
+        """Record that a quest was abandoned (it can be accepted again)"""
+        if self.advance(quest_id, active=False):
+            self.check(quest_id)
+
+    def available_quests(self):
+        """
+        Get the available quests in catalog order
+
+        Returns: List of quest dictionaries
+        """
+        self.sync()
+        ordered = sorted(self.available, key=self.positions.__getitem__)
+        return [self.quests[quest_id] for quest_id in ordered]
+
 
 # ============================================================================
 # QUEST STATISTICS
 # ============================================================================
 
+def quest_catalog_changed():
+    """
+    Mark cached quest totals as out of date
+
+    Call whenever the quest catalog is loaded, reloaded or edited.
+    """
+    global QUEST_CATALOG_VERSION
+
+    QUEST_CATALOG_VERSION += 1
+
+
 def get_quest_completion_percentage(character, quest_data_dict):
     """
     Calculate what percentage of all quests have been completed
@@ -261,7 +592,7 @@ def get_quest_completion_percentage(character, quest_data_dict):
     """
 
     total_quests = len(quest_data_dict)
-    completed_quests = len(character['completed_quests'])
+    completed_quests = get_quest_totals(character, quest_data_dict)[2]
     percentage = (completed_quests / total_quests) * 100
     return percentage
 
@@ -272,21 +603,118 @@ def get_total_quest_rewards_earned(character, quest_data_dict):
 
     Returns: Dictionary with 'total_xp' and 'total_gold'
     """
-    completed_quests = character["completed_quests"]
+    total_xp, total_gold, _ = get_quest_totals(character, quest_data_dict)
+    return {"total_xp": total_xp, "total_gold": total_gold}
+
+
+def get_quest_totals(character, quest_data_dict):
+    """
+    Get the character's running quest totals
+
+    For a Character whose completed quests are a QuestSet, the totals are
+    cached in character.quest_totals (outside the dictionary view) and
+    updated by complete_quest. They are summed again from completed_quests
+    the first time (e.g. after loading a save), if the completed quests
+    changed some other way, or after quest_catalog_changed().
+
+    Returns: Tuple (total_xp, total_gold, completed_count)
+    """
+    completed = character["completed_quests"]
+    cacheable = isinstance(character, Character) and isinstance(completed, QuestSet)
+    if cacheable:
+        totals = character.quest_totals
+        if totals is not None and totals[3] == completed.bits and totals[4] == QUEST_CATALOG_VERSION:
+            return totals[:3]
     total_xp = 0
     total_gold = 0
-    for quest_id in completed_quests:
-        quest_info = quest_data_dict[quest_id]
-        total_xp += quest_info["reward_xp"]
-        total_gold += quest_info["reward_gold"]
-    return {"total_xp": total_xp, "total_gold": total_gold}
+    for quest_id in completed:
+        if quest_id in quest_data_dict:
+            total_xp += quest_data_dict[quest_id]["reward_xp"]
+            total_gold += quest_data_dict[quest_id]["reward_gold"]
+    totals = (total_xp, total_gold, len(completed))
+    if cacheable:
+        character.quest_totals = totals + (completed.bits, QUEST_CATALOG_VERSION)
+    return totals
+
+
+def get_roster_quest_stats(quest_data_dict, character_names=None, save_directory="data/save_games"):
+    """
+    Work out quest stats for every saved character at once (for leaderboards)
+
+    Saves are read with character_manager.load_characters. With NumPy
+    installed, every character's completed quests become one row of a
+    0/1 matrix, and XP and gold totals come from a single matrix-vector
+    product; otherwise the same sums run one character at a time.
+
+    Args:
+        quest_data_dict: Dictionary of all quest data
+        character_names: Names to include (default: every saved character)
+        save_directory: Directory containing save files
+
+    Returns: Dictionary with:
+             'stats': {name: {'total_xp', 'total_gold', 'completed',
+                              'completion_percentage'}}, highest XP first
+             'errors': {name: error} for saves that couldn't be loaded
+    """
+    roster = character_manager.load_characters(character_names, save_directory)
+    names = list(roster["loaded"])
+    QUEST_NUMBERS.load_catalog(quest_data_dict)
+    completed_sets = [as_quest_bits(roster["loaded"][name]["completed_quests"]) for name in names]
+
+    if np is not None and names:
+        quest_count = len(QUEST_NUMBERS.quest_ids)
+        rewards = np.zeros((quest_count, 2), dtype=np.int64)
+        for quest_id, quest_info in quest_data_dict.items():
+            rewards[QUEST_NUMBERS.numbers[quest_id]] = (quest_info["reward_xp"], quest_info["reward_gold"])
+        row_bytes = (quest_count + 7) // 8
+        packed = np.frombuffer(b"".join(bits.to_bytes(row_bytes, "little") for bits in completed_sets),
+                               dtype=np.uint8).reshape(len(names), row_bytes)
+        done = np.unpackbits(packed, axis=1, count=quest_count, bitorder="little")
+        totals = (done @ rewards).tolist()
+        counts = done.sum(axis=1).tolist()
+    else:
+        totals = []
+        counts = []
+        for bits in completed_sets:
+            total_xp = 0
+            total_gold = 0
+            count = 0
+            for quest_id in QuestSet.from_bits(bits):
+                count += 1
+                if quest_id in quest_data_dict:
+                    total_xp += quest_data_dict[quest_id]["reward_xp"]
+                    total_gold += quest_data_dict[quest_id]["reward_gold"]
+            totals.append((total_xp, total_gold))
+            counts.append(count)
+
+    total_quests = len(quest_data_dict)
+    stats = {}
+    for name, (total_xp, total_gold), count in zip(names, totals, counts):
+        stats[name] = {
+            "total_xp": total_xp,
+            "total_gold": total_gold,
+            "completed": count,
+            "completion_percentage": count / total_quests * 100 if total_quests else 0
+        }
+    ranked = sorted(stats, key=lambda name: (-stats[name]["total_xp"], name))
+    return {"stats": {name: stats[name] for name in ranked}, "errors": roster["errors"]}
 
-def get_quests_by_level(quest_data_dict, min_level, max_level):
+
+def get_quests_by_level(quest_data_dict, min_level, max_level, index=None):
     """
     Get all quests within a level range
 
+    Args:
+        quest_data_dict: Dictionary of all quest data
+        min_level: Lowest required level to include
+        max_level: Highest required level to include
+        index: QuestLevelIndex for quest_data_dict (optional). With an
+               index only the matching quests are read, in level order.
+
     Returns: List of quest dictionaries
     """
+    if index is not None:
+        return list(index.quests_between(min_level, max_level))
     quest_range = []
     for quest_id in quest_data_dict:
         quest_info = quest_data_dict[quest_id]
@@ -296,6 +724,42 @@ def get_quests_by_level(quest_data_dict, min_level, max_level):
     return quest_range
 
 
+class QuestLevelIndex:
+    """
+    Quests sorted by required level for fast level range queries
+
+    A range is found with binary search, and the matching quests are
+    yielded one at a time, so a query costs O(log n) plus the quests it
+    actually returns.
+    """
+
+    def __init__(self, quest_data_dict):
+        """Build the index from the quest catalog"""
+        self.quests = quest_data_dict
+        ordered = sorted(
+            (quest_info["required_level"], position, quest_id)
+            for position, (quest_id, quest_info) in enumerate(quest_data_dict.items())
+        )
+        self.levels = [level for level, _, _ in ordered]
+        self.quest_ids = [quest_id for _, _, quest_id in ordered]
+
+    def quest_ids_between(self, min_level, max_level):
+        """
+        Yield IDs of quests with min_level <= required_level <= max_level
+
+        Quests come out by required level, then in catalog order.
+        """
+        start = bisect.bisect_left(self.levels, min_level)
+        stop = bisect.bisect_right(self.levels, max_level)
+        for position in range(start, stop):
+            yield self.quest_ids[position]
+
+    def quests_between(self, min_level, max_level):
+        """Yield the quest dictionaries in a level range (see quest_ids_between)"""
+        for quest_id in self.quest_ids_between(min_level, max_level):
+            yield self.quests[quest_id]
+
+
 # ============================================================================
 # DISPLAY FUNCTIONS
 # ============================================================================
@@ -337,16 +801,9 @@ def display_character_quest_progress(character, quest_data_dict):
     - Total rewards earned
     """
     active_count = len(character["active_quests"])
-    completed_count = len(character["completed_quests"])
+    total_xp, total_gold, completed_count = get_quest_totals(character, quest_data_dict)
     total_quests = len(quest_data_dict)
     completion_percentage = (completed_count / total_quests * 100) if total_quests > 0 else 0
-    total_xp = 0
-    total_gold = 0
-    for quest_id in character["completed_quests"]:
-        if quest_id in quest_data_dict:
-            quest_info = quest_data_dict[quest_id]
-            total_xp += quest_info["reward_xp"]
-            total_gold += quest_info["reward_gold"]
     print("\n=== Quest Progress ===")
     print(f"Active Quests: {active_count}")
     print(f"Completed Quests: {completed_count}")
@@ -359,19 +816,16 @@ def display_character_quest_progress(character, quest_data_dict):
 
 def validate_quest_prerequisites(quest_data_dict):
     """
-    Validate that all quest prerequisites exist
+    Validate that all quest prerequisites exist and don't form a cycle
 
     Checks that every prerequisite (that's not "NONE") refers to a real quest
 
     Returns: True if all valid
-    Raises: QuestNotFoundError if invalid prerequisite found
+    Raises:
+        QuestNotFoundError if invalid prerequisite found
+        InvalidDataFormatError if prerequisites form a cycle
     """
-    for quest_id, quest_info in quest_data_dict.items():
-        prereq = quest_info["prerequisite"]
-        if prereq != "NONE" and prereq not in quest_data_dict:
-            raise QuestNotFoundError(
-                f"Quest '{quest_id}' has invalid prerequisite '{prereq}'."
-            )
+    QuestGraph(quest_data_dict)
     return True
 
 
@@ -0,0 +1,151 @@
+"""
+Test Character Model
+Tests the slotted Character record and the character operations built on it
+"""
+
+import pickle
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from character_manager import Character
+
+# ============================================================================
+# CHARACTER RECORD TESTS
+# ============================================================================
+
+def test_create_character_returns_slotted_record():
+    """Test that new characters are Characters without a per-object dict"""
+    char = character_manager.create_character("SlotHero", "Mage")
+
+    assert isinstance(char, Character)
+    assert not hasattr(char, "__dict__")
+    assert char['class'] == "Mage"
+    assert char.character_class == "Mage"
+    assert char.magic == char['magic']
+
+def test_character_works_like_a_dict():
+    """Test the dictionary view of a Character"""
+    char = character_manager.create_character("DictHero", "Warrior")
+    char['health'] -= 10
+    char['equipped_weapon'] = "iron_sword"
+
+    assert char.health == char['max_health'] - 10
+    assert 'equipped_weapon' in char
+    assert 'equipped_armor' not in char
+    assert char.get('equipped_armor') is None
+    assert list(char)[:2] == ['name', 'class']
+
+    del char['equipped_weapon']
+    assert 'equipped_weapon' not in char
+    with pytest.raises(KeyError):
+        char['equipped_weapon']
+
+def test_character_extra_keys_and_copies():
+    """Test that unknown keys are kept and copies are independent"""
+    char = character_manager.create_character("ExtraHero", "Rogue")
+    char['title'] = "the Swift"
+
+    copy = char.copy()
+    copy['gold'] = 0
+
+    assert char['title'] == "the Swift"
+    assert char['gold'] == 100
+    assert dict(copy)['title'] == "the Swift"
+    assert len(char) == len(character_manager.SAVE_FIELDS) + 1
+    assert Character(dict(char)) == char
+
+def test_character_pickles():
+    """Test that Characters can be sent to worker processes"""
+    char = character_manager.create_character("PickleHero", "Cleric")
+    char['title'] = "the Kind"
+
+    assert pickle.loads(pickle.dumps(char)) == char
+
+def test_loaded_character_is_slotted(tmp_path):
+    """Test that loading a save gives back a Character"""
+    char = character_manager.create_character("LoadHero", "Mage")
+    character_manager.save_character(char, str(tmp_path))
+
+    loaded = character_manager.load_character("LoadHero", str(tmp_path))
+
+    assert isinstance(loaded, Character)
+    assert loaded == char
+
+# ============================================================================
+# EXPERIENCE TESTS
+# ============================================================================
+
+def level_up_one_at_a_time(level, experience):
+    """Reference level up loop (one level per pass)"""
+    levels = 0
+    while experience >= level * 100:
+        experience -= level * 100
+        level += 1
+        levels += 1
+    return levels, experience
+
+def test_calculate_level_ups_matches_loop():
+    """Test the closed-form level up math against the step-by-step loop"""
+    for level in [1, 2, 7, 50]:
+        for experience in [0, 99, 100, 299, 300, 1000, 12345, 10**9]:
+            assert (character_manager.calculate_level_ups(level, experience)
+                    == level_up_one_at_a_time(level, experience))
+
+def test_gain_experience_many_levels():
+    """Test one large XP grant across several levels"""
+    char = character_manager.create_character("XpHero", "Warrior")
+    char['health'] = 1
+
+    # Levels 1-4 cost 100 + 200 + 300 + 400 = 1000
+    assert character_manager.gain_experience(char, 1050) == 4
+    assert char['level'] == 5
+    assert char['experience'] == 50
+    assert char['max_health'] == 160
+    assert char['strength'] == 23
+    assert char['health'] == 160
+
+def test_gain_experience_batch():
+    """Test a roster-wide XP grant, skipping dead characters"""
+    pytest.importorskip("numpy")
+    roster = [character_manager.create_character(f"Batch{i}", "Mage") for i in range(3)]
+    roster[1]['health'] = 0
+    expected = roster[2].copy()
+    character_manager.gain_experience(expected, 2500)
+
+    result = character_manager.gain_experience_batch(roster, [100, 500, 2500])
+
+    assert result['levels_gained'] == [1, 0, expected['level'] - 1]
+    assert result['dead'] == ["Batch1"]
+    assert roster[0]['level'] == 2 and roster[0]['experience'] == 0
+    assert roster[1]['experience'] == 0
+    assert roster[2] == expected
+
+def test_gain_experience_batch_numpy_ints_and_huge_amounts():
+    """Test NumPy integer amounts and amounts too big for int64"""
+    np = pytest.importorskip("numpy")
+    roster = [character_manager.create_character(f"Big{i}", "Warrior") for i in range(2)]
+    expected = [char.copy() for char in roster]
+    character_manager.gain_experience(expected[0], 300)
+    character_manager.gain_experience(expected[1], 10 ** 30)
+
+    result = character_manager.gain_experience_batch(roster[:1], np.int64(300))
+    assert result['levels_gained'] == [2]
+    character_manager.gain_experience_batch(roster[1:], [10 ** 30])
+    assert roster == expected
+
+def test_gain_experience_batch_without_numpy(monkeypatch):
+    """Test that batch grants still work when NumPy is missing"""
+    monkeypatch.setattr(character_manager, "np", None)
+    roster = [character_manager.create_character(f"Plain{i}", "Rogue") for i in range(2)]
+
+    result = character_manager.gain_experience_batch(roster, 300)
+
+    assert result['levels_gained'] == [2, 2]
+    assert roster[1]['level'] == 3
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
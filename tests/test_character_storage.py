@@ -0,0 +1,406 @@
+"""
+Test Character Storage
+Tests the character storage backends and save file formats
+"""
+
+import pytest
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import character_store
+from custom_exceptions import CharacterNotFoundError, InvalidSaveDataError
+
+# ============================================================================
+# SQLITE STORE TESTS
+# ============================================================================
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """Open a SQLite store in a temporary directory"""
+    store = character_store.SQLiteCharacterStore(str(tmp_path / "saves" / "characters.db"))
+    yield store
+    store.close()
+
+def test_sqlite_save_and_load(sqlite_store):
+    """Test that a character round-trips through the SQLite store"""
+    char = character_manager.create_character("SqlHero", "Cleric")
+    char['inventory'] = ["health_potion", "health_potion"]
+    char['completed_quests'] = ["first_steps"]
+
+    assert sqlite_store.save_character(char) == True
+    loaded = sqlite_store.load_character("SqlHero")
+
+    for field in character_manager.SAVE_FIELDS:
+        assert loaded[field] == char[field]
+
+def test_sqlite_list_and_class_index(sqlite_store):
+    """Test listing characters and looking them up by class"""
+    for name, character_class in [("Bram", "Rogue"), ("Ada", "Mage"), ("Cy", "Rogue")]:
+        sqlite_store.save_character(character_manager.create_character(name, character_class))
+
+    assert sqlite_store.list_saved_characters() == ["Ada", "Bram", "Cy"]
+    assert sqlite_store.list_characters_by_class("Rogue") == ["Bram", "Cy"]
+
+def test_sqlite_delete_and_missing(sqlite_store):
+    """Test deleting characters and loading missing ones"""
+    sqlite_store.save_character(character_manager.create_character("Gone", "Warrior"))
+
+    assert sqlite_store.delete_character("Gone") == True
+    with pytest.raises(CharacterNotFoundError):
+        sqlite_store.load_character("Gone")
+    with pytest.raises(CharacterNotFoundError):
+        sqlite_store.delete_character("Gone")
+
+# ============================================================================
+# CRASH-SAFE SAVE TESTS
+# ============================================================================
+
+def test_save_file_round_trip(tmp_path):
+    """Test that every field survives a save and load"""
+    char = character_manager.create_character("RoundTrip", "Mage")
+    char['inventory'] = ["iron_sword"]
+    char['active_quests'] = ["first_steps"]
+    character_manager.save_character(char, str(tmp_path))
+
+    loaded = character_manager.load_character("RoundTrip", str(tmp_path))
+    for field in character_manager.SAVE_FIELDS:
+        assert loaded[field] == char[field]
+    assert os.listdir(tmp_path) == ["RoundTrip_save.txt"]
+
+def test_concurrent_atomic_writes(tmp_path):
+    """Test that threads writing the same file don't share a temp file"""
+    target = str(tmp_path / "shared.txt")
+    texts = [f"writer {i}\n" * 1000 for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda text: character_manager.write_file_atomically(target, text), texts * 5))
+
+    with open(target) as file:
+        assert file.read() in texts
+    assert os.listdir(tmp_path) == ["shared.txt"]
+
+def test_failed_save_keeps_old_file(tmp_path):
+    """Test that a save that fails part way leaves the previous save intact"""
+    char = character_manager.create_character("Crashy", "Warrior")
+    character_manager.save_character(char, str(tmp_path))
+
+    char['gold'] = 999
+    char['inventory'] = None  # Makes formatting the save fail
+    with pytest.raises(TypeError):
+        character_manager.save_character(char, str(tmp_path))
+
+    assert character_manager.load_character("Crashy", str(tmp_path))['gold'] == 100
+
+def test_old_save_keys_still_load(tmp_path):
+    """Test that saves written with spaced keys (MAX HEALTH) still load"""
+    (tmp_path / "Legacy_save.txt").write_text(
+        "NAME: Legacy\nCLASS: Rogue\nLEVEL: 2\nHEALTH: 50\nMAX HEALTH: 100\n"
+        "STRENGTH: 14\nMAGIC: 12\nEXPERIENCE: 5\nGOLD: 80\nINVENTORY: \n"
+        "ACTIVE QUESTS: \nCOMPLETED QUESTS: first_steps\n"
+    )
+    loaded = character_manager.load_character("Legacy", str(tmp_path))
+
+    assert loaded['max_health'] == 100
+    assert loaded['completed_quests'] == ["first_steps"]
+
+def test_journal_replay(tmp_path):
+    """Test that journaled changes are applied to saves on replay"""
+    char = character_manager.create_character("Journey", "Cleric")
+    character_manager.save_character(char, str(tmp_path))
+
+    char['gold'] = 150
+    character_manager.journal_character_change(char, ["gold"], str(tmp_path))
+    char['level'] = 2
+    character_manager.journal_character_change(char, ["level"], str(tmp_path))
+    # Simulate a crash in the middle of writing a journal line
+    with open(tmp_path / character_manager.JOURNAL_FILENAME, "a") as file:
+        file.write('{"name": "Journey", "fie')
+
+    assert character_manager.replay_journal(str(tmp_path)) == ["Journey"]
+    loaded = character_manager.load_character("Journey", str(tmp_path))
+    assert loaded['gold'] == 150
+    assert loaded['level'] == 2
+    assert not os.path.exists(tmp_path / character_manager.JOURNAL_FILENAME)
+
+def test_journal_replay_skips_foreign_lines(tmp_path):
+    """Test that valid JSON lines that aren't journal records are skipped"""
+    char = character_manager.create_character("Sturdy", "Mage")
+    character_manager.save_character(char, str(tmp_path))
+    char['gold'] = 77
+    character_manager.journal_character_change(char, ["gold"], str(tmp_path))
+    with open(tmp_path / character_manager.JOURNAL_FILENAME, "a") as file:
+        file.write('[1, 2]\n"text"\nnull\n{"name": ["x"], "fields": {}}\n{"name": "Sturdy"}\n')
+
+    assert character_manager.replay_journal(str(tmp_path)) == ["Sturdy"]
+    assert character_manager.load_character("Sturdy", str(tmp_path))['gold'] == 77
+
+def test_atomic_write_closes_descriptor_on_failure(tmp_path, monkeypatch):
+    """Test that a failure before the temp file is opened doesn't leak its descriptor"""
+    closed = []
+    real_close = os.close
+    def fail_chmod(path, mode):
+        raise PermissionError("chmod refused")
+    monkeypatch.setattr(character_manager.os, "chmod", fail_chmod)
+    monkeypatch.setattr(character_manager.os, "close", lambda fd: closed.append(fd) or real_close(fd))
+
+    with pytest.raises(PermissionError):
+        character_manager.write_file_atomically(str(tmp_path / "target.txt"), "data")
+    assert len(closed) == 1
+    assert os.listdir(tmp_path) == []
+
+def test_atomic_write_new_file_mode(tmp_path):
+    """Test that new files get the standard mode and existing files keep theirs"""
+    target = tmp_path / "fresh.txt"
+    character_manager.write_file_atomically(str(target), "one")
+    assert os.stat(target).st_mode & 0o777 == character_manager.NEW_FILE_MODE
+    os.chmod(target, 0o600)
+    character_manager.write_file_atomically(str(target), "two")
+    assert os.stat(target).st_mode & 0o777 == 0o600
+
+def test_journal_entries_before_save_are_ignored(tmp_path):
+    """Test that a full save makes earlier journal entries obsolete"""
+    char = character_manager.create_character("Saver", "Rogue")
+    char['gold'] = 10
+    character_manager.journal_character_change(char, save_directory=str(tmp_path))
+    char['gold'] = 500
+    character_manager.save_character(char, str(tmp_path))
+
+    assert character_manager.replay_journal(str(tmp_path)) == []
+    assert character_manager.load_character("Saver", str(tmp_path))['gold'] == 500
+
+# ============================================================================
+# SAVE QUEUE TESTS
+# ============================================================================
+
+def test_save_queue_coalesces_saves(tmp_path, monkeypatch):
+    """Test that repeated saves of one character are written once"""
+    written = []
+    real_save = character_manager.save_character
+    def counting_save(character, save_directory):
+        written.append(character['gold'])
+        return real_save(character, save_directory)
+    monkeypatch.setattr(character_manager, "save_character", counting_save)
+
+    queue = character_manager.SaveQueue(str(tmp_path), delay=60)
+    char = character_manager.create_character("Queued", "Mage")
+    for gold in range(100, 110):
+        char['gold'] = gold
+        queue.enqueue(char)
+    char['gold'] = 0  # Changes after enqueue are not saved
+
+    assert queue.close() == []
+    assert written == [109]
+    assert character_manager.load_character("Queued", str(tmp_path))['gold'] == 109
+
+def test_save_queue_writes_after_delay(tmp_path):
+    """Test that the saver thread writes a batch once the delay passes"""
+    queue = character_manager.SaveQueue(str(tmp_path), delay=0.01)
+    queue.enqueue(character_manager.create_character("Later", "Cleric"))
+    queue.enqueue(character_manager.create_character("Sooner", "Rogue"))
+
+    for _ in range(200):
+        if len(character_manager.list_saved_characters(str(tmp_path))) == 2:
+            break
+        time.sleep(0.01)
+    assert sorted(character_manager.list_saved_characters(str(tmp_path))) == ["Later", "Sooner"]
+    queue.close()
+
+def wait_for(condition):
+    """Poll until condition() is true (the saver thread works in the background)"""
+    for _ in range(500):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_journaled_save_queue_survives_crash(tmp_path):
+    """Test that queued saves not yet written are recovered from the journal"""
+    queue = character_manager.SaveQueue(str(tmp_path), delay=60, journal=True)
+    char = character_manager.create_character("Crashy", "Mage")
+    char['gold'] = 321
+    queue.enqueue(char)
+    assert wait_for(lambda: (tmp_path / character_manager.JOURNAL_FILENAME).exists())
+    # Crash before the batch is written: the save queue is simply lost
+    with queue.condition:
+        queue.pending.clear()
+        queue.deadline = None
+    queue.close()
+
+    assert character_manager.replay_journal(str(tmp_path)) == ["Crashy"]
+    assert character_manager.load_character("Crashy", str(tmp_path))['gold'] == 321
+
+def test_journal_is_removed_once_saved(tmp_path):
+    """Test that the journal doesn't outlive the saves it protects"""
+    queue = character_manager.SaveQueue(str(tmp_path), delay=60, journal=True)
+    for gold in range(5):
+        char = character_manager.create_character("Compact", "Rogue")
+        char['gold'] = gold
+        queue.enqueue(char)
+    assert queue.flush() == []
+
+    assert os.listdir(tmp_path) == ["Compact_save.txt"]
+    assert character_manager.load_character("Compact", str(tmp_path))['gold'] == 4
+    queue.close()
+
+def test_save_queue_survives_bad_directory(tmp_path):
+    """Test that flush returns errors when the save directory can't be created"""
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    queue = character_manager.SaveQueue(str(blocker / "saves"), delay=60)
+    queue.enqueue(character_manager.create_character("Blocked", "Mage"))
+
+    errors = queue.flush()
+    assert [name for name, error in errors] == ["Blocked"]
+    assert queue.close() == []
+
+def test_save_queue_reports_errors(tmp_path):
+    """Test that failed background saves are reported on flush"""
+    queue = character_manager.SaveQueue(str(tmp_path), delay=60)
+    char = character_manager.create_character("Broken", "Warrior")
+    queue.enqueue(char)
+    queue.pending["Broken"]["inventory"] = None
+
+    errors = queue.flush()
+    assert [name for name, error in errors] == ["Broken"]
+    queue.close()
+
+# ============================================================================
+# BINARY SAVE TESTS
+# ============================================================================
+
+def test_binary_save_round_trip(tmp_path):
+    """Test that every field survives a binary save and load"""
+    char = character_manager.create_character("Bits", "Rogue")
+    char['inventory'] = ["health_potion", "iron_sword"]
+    char['completed_quests'] = ["first_steps", "goblin_hunter"]
+
+    character_manager.save_character_binary(char, str(tmp_path))
+    loaded = character_manager.load_character_binary("Bits", str(tmp_path))
+
+    for field in character_manager.SAVE_FIELDS:
+        assert loaded[field] == char[field]
+    text_size = len(character_manager.format_save_data(char))
+    assert os.path.getsize(tmp_path / "Bits_save.bin") < text_size
+
+def test_binary_save_rejects_bad_data():
+    """Test that bad headers, versions and truncated data are rejected"""
+    data = character_manager.encode_binary_save(character_manager.create_character("Bad", "Mage"))
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.decode_binary_save(b"NOPE" + data[4:])
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.decode_binary_save(data[:4] + b"\x63\x00" + data[6:])
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.decode_binary_save(data[:-3])
+
+def test_binary_save_rejects_values_out_of_range(tmp_path):
+    """Test that values too large for the binary layout raise InvalidSaveDataError"""
+    rich = character_manager.create_character("Rich", "Warrior")
+    rich['gold'] = 2**31
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.encode_binary_save(rich)
+
+    wordy = character_manager.create_character("W" * 70000, "Warrior")
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.encode_binary_save(wordy)
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.save_character_binary(wordy, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_binary_save_rejects_zero_quantity():
+    """Test that an item stored with quantity 0 is reported as corrupt"""
+    char = character_manager.create_character("Empty", "Mage")
+    char['inventory'] = ["health_potion"]
+    quest_table = character_manager.QuestNumbers()
+    for table in [None, quest_table]:
+        data = character_manager.encode_binary_save(char, table)
+        item = character_manager.pack_binary_string("health_potion")
+        quantity = data.index(item) + len(item)
+        zero = character_manager.BINARY_QUANTITY.pack(0)
+        corrupt = data[:quantity] + zero + data[quantity + len(zero):]
+        with pytest.raises(InvalidSaveDataError):
+            character_manager.decode_binary_save(corrupt, table)
+
+def test_migrate_text_saves_to_binary(tmp_path):
+    """Test converting text saves to the binary format"""
+    char = character_manager.create_character("Mover", "Cleric")
+    character_manager.save_character(char, str(tmp_path))
+    (tmp_path / "Broken_save.txt").write_text("garbage\n")
+
+    results = character_manager.migrate_all_saves_to_binary(str(tmp_path), remove_text=True)
+
+    assert results["Mover"] == True
+    assert isinstance(results["Broken"], InvalidSaveDataError)
+    assert character_manager.load_character_binary("Mover", str(tmp_path))['class'] == "Cleric"
+    assert not os.path.exists(tmp_path / "Mover_save.txt")
+
+def test_binary_only_saves_can_be_found(tmp_path):
+    """Test that a character migrated with remove_text=True still loads"""
+    char = character_manager.create_character("Binary", "Rogue")
+    character_manager.save_character(char, str(tmp_path))
+    character_manager.migrate_save_to_binary("Binary", str(tmp_path), remove_text=True)
+
+    assert character_manager.list_saved_characters(str(tmp_path)) == ["Binary"]
+    assert character_manager.load_character("Binary", str(tmp_path))['class'] == "Rogue"
+    loaded = character_manager.load_characters(save_directory=str(tmp_path))
+    assert loaded['loaded']['Binary']['class'] == "Rogue"
+
+    assert character_manager.delete_character("Binary", str(tmp_path)) == True
+    assert character_manager.list_saved_characters(str(tmp_path)) == []
+
+# ============================================================================
+# BULK ROSTER TESTS
+# ============================================================================
+
+def test_save_and_load_roster(tmp_path):
+    """Test saving and loading many characters at once"""
+    roster = [character_manager.create_character(f"Hero{i}", "Warrior") for i in range(20)]
+    result = character_manager.save_characters(roster, str(tmp_path))
+
+    assert sorted(result['saved']) == sorted(char['name'] for char in roster)
+    assert result['errors'] == {}
+
+    loaded = character_manager.load_characters(save_directory=str(tmp_path))
+    assert len(loaded['loaded']) == 20
+    assert loaded['loaded']['Hero7']['class'] == "Warrior"
+    assert isinstance(loaded['loaded']['Hero7'], character_manager.Character)
+    assert loaded['loaded']['Hero7'].health == 120
+
+def test_roster_errors_are_collected(tmp_path):
+    """Test that failures are reported per character instead of raised"""
+    good = character_manager.create_character("Good", "Mage")
+    bad = character_manager.create_character("Bad", "Mage")
+    bad['inventory'] = None
+    result = character_manager.save_characters([good, bad], str(tmp_path))
+    (tmp_path / "Corrupt_save.txt").write_text("no colon here\n")
+
+    assert result['saved'] == ["Good"]
+    assert isinstance(result['errors']['Bad'], TypeError)
+
+    loaded = character_manager.load_characters(["Good", "Corrupt", "Missing"], str(tmp_path))
+    assert list(loaded['loaded']) == ["Good"]
+    assert isinstance(loaded['errors']['Corrupt'], InvalidSaveDataError)
+    assert isinstance(loaded['errors']['Missing'], CharacterNotFoundError)
+
+def test_roster_load_scans_directory_once(tmp_path, monkeypatch):
+    """Test that a bulk load lists the save directory a single time"""
+    character_manager.save_characters(
+        [character_manager.create_character("Text", "Cleric")], str(tmp_path))
+    character_manager.save_character_binary(
+        character_manager.create_character("Packed", "Rogue"), str(tmp_path))
+    scans = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(character_manager.os, "listdir",
+                        lambda path: scans.append(path) or real_listdir(path))
+
+    loaded = character_manager.load_characters(save_directory=str(tmp_path))
+    assert sorted(loaded['loaded']) == ["Packed", "Text"]
+    assert loaded['loaded']['Packed']['class'] == "Rogue"
+    assert scans == [str(tmp_path)]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,170 @@
+"""
+Test Combat Engine
+Tests the headless battle engine and battle simulation tools
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_system
+import game_data
+import battle_simulator
+from custom_exceptions import CharacterDeadError
+
+# ============================================================================
+# HEADLESS BATTLE ENGINE TESTS
+# ============================================================================
+
+def test_run_battle_scripted_victory():
+    """Test that a scripted battle runs without input and reports events"""
+    char = character_manager.create_character("EngineTest", "Warrior")
+    enemy = combat_system.create_enemy("goblin")
+
+    result = combat_system.run_battle(char, enemy, ["special", "special"])
+
+    assert result['winner'] == "player"
+    assert result['turns'] == 2
+    assert result['xp_gained'] == 25
+    assert char['gold'] == 110
+    # Power Strike: 15 * 2 = 30 damage, goblin hits back for 8 - 15 // 4 = 5
+    assert result['events'][0] == (1, "player", "special", 30)
+    assert result['events'][1] == (1, "enemy", "attack", 5)
+    assert char['health'] == 115
+
+def test_run_battle_callable_policy_and_draw():
+    """Test callable policies and the turn limit"""
+    char = character_manager.create_character("HealTest", "Cleric")
+    enemy = combat_system.create_enemy("goblin")
+
+    # A Cleric that only heals never finishes the fight
+    result = combat_system.run_battle(char, enemy, combat_system.special_policy,
+                                      max_turns=50, record_events=False)
+
+    assert result['winner'] == "draw"
+    assert result['turns'] == 50
+    assert result['events'] == []
+    assert result['xp_gained'] == 0
+
+def test_run_battle_is_reproducible_with_seeded_rng():
+    """Test that a seeded RNG gives the same battle every time"""
+    results = []
+    for _ in range(2):
+        char = character_manager.create_character("SeedTest", "Rogue")
+        enemy = combat_system.create_enemy("orc")
+        results.append(combat_system.run_battle(char, enemy, combat_system.special_policy,
+                                                rng=random.Random(7), apply_rewards=False))
+    assert results[0] == results[1]
+
+def test_run_battle_uses_modifiers_and_plain_dicts():
+    """Test that attacks use effective stats, for Characters and dictionaries"""
+    char = character_manager.create_character("Buffed", "Warrior")
+    char.add_modifier("weapon", ((game_data.STAT_INDEX['strength'], 5),))
+    result = combat_system.run_battle(char, combat_system.create_enemy("goblin"), ["attack"])
+    # 20 strength: 20 - 8 // 4 = 18 damage; goblin hits back for 8 - 20 // 4 = 3
+    assert result['events'][:2] == [(1, "player", "attack", 18), (1, "enemy", "attack", 3)]
+
+    plain = dict(character_manager.create_character("Plain", "Warrior"))
+    result = combat_system.run_battle(plain, combat_system.create_enemy("goblin"), ["attack"])
+    assert result['events'][:2] == [(1, "player", "attack", 13), (1, "enemy", "attack", 5)]
+    # Four attacks kill the goblin, which only hits back three times
+    assert plain['health'] == 105
+
+def test_run_battle_dead_character():
+    """Test that a dead character cannot start a battle"""
+    char = character_manager.create_character("DeadTest", "Mage")
+    char['health'] = 0
+
+    with pytest.raises(CharacterDeadError):
+        combat_system.run_battle(char, combat_system.create_enemy("goblin"), ["attack"])
+
+# ============================================================================
+# BATTLE SIMULATOR TESTS
+# ============================================================================
+
+def test_build_character_levels():
+    """Test that simulated builds use the normal level up rules"""
+    char = battle_simulator.build_character("Rogue", 4)
+
+    assert char['level'] == 4
+    assert char['max_health'] == 90 + 30
+    assert char['strength'] == 12 + 6
+
+def test_simulate_battles_summary():
+    """Test that simulation results are reduced and reproducible"""
+    summary = battle_simulator.simulate_battles("Warrior", 1, "goblin", battles=200,
+                                                workers=1, seed=5)
+    again = battle_simulator.simulate_battles("Warrior", 1, "goblin", battles=200,
+                                              workers=1, seed=5)
+
+    assert summary == again
+    assert summary['battles'] == 200
+    assert summary['wins'] + summary['losses'] + summary['escapes'] + summary['draws'] == 200
+    assert summary['win_rate'] == 1.0
+    assert summary['xp_per_battle'] == 25
+
+def test_simulate_battles_process_pool():
+    """Test that battles can be spread over worker processes"""
+    summary = battle_simulator.simulate_battles("Rogue", 1, "orc", policy=["run"],
+                                                battles=100, workers=2, seed=1)
+
+    assert summary['battles'] == 100
+    assert summary['escapes'] > 0
+
+def test_simulate_battles_unknown_policy():
+    """Test that an unknown policy name is rejected"""
+    with pytest.raises(ValueError):
+        battle_simulator.simulate_battles("Mage", 1, "goblin", policy="dance", battles=10)
+
+# ============================================================================
+# BATCH COMBAT TESTS
+# ============================================================================
+
+def test_batch_matches_run_battle():
+    """Test that the NumPy kernel gives the same battles as run_battle"""
+    pytest.importorskip("numpy")
+    import batch_combat
+
+    for character_class in ["Warrior", "Mage", "Cleric"]:
+        for enemy_type in ["goblin", "orc", "dragon"]:
+            for action in ["attack", "special"]:
+                batch = batch_combat.make_batch(character_class, 3, enemy_type, 1, action)
+                result = batch_combat.run_batch(batch, max_turns=50)
+
+                char = battle_simulator.build_character(character_class, 3)
+                expected = combat_system.run_battle(char, combat_system.create_enemy(enemy_type),
+                                                    [action] * 50, max_turns=50)
+                assert batch_combat.WINNERS[result['winner'][0]] == expected['winner']
+                assert result['turns'][0] == expected['turns']
+
+def test_batch_without_turn_limit():
+    """Test that max_turns=None runs every battle to the end, as in run_battle"""
+    pytest.importorskip("numpy")
+    import batch_combat
+
+    batch = batch_combat.make_batch("Warrior", 3, "dragon", 20, "attack")
+    limited = batch_combat.run_batch(batch, max_turns=combat_system.DEFAULT_MAX_TURNS)
+    unlimited = batch_combat.run_batch(batch, max_turns=None)
+
+    assert (unlimited['winner'] == limited['winner']).all()
+    assert (unlimited['turns'] == limited['turns']).all()
+    assert (unlimited['turns'] > 0).all()
+
+def test_batch_sweep():
+    """Test a class x level x enemy sweep"""
+    pytest.importorskip("numpy")
+    import batch_combat
+
+    results = batch_combat.sweep(["Rogue", "Warrior"], [1, 4], ["orc"], battles=500, seed=2)
+
+    assert len(results) == 4
+    assert results[("Rogue", 4, "orc")]['battles'] == 500
+    assert results[("Warrior", 1, "orc")]['win_rate'] == 1.0
+    assert results[("Warrior", 1, "orc")]['xp_per_battle'] == 50
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,282 @@
+"""
+Test Data Loading
+Tests catalog snapshots, streaming parsers and other data loading tools
+"""
+
+import pytest
+import sys
+import os
+import pickle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+import catalog_watcher
+import quest_handler
+from custom_exceptions import (CorruptedDataError, InvalidDataFormatError, MissingDataFileError,
+                               QuestNotFoundError)
+
+QUEST_TEXT = (
+    "QUEST_ID: first_steps\n"
+    "TITLE: First Steps\n"
+    "DESCRIPTION: Begin your adventure\n"
+    "REWARD_XP: 50\n"
+    "REWARD_GOLD: 25\n"
+    "REQUIRED_LEVEL: 1\n"
+    "PREREQUISITE: NONE\n"
+)
+
+# ============================================================================
+# SNAPSHOT TESTS
+# ============================================================================
+
+def test_snapshot_is_built_and_reused(tmp_path, monkeypatch):
+    """Test that a snapshot is written once and then loaded instead of parsing"""
+    quest_file = tmp_path / "quests.txt"
+    quest_file.write_text(QUEST_TEXT)
+
+    quests = game_data.load_quests_snapshot(str(quest_file))
+    assert quests['first_steps']['reward_xp'] == 50
+    assert os.path.isfile(str(quest_file) + game_data.SNAPSHOT_SUFFIX)
+
+    # A second load must not parse the text file again
+    def fail_parse(filename):
+        raise AssertionError("text file was parsed again")
+    monkeypatch.setattr(game_data, "load_quests", fail_parse)
+    assert game_data.load_quests_snapshot(str(quest_file)) == quests
+
+def test_snapshot_rebuilt_when_source_changes(tmp_path):
+    """Test that editing the text file rebuilds the snapshot"""
+    quest_file = tmp_path / "quests.txt"
+    quest_file.write_text(QUEST_TEXT)
+    game_data.load_quests_snapshot(str(quest_file))
+
+    quest_file.write_text(QUEST_TEXT.replace("REWARD_XP: 50", "REWARD_XP: 75"))
+    os.utime(quest_file, ns=(1, 1))
+
+    quests = game_data.load_quests_snapshot(str(quest_file))
+    assert quests['first_steps']['reward_xp'] == 75
+
+def test_corrupted_snapshot_is_ignored(tmp_path):
+    """Test that an unreadable snapshot falls back to the text file"""
+    quest_file = tmp_path / "quests.txt"
+    quest_file.write_text(QUEST_TEXT)
+    (tmp_path / ("quests.txt" + game_data.SNAPSHOT_SUFFIX)).write_bytes(b"not a pickle")
+
+    quests = game_data.load_quests_snapshot(str(quest_file))
+    assert 'first_steps' in quests
+
+def test_incomplete_snapshot_is_rebuilt(tmp_path):
+    """Test that a snapshot missing required keys is replaced"""
+    quest_file = tmp_path / "quests.txt"
+    quest_file.write_text(QUEST_TEXT)
+    snapshot_file = tmp_path / ("quests.txt" + game_data.SNAPSHOT_SUFFIX)
+    snapshot_file.write_bytes(pickle.dumps({"version": game_data.SNAPSHOT_VERSION,
+                                            "kind": "quests"}))
+
+    quests = game_data.load_quests_snapshot(str(quest_file))
+    assert 'first_steps' in quests
+    assert game_data.read_snapshot(str(snapshot_file), "quests")["data"] == quests
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+SECOND_QUEST = (
+    "QUEST_ID: goblin_hunter\n"
+    "TITLE: Goblin Hunter\n"
+    "DESCRIPTION: Defeat 3 goblins\n"
+    "REWARD_XP: 100\n"
+    "REWARD_GOLD: 75\n"
+    "REQUIRED_LEVEL: 2\n"
+    "PREREQUISITE: first_steps\n"
+)
+
+def write_catalogs(tmp_path, quest_text):
+    """Write quest and item files for watcher tests"""
+    quest_file = tmp_path / "quests.txt"
+    item_file = tmp_path / "items.txt"
+    quest_file.write_text(quest_text)
+    item_file.write_text("ITEM_ID: health_potion\nNAME: Health Potion\nTYPE: consumable\n"
+                         "EFFECT: health:20\nCOST: 25\nDESCRIPTION: Restores 20 health points\n")
+    return quest_file, item_file
+
+def test_watcher_reparses_only_changed_blocks(tmp_path):
+    """Test that a reload only parses new or edited blocks"""
+    quest_file, item_file = write_catalogs(tmp_path, QUEST_TEXT + "\n" + SECOND_QUEST)
+    watcher = catalog_watcher.CatalogWatcher(str(quest_file), str(item_file))
+    old_quests = watcher.quests
+    assert watcher.poll() == False
+
+    quest_file.write_text(QUEST_TEXT + "\n" + SECOND_QUEST.replace("REWARD_GOLD: 75", "REWARD_GOLD: 80"))
+    os.utime(quest_file, ns=(1, 1))
+
+    assert watcher.poll() == True
+    assert watcher.version == 2
+    assert watcher.quest_source.reparsed == 1
+    assert watcher.quests['goblin_hunter']['reward_gold'] == 80
+    # The old version is left untouched and unchanged blocks are shared
+    assert old_quests['goblin_hunter']['reward_gold'] == 75
+    assert watcher.quests['first_steps'] is old_quests['first_steps']
+
+def test_watcher_keeps_old_catalog_on_bad_data(tmp_path):
+    """Test that a broken edit does not replace the working catalog"""
+    quest_file, item_file = write_catalogs(tmp_path, QUEST_TEXT)
+    watcher = catalog_watcher.CatalogWatcher(str(quest_file), str(item_file))
+
+    quest_file.write_text(QUEST_TEXT + "\nQUEST_ID broken\n")
+    os.utime(quest_file, ns=(1, 1))
+
+    with pytest.raises(InvalidDataFormatError):
+        watcher.poll()
+    assert list(watcher.quests) == ['first_steps']
+    assert watcher.version == 1
+
+def test_watcher_keeps_old_catalog_when_validation_fails(tmp_path):
+    """Test that a version rejected by validate is not swapped in, even partly"""
+    quest_file, item_file = write_catalogs(tmp_path, QUEST_TEXT)
+    watcher = catalog_watcher.CatalogWatcher(str(quest_file), str(item_file))
+    old_items = watcher.items
+
+    quest_file.write_text(QUEST_TEXT + "\n" + SECOND_QUEST.replace("PREREQUISITE: first_steps",
+                                                                   "PREREQUISITE: missing"))
+    item_file.write_text("")
+    os.utime(quest_file, ns=(1, 1))
+    os.utime(item_file, ns=(1, 1))
+
+    validate = lambda quests, items: quest_handler.QuestGraph(quests)
+    with pytest.raises(QuestNotFoundError):
+        watcher.poll(validate)
+    assert list(watcher.quests) == ['first_steps']
+    assert watcher.items is old_items
+    assert watcher.version == 1
+    # The rejected version is checked again, not silently adopted
+    with pytest.raises(QuestNotFoundError):
+        watcher.poll(validate)
+
+    quest_file.write_text(QUEST_TEXT + "\n" + SECOND_QUEST)
+    os.utime(quest_file, ns=(2, 2))
+    assert watcher.poll(validate) == True
+    assert sorted(watcher.quests) == ['first_steps', 'goblin_hunter']
+    assert watcher.items == {}
+    assert watcher.version == 2
+
+def test_watcher_reports_undecodable_file(tmp_path):
+    """Test that a file with invalid text raises CorruptedDataError on reload"""
+    quest_file, item_file = write_catalogs(tmp_path, QUEST_TEXT)
+    watcher = catalog_watcher.CatalogWatcher(str(quest_file), str(item_file))
+
+    with open(quest_file, "ab") as file:
+        file.write(b"\xff\xfe\n")
+    os.utime(quest_file, ns=(1, 1))
+
+    with pytest.raises(CorruptedDataError):
+        watcher.poll()
+    assert list(watcher.quests) == ['first_steps']
+
+def test_watcher_adopts_loaded_catalogs(tmp_path):
+    """Test that a watcher can start from catalogs loaded elsewhere"""
+    quest_file, item_file = write_catalogs(tmp_path, QUEST_TEXT + "\n" + SECOND_QUEST)
+    quests = game_data.load_quests(str(quest_file))
+    items = {}
+    watcher = catalog_watcher.CatalogWatcher(str(quest_file), str(item_file), quests, items)
+
+    quest_file.write_text(QUEST_TEXT)
+    os.utime(quest_file, ns=(1, 1))
+
+    assert watcher.poll() == True
+    assert watcher.quest_source.reparsed == 0
+    assert list(watcher.quests) == ['first_steps']
+
+# ============================================================================
+# STREAMING PARSER TESTS
+# ============================================================================
+
+def test_iter_quests_streams_blocks(tmp_path):
+    """Test that quests are yielded one block at a time"""
+    quest_file = tmp_path / "quests.txt"
+    # The second block is broken, but the first quest is still yielded first
+    quest_file.write_text(QUEST_TEXT + "\n\n\nBROKEN LINE\n")
+
+    quests = game_data.iter_quests(str(quest_file))
+    assert next(quests)['quest_id'] == 'first_steps'
+    with pytest.raises(InvalidDataFormatError):
+        next(quests)
+
+def test_iter_items_matches_load_items():
+    """Test that load_items is built on the item stream"""
+    items = game_data.load_items("data/items.txt")
+
+    assert [item['item_id'] for item in game_data.iter_items("data/items.txt")] == list(items)
+    assert items['iron_sword']['effect'] == "strength:5"
+    assert items['iron_sword']['item_id'] == "iron_sword"
+
+def test_iter_quests_missing_file():
+    """Test that a missing file is reported when the stream starts"""
+    with pytest.raises(MissingDataFileError):
+        list(game_data.iter_quests("data/no_such_file.txt"))
+
+# ============================================================================
+# SHARDED CATALOG TESTS
+# ============================================================================
+
+def test_load_sharded_quests(tmp_path):
+    """Test that quest shards are loaded in parallel and merged"""
+    (tmp_path / "a_pack.txt").write_text(QUEST_TEXT)
+    (tmp_path / "b_pack.txt").write_text(SECOND_QUEST)
+    (tmp_path / "notes.md").write_text("not a shard")
+
+    quests = game_data.load_sharded_quests(str(tmp_path), workers=2)
+
+    assert list(quests) == ['first_steps', 'goblin_hunter']
+    assert quests['goblin_hunter']['prerequisite'] == 'first_steps'
+
+def test_sharded_duplicate_ids(tmp_path):
+    """Test that the same quest ID in two shards is reported"""
+    (tmp_path / "a_pack.txt").write_text(QUEST_TEXT)
+    (tmp_path / "b_pack.txt").write_text(QUEST_TEXT)
+
+    with pytest.raises(InvalidDataFormatError, match="first_steps"):
+        game_data.load_sharded_quests(str(tmp_path), workers=1)
+
+def test_sharded_missing_directory(tmp_path):
+    """Test that a missing or empty shard directory is reported"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_sharded_items(str(tmp_path / "missing"))
+    with pytest.raises(MissingDataFileError):
+        game_data.load_sharded_items(str(tmp_path))
+
+# ============================================================================
+# ITEM CATALOG INDEX TESTS
+# ============================================================================
+
+@pytest.fixture
+def item_index():
+    """Index the real item catalog"""
+    return game_data.ItemCatalogIndex(game_data.load_items("data/items.txt"))
+
+def test_index_filters_by_type_and_cost(item_index):
+    """Test type and price range queries"""
+    assert item_index.find(item_type="weapon", max_cost=200) == ['iron_sword', 'fire_staff']
+    assert item_index.find(item_type="armor", min_cost=100) == ['magic_robe', 'steel_armor']
+    assert item_index.find(min_cost=60, max_cost=75) == ['leather_armor', 'super_health_potion']
+    assert item_index.find(item_type="shield") == []
+
+def test_index_filters_by_stat(item_index):
+    """Test finding items by the stat they change"""
+    assert item_index.find(stat="magic") == ['wisdom_elixir', 'magic_robe', 'fire_staff']
+    assert item_index.find(stat="magic", item_type="armor") == ['magic_robe']
+    assert item_index.find(stat="luck") == []
+
+def test_index_pages(item_index):
+    """Test paginated views of the sorted catalog"""
+    first = item_index.page(0, 4)
+    last = item_index.page(2, 4)
+
+    assert first['items'] == ['health_potion', 'strength_elixir', 'wisdom_elixir', 'leather_armor']
+    assert last['items'] == ['steel_armor', 'steel_sword']
+    assert (last['pages'], last['total']) == (3, 10)
+    assert item_index.page(0, 4, item_type="shield") == {'items': [], 'page': 0, 'pages': 1, 'total': 0}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,300 @@
+"""
+Test Inventory System
+Tests the inventory container, item stacking, item effects and the shop
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+import inventory_system
+from inventory_system import Inventory
+from custom_exceptions import (
+    InsufficientResourcesError,
+    InvalidDataFormatError,
+    InventoryFullError,
+    ItemNotFoundError
+)
+
+# ============================================================================
+# INVENTORY CONTAINER TESTS
+# ============================================================================
+
+def test_inventory_counts_and_removal():
+    """Test counting, membership and removal in an Inventory"""
+    inventory = Inventory(["health_potion", "iron_sword", "health_potion"])
+
+    assert len(inventory) == 3
+    assert inventory.count("health_potion") == 2
+    assert "iron_sword" in inventory
+    assert list(inventory) == ["health_potion", "health_potion", "iron_sword"]
+
+    inventory.remove("iron_sword")
+    assert "iron_sword" not in inventory
+    with pytest.raises(ValueError):
+        inventory.remove("iron_sword")
+
+def test_inventory_equals_lists():
+    """Test that an Inventory compares equal to a list with the same items"""
+    inventory = Inventory(["a", "b", "a"])
+
+    assert inventory == ["a", "a", "b"]
+    assert inventory == ["b", "a", "a"]
+    assert inventory != ["a", "b"]
+    assert Inventory() == []
+
+def test_inventory_save_field_round_trip():
+    """Test that an Inventory writes the usual comma-separated save field"""
+    inventory = Inventory.from_save_field("health_potion,iron_sword,health_potion")
+
+    assert inventory.to_save_field() == "health_potion*2,iron_sword"
+    assert Inventory.from_save_field("health_potion*2,iron_sword") == inventory
+    assert Inventory.from_save_field("") == []
+
+def test_new_and_loaded_characters_use_inventory(tmp_path):
+    """Test that new and loaded characters carry an Inventory"""
+    char = character_manager.create_character("BagHero", "Rogue")
+    assert isinstance(char['inventory'], Inventory)
+
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    character_manager.save_character(char, str(tmp_path))
+    loaded = character_manager.load_character("BagHero", str(tmp_path))
+
+    assert isinstance(loaded['inventory'], Inventory)
+    assert inventory_system.count_item(loaded, "health_potion") == 2
+
+def test_inventory_functions_accept_lists():
+    """Test that plain list inventories still work with the inventory functions"""
+    char = {'inventory': ["health_potion"], 'gold': 0}
+
+    assert inventory_system.has_item(char, "health_potion")
+    inventory_system.remove_item_from_inventory(char, "health_potion")
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.remove_item_from_inventory(char, "health_potion")
+
+# ============================================================================
+# STACKING TESTS
+# ============================================================================
+
+@pytest.fixture
+def potion_stacks(monkeypatch):
+    """Let 10 health potions share one slot"""
+    monkeypatch.setattr(inventory_system, "STACK_LIMITS", {})
+    inventory_system.set_stack_limits({'health_potion': {'stack': 10}, 'iron_sword': {}})
+
+def test_stack_limits_from_item_file():
+    """Test that STACK is read from items.txt, defaulting to 1"""
+    items = game_data.load_items("data/items.txt")
+
+    assert items['health_potion']['stack'] == 10
+    assert items['iron_sword']['stack'] == 1
+
+def test_capacity_counts_slots(potion_stacks):
+    """Test that stacked items only use one slot per stack"""
+    char = {'inventory': Inventory(["iron_sword"] * 19), 'gold': 1000}
+
+    for _ in range(10):
+        inventory_system.add_item_to_inventory(char, "health_potion")
+    assert inventory_system.get_inventory_space_remaining(char) == 0
+
+    # A full stack needs a new slot, and the bag is full
+    with pytest.raises(InventoryFullError):
+        inventory_system.add_item_to_inventory(char, "health_potion")
+
+    # After one is used, it fits back into the partly filled stack
+    inventory_system.remove_item_from_inventory(char, "health_potion")
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    assert inventory_system.count_item(char, "health_potion") == 10
+
+def test_running_slot_count(potion_stacks):
+    """Test that the running slot count matches a full recount"""
+    inventory = Inventory(["iron_sword", "iron_sword"])
+    inventory.add("health_potion", 15)
+    inventory.append("health_potion")
+    for _ in range(6):
+        inventory.remove("health_potion")
+    inventory.remove("iron_sword")
+    assert inventory.slots == inventory_system.count_stack_slots(inventory.counts) == 2
+
+    # Reloading the stack limits recounts once
+    inventory_system.set_stack_limits({'health_potion': {'stack': 2}})
+    assert inventory_system.count_slots(inventory) == 6
+    assert inventory.copy().slot_count() == 6
+
+def test_stacked_save_is_compact(tmp_path, potion_stacks):
+    """Test that stacks are saved once with a quantity"""
+    char = character_manager.create_character("StackHero", "Cleric")
+    char['inventory'].add("health_potion", 15)
+    character_manager.save_character(char, str(tmp_path))
+
+    with open(tmp_path / "StackHero_save.txt") as file:
+        assert "INVENTORY: health_potion*15\n" in file.read()
+    loaded = character_manager.load_character("StackHero", str(tmp_path))
+    assert inventory_system.count_item(loaded, "health_potion") == 15
+
+# ============================================================================
+# ITEM EFFECT TESTS
+# ============================================================================
+
+def test_item_effects_compiled_at_load():
+    """Test that effects are parsed once when items are loaded"""
+    items = game_data.load_items("data/items.txt")
+
+    assert items['iron_sword']['effects'] == ((game_data.STAT_INDEX['strength'], 5),)
+    assert game_data.compile_item_effect("strength:5, magic:2") == ((2, 5), (3, 2))
+    with pytest.raises(InvalidDataFormatError):
+        game_data.compile_item_effect("luck:5")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.compile_item_effect("strength:lots")
+
+def test_multi_effect_equipment():
+    """Test equipping and unequipping an item with several effects"""
+    char = character_manager.create_character("MultiHero", "Mage")
+    strength, magic = char['strength'], char['magic']
+    item = game_data.parse_item_block(["ITEM_ID: battle_staff", "NAME: Battle Staff",
+                                       "TYPE: weapon", "EFFECT: strength:3,magic:4",
+                                       "COST: 300", "DESCRIPTION: Both at once"])
+    char['inventory'].append("battle_staff")
+
+    inventory_system.equip_weapon(char, "battle_staff", item)
+    assert (char['strength'], char['magic']) == (strength + 3, magic + 4)
+
+    inventory_system.unequip_weapon(char, {'battle_staff': item})
+    assert (char['strength'], char['magic']) == (strength, magic)
+
+def test_effects_of_hand_built_items_are_cached():
+    """Test that items without compiled effects are compiled once"""
+    item = {'type': 'consumable', 'effect': 'health:5,magic:1'}
+    char = {'inventory': ["tonic", "tonic"], 'health': 10, 'max_health': 100, 'magic': 0}
+
+    result = inventory_system.use_item(char, "tonic", item)
+    inventory_system.use_item(char, "tonic", item)
+
+    assert result == "tonic used, health increased by 5, magic increased by 1"
+    assert inventory_system.EFFECT_CACHE['health:5,magic:1'] == ((0, 5), (3, 1))
+    assert (char['health'], char['magic']) == (20, 2)
+
+# ============================================================================
+# STAT MODIFIER TESTS
+# ============================================================================
+
+IRON_SWORD = {'type': 'weapon', 'effect': 'strength:5'}
+STEEL_SWORD = {'type': 'weapon', 'effect': 'strength:10'}
+STEEL_ARMOR = {'type': 'armor', 'effect': 'max_health:25'}
+
+def test_equipment_is_a_modifier_layer():
+    """Test that equipping changes effective stats but not base stats"""
+    char = character_manager.create_character("LayerHero", "Warrior")
+    base_strength = char.strength
+    char['inventory'].extend(["iron_sword", "steel_sword"])
+
+    inventory_system.equip_weapon(char, "iron_sword", IRON_SWORD)
+    inventory_system.equip_weapon(char, "steel_sword", STEEL_SWORD)
+
+    # Swapping weapons replaces the bonus instead of stacking it
+    assert char.strength == base_strength
+    assert char['strength'] == base_strength + 10
+    assert inventory_system.get_effective_stats(char)['strength'] == base_strength + 10
+    assert "iron_sword" in char['inventory']
+
+    inventory_system.unequip_weapon(char, {})
+    assert char['strength'] == base_strength
+    assert char['equipped_weapon'] is None
+
+def test_base_stat_changes_keep_modifiers():
+    """Test that leveling up with equipment on leaves no stat drift"""
+    char = character_manager.create_character("DriftHero", "Cleric")
+    char['inventory'].append("steel_armor")
+    inventory_system.equip_armor(char, "steel_armor", STEEL_ARMOR)
+
+    character_manager.gain_experience(char, 100)
+    assert char['max_health'] == 100 + 10 + 25
+    assert char['health'] == char['max_health']
+
+    inventory_system.unequip_armor(char, {})
+    assert char['max_health'] == 110
+    assert char['health'] == 110
+    assert char.copy().base_stats() == char.base_stats()
+
+def test_unequip_with_full_inventory_changes_nothing(monkeypatch):
+    """Test that a failed unequip keeps the bonus"""
+    monkeypatch.setattr(inventory_system, "MAX_INVENTORY_SIZE", 1)
+    char = character_manager.create_character("FullHero", "Rogue")
+    char['inventory'].append("iron_sword")
+    inventory_system.equip_weapon(char, "iron_sword", IRON_SWORD)
+    char['inventory'].append("steel_sword")
+
+    with pytest.raises(InventoryFullError):
+        inventory_system.unequip_weapon(char, {})
+    assert char['strength'] == char.strength + 5
+    assert char['equipped_weapon'] == "iron_sword"
+
+def test_modifiers_on_plain_dicts():
+    """Test the modifier fallback for plain character dictionaries"""
+    char = {'inventory': ["iron_sword"], 'strength': 10, 'health': 50, 'max_health': 50}
+
+    inventory_system.equip_weapon(char, "iron_sword", IRON_SWORD)
+    assert char['strength'] == 15
+    assert char['modifiers'] == {'weapon': ((game_data.STAT_INDEX['strength'], 5),)}
+
+    inventory_system.unequip_weapon(char, {})
+    assert char['strength'] == 10
+    assert char['modifiers'] == {}
+
+# ============================================================================
+# SHOP TRANSACTION TESTS
+# ============================================================================
+
+SHOP_ITEMS = {
+    'health_potion': {'name': 'Health Potion', 'type': 'consumable', 'cost': 25},
+    'iron_sword': {'name': 'Iron Sword', 'type': 'weapon', 'cost': 100},
+}
+
+def test_checkout_buys_and_sells_basket():
+    """Test that a whole basket is applied with one receipt"""
+    char = {'inventory': Inventory(["iron_sword"]), 'gold': 40}
+    cart = inventory_system.ShopCart()
+    cart.buy("health_potion", 3)
+    cart.sell("iron_sword")
+
+    receipt = cart.checkout(char, SHOP_ITEMS)
+
+    # 40 gold + 50 for the sword covers 75 for the potions
+    assert receipt == {'bought': {'health_potion': 3}, 'sold': {'iron_sword': 1},
+                       'spent': 75, 'earned': 50, 'gold': 15}
+    assert char['inventory'] == ["health_potion"] * 3
+    assert cart.is_empty()
+
+def test_checkout_is_all_or_nothing():
+    """Test that a failed check leaves the character unchanged"""
+    char = {'inventory': ["iron_sword"], 'gold': 40}
+
+    with pytest.raises(InsufficientResourcesError):
+        inventory_system.checkout(char, SHOP_ITEMS, buying={'health_potion': 4}, selling=["iron_sword"])
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.checkout(char, SHOP_ITEMS, buying=["health_potion"],
+                                  selling={'iron_sword': 2})
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.checkout(char, SHOP_ITEMS, buying=["dragon_egg"])
+    assert char == {'inventory': ["iron_sword"], 'gold': 40}
+
+def test_checkout_checks_capacity(monkeypatch):
+    """Test that the basket must fit in the inventory slots"""
+    monkeypatch.setattr(inventory_system, "MAX_INVENTORY_SIZE", 2)
+    char = {'inventory': ["iron_sword"], 'gold': 1000}
+
+    with pytest.raises(InventoryFullError):
+        inventory_system.checkout(char, SHOP_ITEMS, buying={'iron_sword': 2})
+    # Selling the sword first frees its slot
+    receipt = inventory_system.checkout(char, SHOP_ITEMS, buying={'iron_sword': 2},
+                                        selling=["iron_sword"])
+    assert receipt['gold'] == 1000 - 200 + 50
+    assert char['inventory'] == ["iron_sword", "iron_sword"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
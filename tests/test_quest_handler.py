@@ -0,0 +1,310 @@
+"""
+Test Quest Handler
+Tests the quest prerequisite graph and quest lookup indexes
+"""
+
+import pickle
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+import quest_handler
+from game_data import QUEST_NUMBERS, QuestNumbers, QuestSet
+from custom_exceptions import InvalidDataFormatError, InvalidSaveDataError, QuestNotFoundError
+
+@pytest.fixture
+def quests():
+    """Load the real quest catalog"""
+    return game_data.load_quests("data/quests.txt")
+
+def make_quest(quest_id, prerequisite="NONE", required_level=1):
+    """Build a minimal quest dictionary"""
+    return {'quest_id': quest_id, 'title': quest_id, 'description': quest_id,
+            'reward_xp': 10, 'reward_gold': 5,
+            'required_level': required_level, 'prerequisite': prerequisite}
+
+# ============================================================================
+# QUEST GRAPH TESTS
+# ============================================================================
+
+def test_graph_chains_match_walk(quests):
+    """Test that cached chains match the step-by-step prerequisite walk"""
+    graph = quest_handler.QuestGraph(quests)
+
+    for quest_id in quests:
+        assert (quest_handler.get_quest_prerequisite_chain(quest_id, quests, graph)
+                == quest_handler.get_quest_prerequisite_chain(quest_id, quests))
+    assert graph.chain('master_adventurer') == ('first_steps', 'goblin_hunter', 'orc_menace',
+                                                'dragon_slayer', 'master_adventurer')
+    assert graph.depth('master_adventurer') == 4
+    assert graph.depth('first_steps') == 0
+
+def test_graph_topological_order(quests):
+    """Test that every quest comes after its prerequisite"""
+    graph = quest_handler.QuestGraph(quests)
+    position = {quest_id: index for index, quest_id in enumerate(graph.order)}
+
+    assert sorted(graph.order) == sorted(quests)
+    for quest_id, quest in quests.items():
+        if quest['prerequisite'] != "NONE":
+            assert position[quest['prerequisite']] < position[quest_id]
+    assert sorted(graph.unlocks('first_steps')) == ['equipment_upgrade', 'goblin_hunter']
+
+def test_graph_rejects_cycles_and_missing_prerequisites():
+    """Test that bad prerequisite data is reported when the graph is built"""
+    cyclic = {'a': make_quest('a', 'b'), 'b': make_quest('b', 'a'), 'c': make_quest('c')}
+    with pytest.raises(InvalidDataFormatError, match="a, b"):
+        quest_handler.QuestGraph(cyclic)
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.validate_quest_prerequisites(cyclic)
+    # The walk without a graph stops instead of looping forever
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.get_quest_prerequisite_chain('a', cyclic)
+
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.QuestGraph({'a': make_quest('a', 'missing')})
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.QuestGraph({}).chain('a')
+
+# ============================================================================
+# AVAILABLE QUEST INDEX TESTS
+# ============================================================================
+
+def assert_index_matches_scan(char, quests, index):
+    """The index must give the same quests as the full scan"""
+    assert (quest_handler.get_available_quests(char, quests, index)
+            == quest_handler.get_available_quests(char, quests))
+
+def test_index_tracks_quest_changes(quests):
+    """Test that accepting, completing and abandoning update the index"""
+    char = character_manager.create_character("IndexHero", "Warrior")
+    index = quest_handler.AvailableQuestIndex(char, quests)
+    assert [quest['quest_id'] for quest in index.available_quests()] == ['first_steps']
+
+    quest_handler.accept_quest(char, 'first_steps', quests, index)
+    assert index.available_quests() == []
+    # Completing gives enough XP to reach level 2, unlocking two quests
+    quest_handler.complete_quest(char, 'first_steps', quests, index)
+    character_manager.gain_experience(char, 100 - char['experience'])
+    assert_index_matches_scan(char, quests, index)
+    assert {quest['quest_id'] for quest in index.available_quests()} == {'goblin_hunter', 'equipment_upgrade'}
+
+    quest_handler.accept_quest(char, 'goblin_hunter', quests, index)
+    assert_index_matches_scan(char, quests, index)
+    quest_handler.abandon_quest(char, 'goblin_hunter', index)
+    assert_index_matches_scan(char, quests, index)
+
+def test_index_notices_untracked_quest_changes(quests):
+    """Test that quest changes made without index= are picked up on read"""
+    char = character_manager.create_character("DriftHero", "Rogue")
+    index = quest_handler.AvailableQuestIndex(char, quests)
+
+    # Accepted without telling the index
+    quest_handler.accept_quest(char, 'first_steps', quests)
+    assert index.available_quests() == []
+    # Quest lists replaced wholesale (e.g. copied from a loaded save)
+    char['completed_quests'] = QuestSet(['first_steps'])
+    char['active_quests'] = QuestSet()
+    character_manager.gain_experience(char, 100)
+    assert_index_matches_scan(char, quests, index)
+    # A tracked change on top of an untracked one still ends up right
+    char['completed_quests'].append('goblin_hunter')
+    quest_handler.accept_quest(char, 'equipment_upgrade', quests, index)
+    assert_index_matches_scan(char, quests, index)
+
+def test_index_notices_level_ups(quests):
+    """Test that level ups are picked up when the index is read"""
+    char = character_manager.create_character("LevelHero", "Mage")
+    char['completed_quests'] = ['first_steps', 'goblin_hunter', 'orc_menace']
+    index = quest_handler.AvailableQuestIndex(char, quests)
+    assert_index_matches_scan(char, quests, index)
+
+    character_manager.gain_experience(char, 1500)
+    assert char['level'] == 6
+    assert 'dragon_slayer' in [quest['quest_id'] for quest in index.available_quests()]
+    assert_index_matches_scan(char, quests, index)
+
+# ============================================================================
+# LEVEL INDEX TESTS
+# ============================================================================
+
+def test_level_index_matches_scan(quests):
+    """Test that indexed level ranges return the same quests as the scan"""
+    index = quest_handler.QuestLevelIndex(quests)
+
+    for min_level, max_level in [(1, 1), (2, 3), (4, 5), (1, 10), (3, 100), (5, 2)]:
+        indexed = quest_handler.get_quests_by_level(quests, min_level, max_level, index)
+        scanned = quest_handler.get_quests_by_level(quests, min_level, max_level)
+        assert sorted(q['quest_id'] for q in indexed) == sorted(q['quest_id'] for q in scanned)
+
+def test_level_index_is_lazy_and_sorted(quests):
+    """Test that range results come out lazily in level order"""
+    index = quest_handler.QuestLevelIndex(quests)
+
+    results = index.quest_ids_between(2, 6)
+    assert next(results) == 'goblin_hunter'
+    assert list(results) == ['equipment_upgrade', 'orc_menace', 'treasure_hunter', 'dragon_slayer']
+
+# ============================================================================
+# QUEST SET TESTS
+# ============================================================================
+
+def test_quest_set_works_like_a_list():
+    """Test the list-compatible view of a QuestSet"""
+    quest_set = QuestSet()
+    quest_set.append('first_steps')
+    quest_set.append('goblin_hunter')
+    quest_set.append('first_steps')
+
+    assert len(quest_set) == 2
+    assert 'goblin_hunter' in quest_set
+    assert 'orc_menace' not in quest_set
+    assert quest_set == ['goblin_hunter', 'first_steps']
+    quest_set.remove('goblin_hunter')
+    assert quest_set.to_list() == ['first_steps']
+    with pytest.raises(ValueError):
+        quest_set.remove('goblin_hunter')
+
+def test_quest_set_operations_and_hex():
+    """Test set operations and the compact hex form"""
+    done = QuestSet(['first_steps', 'goblin_hunter', 'orc_menace'])
+
+    assert done.has_all(['first_steps', 'orc_menace'])
+    assert not done.has_all(['first_steps', 'dragon_slayer'])
+    assert (done - ['orc_menace']) == ['first_steps', 'goblin_hunter']
+    assert (done & QuestSet(['orc_menace', 'dragon_slayer'])) == ['orc_menace']
+    assert QuestSet.from_hex(done.to_hex()) == done
+    assert pickle.loads(pickle.dumps(done)) == done
+
+def test_graph_chain_completed(quests):
+    """Test the "whole prerequisite chain done" mask check"""
+    graph = quest_handler.QuestGraph(quests)
+    done = QuestSet(['first_steps', 'goblin_hunter'])
+
+    assert not graph.chain_completed('dragon_slayer', done)
+    done.append('orc_menace')
+    assert graph.chain_completed('dragon_slayer', done)
+    assert graph.chain_completed('first_steps', [])
+
+def test_quest_lookups_do_not_number_quests():
+    """Test that read-only QuestSet operations don't grow the numbering"""
+    done = QuestSet(['first_steps'])
+    numbered = len(QUEST_NUMBERS.quest_ids)
+
+    assert not done.has_all(['first_steps', 'unheard_of_quest'])
+    assert done != ['first_steps', 'unheard_of_quest']
+    assert 'unheard_of_quest' not in done
+    assert (done & ['unheard_of_quest']) == []
+    with pytest.raises(ValueError):
+        done.remove('unheard_of_quest')
+    assert len(QUEST_NUMBERS.quest_ids) == numbered
+
+def test_catalog_quests_numbered_in_sorted_order():
+    """Test that a catalog's new quests are numbered by sorted ID"""
+    numbers = QuestNumbers(['zeta'])
+    numbers.load_catalog(['gamma', 'alpha', 'zeta'])
+    assert numbers.quest_ids == ['zeta', 'alpha', 'gamma']
+    assert numbers.lookup('beta') is None
+
+def test_binary_saves_store_quest_bitsets(tmp_path):
+    """Test that binary saves number quests with the directory's quest table"""
+    char = character_manager.create_character("Bitsy", "Mage")
+    char['completed_quests'] = QuestSet(['orc_menace', 'first_steps'])
+    character_manager.save_character_binary(char, str(tmp_path))
+    other = character_manager.create_character("Other", "Rogue")
+    other['active_quests'] = QuestSet(['goblin_hunter', 'first_steps'])
+    character_manager.save_character_binary(other, str(tmp_path))
+
+    # The table is only appended to, so Bitsy's numbers stay valid
+    table = (tmp_path / character_manager.QUEST_TABLE_FILENAME).read_text().split()
+    assert sorted(table[:2]) == ['first_steps', 'orc_menace']
+    assert table[2:] == ['goblin_hunter']
+    loaded = character_manager.load_character_binary("Bitsy", str(tmp_path))
+    assert loaded['completed_quests'] == ['first_steps', 'orc_menace']
+    assert character_manager.load_character_binary("Other", str(tmp_path))['active_quests'] == other['active_quests']
+
+    # Without the table the quests can't be read back
+    (tmp_path / character_manager.QUEST_TABLE_FILENAME).unlink()
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character_binary("Bitsy", str(tmp_path))
+
+def test_characters_store_quests_as_sets(tmp_path):
+    """Test that new and loaded characters use QuestSets and saves keep IDs"""
+    char = character_manager.create_character("SetHero", "Rogue")
+    assert isinstance(char['completed_quests'], QuestSet)
+    char['completed_quests'].append('first_steps')
+    character_manager.save_character(char, str(tmp_path))
+
+    with open(tmp_path / "SetHero_save.txt") as file:
+        assert "COMPLETED_QUESTS: first_steps\n" in file.read()
+    loaded = character_manager.load_character("SetHero", str(tmp_path))
+    assert isinstance(loaded['completed_quests'], QuestSet)
+    assert quest_handler.is_quest_completed(loaded, 'first_steps')
+
+# ============================================================================
+# QUEST STATISTICS TESTS
+# ============================================================================
+
+def test_running_quest_totals(quests):
+    """Test that completing quests keeps the running totals up to date"""
+    char = character_manager.create_character("TotalHero", "Cleric")
+    assert quest_handler.get_total_quest_rewards_earned(char, quests) == {'total_xp': 0, 'total_gold': 0}
+
+    quest_handler.accept_quest(char, 'first_steps', quests)
+    quest_handler.complete_quest(char, 'first_steps', quests)
+    assert char.quest_totals[:3] == (quests['first_steps']['reward_xp'],
+                                     quests['first_steps']['reward_gold'], 1)
+    assert 'quest_totals' not in char
+    assert quest_handler.get_quest_completion_percentage(char, quests) == pytest.approx(100 / 7)
+
+    # Totals are summed again if the completed list changes another way
+    char['completed_quests'].append('goblin_hunter')
+    totals = quest_handler.get_total_quest_rewards_earned(char, quests)
+    assert totals['total_gold'] == quests['first_steps']['reward_gold'] + quests['goblin_hunter']['reward_gold']
+
+    # ...or is replaced by different quests of the same count
+    char['completed_quests'] = QuestSet(['orc_menace', 'dragon_slayer'])
+    totals = quest_handler.get_total_quest_rewards_earned(char, quests)
+    assert totals['total_xp'] == quests['orc_menace']['reward_xp'] + quests['dragon_slayer']['reward_xp']
+
+    # ...or the catalog is edited and marked as changed
+    edited = {quest_id: dict(quest) for quest_id, quest in quests.items()}
+    quest_handler.get_total_quest_rewards_earned(char, edited)
+    for quest in edited.values():
+        quest['reward_xp'] = 1
+    quest_handler.quest_catalog_changed()
+    assert quest_handler.get_total_quest_rewards_earned(char, edited)['total_xp'] == 2
+
+def save_roster(tmp_path, quests):
+    """Save three characters with different completed quests"""
+    for name, completed in [("Ann", ['first_steps']), ("Bo", []),
+                            ("Cy", ['first_steps', 'goblin_hunter', 'orc_menace'])]:
+        char = character_manager.create_character(name, "Warrior")
+        char['completed_quests'] = completed
+        character_manager.save_character(char, str(tmp_path))
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_roster_quest_stats(tmp_path, quests, monkeypatch, use_numpy):
+    """Test roster-wide quest stats against the per-character totals"""
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(quest_handler, "np", None)
+    save_roster(tmp_path, quests)
+
+    result = quest_handler.get_roster_quest_stats(quests, ["Ann", "Bo", "Cy", "Ghost"], str(tmp_path))
+
+    assert list(result['stats']) == ["Cy", "Ann", "Bo"]
+    assert list(result['errors']) == ["Ghost"]
+    for name, stats in result['stats'].items():
+        char = character_manager.load_character(name, str(tmp_path))
+        expected = quest_handler.get_total_quest_rewards_earned(char, quests)
+        assert (stats['total_xp'], stats['total_gold']) == (expected['total_xp'], expected['total_gold'])
+        assert stats['completed'] == len(char['completed_quests'])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])